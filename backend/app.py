@@ -1,22 +1,100 @@
-from fastapi import FastAPI, File, UploadFile, HTTPException
+from contextlib import aclosing, asynccontextmanager
+from fastapi import FastAPI, File, Form, UploadFile, HTTPException, Request
 from fastapi.middleware.cors import CORSMiddleware
-from io import BytesIO
-from pypdf import PdfReader
+from fastapi.responses import JSONResponse, PlainTextResponse
+from typing import Dict, List, Optional, Set, Tuple
 import uvicorn
-from matching_engine import get_resume_job_match_score
-import nltk
+from pdf_extraction import (
+    extract_text, count_pages, extract_page_range, page_ranges, format_page, check_pdf_size,
+    spool_pdf, remove_spooled_pdf,
+    PDFExtractionError, PDFTooLargeError
+)
+from executors import (
+    ExecutorSaturated, pdf_executor, inference_executor, shutdown_executors, get_executor_stats
+)
+from matching_engine import (
+    get_resume_job_match_score, get_bulk_match_scores, get_bulk_resume_match_scores,
+    get_embedding_cache_stats, get_embedding_batcher_stats, new_skill_extractor,
+    warm_up, get_model_state, WARMUP_ON_STARTUP, INFERENCE_CONFIG
+)
+from jd_index import get_jd_index, register_job_description, match_registered_job_descriptions
+from resume_corpus import get_resume_corpus, add_resumes, search_resumes
+from vector_index import IVF_PROBES
+from skill_index import SkillQueryError
+from text_cache import ExtractedDocument, extracted_text_cache, pdf_cache_key, get_text_cache_stats
+from metrics import collect_timings, current_timings_ms, record_request, record_stage, render_metrics, stage_timer
+from structured_logging import get_logger, log_event
+from uploads import BufferedUpload, RequestSizeLimit, buffer_upload, read_upload
+from job_queue import JobQuotaExceeded, job_queue
+from match_cache import match_result_cache
+import asyncio
+import logging
 import os
-nltk.data.path.append(os.path.join(os.path.dirname(__file__), 'nltk_data'))
+import sys
+import threading
+import time
+
+logger = get_logger("app")
 
-print(nltk.data.path)
+
+@asynccontextmanager
+async def lifespan(app: FastAPI):
+    # Bind the port first and load the model in the background; /ready reports when it is done
+    if WARMUP_ON_STARTUP:
+        threading.Thread(target=warm_up, name="model-warm-up", daemon=True).start()
+    job_queue.start()
+    yield
+    await job_queue.stop()
+    # Worker pools are created on first use; tear them down with the server
+    shutdown_executors()
 
 
 app = FastAPI(
     title="PDF Processor API",
     description="Receives PDFs in memory and extracts text without saving files.",
-    version="1.0.0"
+    version="1.0.0",
+    lifespan=lifespan
 )
 
+@app.middleware("http")
+async def observe_requests(request: Request, call_next):
+    """Collect per-stage timings for the request and record its latency by route template."""
+    started = time.perf_counter()
+    status = 500
+    with collect_timings():
+        try:
+            response = await call_next(request)
+            status = response.status_code
+            return response
+        finally:
+            route = request.scope.get("route")
+            record_request(request.method, getattr(route, "path", "unmatched"), status,
+                           time.perf_counter() - started)
+
+def with_timings(response: dict, debug: bool) -> dict:
+    """Attach the request's per-stage timings (ms) when the caller asked for debug output."""
+    if debug:
+        response["timings_ms"] = current_timings_ms()
+    return response
+
+@app.exception_handler(ExecutorSaturated)
+async def executor_saturated_handler(request: Request, exc: ExecutorSaturated):
+    """Shed load with 503 + Retry-After instead of queueing without bound."""
+    return JSONResponse(
+        status_code=503,
+        content={"detail": f"Server is busy ({exc.name} queue full). Please retry."},
+        headers={"Retry-After": str(exc.retry_after)}
+    )
+
+@app.exception_handler(JobQuotaExceeded)
+async def job_quota_exceeded_handler(request: Request, exc: JobQuotaExceeded):
+    """Refuse more queued jobs from a client that already has its maximum waiting."""
+    return JSONResponse(
+        status_code=429,
+        content={"detail": f"Too many queued jobs for this client (limit {exc.limit}). Please retry later."},
+        headers={"Retry-After": str(exc.retry_after)}
+    )
+
 # CORS Configuration - Updated for better connectivity
 origins = [
     "http://localhost:3000",
@@ -27,6 +105,10 @@ origins = [
     # "https://your-vercel-app.vercel.app",
 ]
 
+# Refuse oversized bodies before they are read (see uploads.MAX_REQUEST_BYTES);
+# added before CORS so the 413 still carries the CORS headers
+app.add_middleware(RequestSizeLimit)
+
 app.add_middleware(
     CORSMiddleware,
     allow_origins=origins,
@@ -36,28 +118,105 @@ app.add_middleware(
     expose_headers=["*"]
 )
 
+# Upper bound on the number of PDFs accepted by a single bulk request
+MAX_BULK_DOCUMENTS = int(os.environ.get("MAX_BULK_DOCUMENTS", 500))
+
+# Only set behind a gateway that overwrites X-Client-ID; otherwise any caller could pick its own job quota
+TRUST_CLIENT_ID_HEADER = os.environ.get("TRUST_CLIENT_ID_HEADER", "0") == "1"
+
+ALLOWED_CONTENT_TYPES = ["application/pdf"]
+
+def validate_pdf_upload(upload: UploadFile, label: str) -> None:
+    """Reject uploads that are not PDFs with a 400 naming the offending document."""
+    if upload.content_type not in ALLOWED_CONTENT_TYPES:
+        raise HTTPException(
+            status_code=400,
+            detail=f"{label} must be a PDF file. Received: {upload.content_type}"
+        )
+
+def pdf_http_error(error: PDFExtractionError) -> HTTPException:
+    """Map extraction failures to HTTP errors: 413 for oversized files, 422 otherwise."""
+    if isinstance(error, PDFTooLargeError):
+        return HTTPException(status_code=413, detail=f"PDF too large: {str(error)}")
+    return HTTPException(
+        status_code=422, 
+        detail=f"Error processing PDF content: {str(error)}"
+    )
+
 def extract_text_from_pdf_bytes(pdf_bytes: bytes) -> str:
     """Helper function to extract text from raw PDF bytes using pypdf."""
     try:
-        pdf_file_object = BytesIO(pdf_bytes)
-        pdf_reader = PdfReader(pdf_file_object)
-        text = ""
-        
-        for page_num, page in enumerate(pdf_reader.pages):
-            try:
-                extracted_page_text = page.extract_text()
-                if extracted_page_text:
-                    text += f"--- Page {page_num + 1} ---\n{extracted_page_text}\n\n"
-            except Exception as page_error:
-                print(f"Warning: Could not extract text from page {page_num + 1}: {page_error}")
-                continue
-        
-        return text.strip()
-    except Exception as e:
-        raise HTTPException(
-            status_code=422, 
-            detail=f"Error processing PDF content: {str(e)}"
-        )
+        check_pdf_size(pdf_bytes)
+        key = pdf_cache_key(pdf_bytes)
+        cached = extracted_text_cache.get(key)
+        if cached is not None:
+            return cached.text
+        with stage_timer("pdf_parse"):
+            text = extract_text(pdf_bytes)
+        extracted_text_cache.put(key, ExtractedDocument(text, None))
+        return text
+    except PDFExtractionError as e:
+        raise pdf_http_error(e)
+
+async def pdf_cache_key_off_loop(pdf_bytes: bytes) -> str:
+    """
+    pdf_cache_key computed in the default thread pool: hashing a PDF of up to
+    PDF_MAX_BYTES would otherwise stall the event loop
+    """
+    return await asyncio.get_running_loop().run_in_executor(None, pdf_cache_key, pdf_bytes)
+
+async def extract_document_off_loop(pdf_bytes: bytes,
+                                    key: Optional[str] = None) -> Tuple[str, Dict[str, Set[str]], bool]:
+    """
+    Parse a PDF on the worker pool, split into page ranges that are extracted in
+    parallel. Skills are extracted from each range as soon as it lands, while later
+    pages are still being parsed. Returns the document text, its skills and whether
+    they were served from the extracted-text cache. `key` is the PDF's pdf_cache_key
+    when the caller already has it.
+    """
+    try:
+        check_pdf_size(pdf_bytes)
+        key = key or await pdf_cache_key_off_loop(pdf_bytes)
+        cached = extracted_text_cache.get(key)
+        if cached is not None:
+            if cached.skills is not None:
+                return cached.text, cached.skills, True
+            # Cached by a text-only path (bulk endpoints); add the skills now
+            extractor = new_skill_extractor()
+            extractor.feed(cached.text)
+            extracted_text_cache.put(key, ExtractedDocument(cached.text, extractor.skills))
+            return cached.text, extractor.skills, True
+
+        parse_started = time.perf_counter()
+        source = pdf_bytes
+        if pdf_executor.kind == "process":
+            # Worker processes open one spooled copy rather than each task receiving the bytes
+            source = await asyncio.get_running_loop().run_in_executor(None, spool_pdf, pdf_bytes)
+        try:
+            page_count = await pdf_executor.run(count_pages, source)
+            extractor = new_skill_extractor()
+            chunks = []
+            feeding = 0.0
+            ranges = [(source, start, stop) for start, stop in page_ranges(page_count)]
+            # Closed on the way out, even when feeding raises, so the pool slot is freed immediately
+            async with aclosing(pdf_executor.imap_ordered(extract_page_range, ranges)) as results:
+                async for pages in results:
+                    fed = time.perf_counter()
+                    for page_number, page_text in pages:
+                        chunks.append(format_page(page_number, page_text))
+                        # A single lexicon pass over one page; cheap enough for the event loop
+                        extractor.feed(page_text)
+                    feeding += time.perf_counter() - fed
+        finally:
+            if source is not pdf_bytes:
+                remove_spooled_pdf(source)
+        text = "".join(chunks).strip()
+        # Skill extraction interleaved with parsing is timed as its own stage
+        record_stage("pdf_parse", time.perf_counter() - parse_started - feeding)
+        extracted_text_cache.put(key, ExtractedDocument(text, extractor.skills))
+        return text, extractor.skills, False
+    except PDFExtractionError as e:
+        raise pdf_http_error(e)
 
 @app.get("/")
 async def root():
@@ -66,66 +225,165 @@ async def root():
 
 @app.get("/health")
 async def health_check():
-    """Detailed health check"""
-    return {"status": "healthy", "service": "PDF Processor API", "version": "1.0.0"}
+    """Detailed health check (liveness: answers even while the model is loading)"""
+    return {
+        "status": "healthy",
+        "service": "PDF Processor API",
+        "version": "1.0.0",
+        "model_state": get_model_state(),
+        "inference_config": INFERENCE_CONFIG.as_dict(),
+        "embedding_cache": get_embedding_cache_stats(),
+        "embedding_batcher": get_embedding_batcher_stats(),
+        "text_cache": get_text_cache_stats(),
+        "executors": get_executor_stats(),
+        "match_cache": match_result_cache.stats(),
+        "jobs": job_queue.stats()
+    }
+
+@app.get("/metrics", response_class=PlainTextResponse)
+async def metrics():
+    """
+    Prometheus scrape endpoint: stage and request latency histograms, gauges for current
+    cache and pool sizes, and counters (`_total`) for cumulative hits, misses and outcomes
+    """
+    text_cache = get_text_cache_stats()
+    gauges = {
+        "resume_matcher_text_cache_entries": text_cache["entries"],
+        "resume_matcher_text_cache_bytes": text_cache["bytes"],
+        "resume_matcher_model_ready": get_model_state() == "ready",
+    }
+    counters = {
+        "resume_matcher_text_cache_hits": text_cache["hits"] + text_cache["disk_hits"],
+        "resume_matcher_text_cache_misses": text_cache["misses"],
+        "resume_matcher_text_cache_evictions": text_cache["evictions"],
+    }
+    for name, stats in get_executor_stats().items():
+        gauges[f"resume_matcher_{name}_executor_pending"] = stats["pending"]
+        counters[f"resume_matcher_{name}_executor_completed"] = stats["completed"]
+        counters[f"resume_matcher_{name}_executor_rejected"] = stats["rejected"]
+    match_cache = match_result_cache.stats()
+    for name in ("in_flight", "entries"):
+        gauges[f"resume_matcher_match_cache_{name}"] = match_cache[name]
+    for name in ("hits", "coalesced", "computed", "evictions"):
+        counters[f"resume_matcher_match_cache_{name}"] = match_cache[name]
+    jobs = job_queue.stats()
+    for name in ("queued", "running", "waiting_on_client_limit", "results_stored"):
+        gauges[f"resume_matcher_jobs_{name}"] = jobs[name]
+    for name in ("submitted", "succeeded", "failed", "rejected", "expired", "callbacks_delivered", "callbacks_failed"):
+        counters[f"resume_matcher_jobs_{name}"] = jobs[name]
+    if get_model_state() != "not_loaded":
+        embedding_cache = get_embedding_cache_stats()
+        gauges["resume_matcher_embedding_cache_entries"] = embedding_cache.get("entries")
+        counters["resume_matcher_embedding_cache_hits"] = embedding_cache.get("hits")
+        counters["resume_matcher_embedding_cache_misses"] = embedding_cache.get("misses")
+        counters["resume_matcher_embedding_cache_evictions"] = embedding_cache.get("evictions")
+    return render_metrics(gauges, counters)
+
+@app.get("/ready")
+async def readiness_check():
+    """Readiness probe: 503 until the embedding model has been warmed up"""
+    state = get_model_state()
+    # Without background warm-up the model loads on the first request, so serve traffic
+    ready = state == "ready" or (not WARMUP_ON_STARTUP and state != "failed")
+    return JSONResponse(
+        status_code=200 if ready else 503,
+        content={"status": "ready" if ready else "not_ready", "model_state": state}
+    )
 
 @app.post("/process-docs/")
 async def process_documents(
     resume: UploadFile = File(..., description="The applicant's resume in PDF format."),
-    job_description: UploadFile = File(..., description="The job description in PDF format.")
+    job_description: UploadFile = File(..., description="The job description in PDF format."),
+    debug: bool = False
 ):
     """
     Receives two PDF files in memory, extracts text, and returns processing results.
-    No files are saved to the server's disk.
+    No files are saved to the server's disk. With ?debug=true the response includes
+    per-stage timings.
     """
     
     # Validate file types
-    allowed_content_types = ["application/pdf"]
-    
-    if resume.content_type not in allowed_content_types:
-        raise HTTPException(
-            status_code=400,
-            detail=f"Resume must be a PDF file. Received: {resume.content_type}"
-        )
-    
-    if job_description.content_type not in allowed_content_types:
-        raise HTTPException(
-            status_code=400,
-            detail=f"Job description must be a PDF file. Received: {job_description.content_type}"
-        )
+    validate_pdf_upload(resume, "Resume")
+    validate_pdf_upload(job_description, "Job description")
     
     try:
-        # Process Resume File
-        print(f"\n--- Processing Resume: {resume.filename} ---")
-        resume_contents = await resume.read()
-        resume_text = extract_text_from_pdf_bytes(resume_contents)
-        
-        print(f"Resume file size: {len(resume_contents)} bytes")
-        print(f"Resume text length: {len(resume_text)} characters")
-        print("\n[RESUME TEXT PREVIEW]")
-        print(resume_text[:500] + "..." if len(resume_text) > 500 else resume_text)
-        print("\n" + "="*50)
+        response, source = await match_documents_once(resume, job_description)
+    finally:
+        # Ensure file handles are closed
+        await resume.close()
+        await job_description.close()
+
+    if debug:
+        response["result_source"] = source
+    return with_timings(response, debug)
+
+async def match_documents_once(resume: UploadFile | BufferedUpload,
+                               job_description: UploadFile | BufferedUpload) -> Tuple[dict, str]:
+    """
+    match_documents, with identical requests (same bytes in both uploads) in flight
+    together or repeated within MATCH_CACHE_TTL answered by a single computation.
+    Returns the response and whether it was "computed", "coalesced" or "cached".
+    """
+    resume_upload = await buffer_upload(resume)
+    jd_upload = await buffer_upload(job_description)
+    key = (await upload_cache_key(resume_upload), await upload_cache_key(jd_upload))
+    response, source = await match_result_cache.get_or_compute(
+        key, lambda: match_documents(resume_upload, jd_upload),
+        # A failed match comes back as a zero score with an error; let the next request retry it
+        cacheable=lambda result: "error" not in result["matching_analysis"]
+    )
+    files = response["files_processed"]
+    # Same content, but each request reports its own file names
+    return {**response, "files_processed": {
+        "resume": {**files["resume"], "filename": resume_upload.filename,
+                   "content_type": resume_upload.content_type},
+        "job_description": {**files["job_description"], "filename": jd_upload.filename,
+                            "content_type": jd_upload.content_type}
+    }}, source
+
+async def upload_cache_key(upload: BufferedUpload) -> str:
+    """
+    pdf_cache_key of a buffered upload, hashed once off the event loop and kept on the upload
+    """
+    if upload.cache_key is None:
+        upload.cache_key = await pdf_cache_key_off_loop(upload.data)
+    return upload.cache_key
+
+async def extract_upload(upload: UploadFile | BufferedUpload) -> Tuple[int, str, Dict[str, Set[str]], bool]:
+    """
+    Read and extract one upload: its size, text, skills and whether they came from the
+    cache. A buffered upload keeps the result in place of its bytes, which are freed as
+    soon as the text is out; a retried job finds the result there.
+    """
+    if isinstance(upload, BufferedUpload):
+        if upload.extracted is None:
+            text, skills, cached = await extract_document_off_loop(upload.data, upload.cache_key)
+            upload.release((upload.size, text, skills, cached))
+        return upload.extracted
+    contents = await read_upload(upload)
+    text, skills, cached = await extract_document_off_loop(contents)
+    return len(contents), text, skills, cached
+
+async def match_documents(resume: UploadFile | BufferedUpload, job_description: UploadFile | BufferedUpload) -> dict:
+    """
+    Extract both PDFs and score them: the work behind /process-docs/, shared with queued jobs
+    """
+    try:
+        # Process Resume File; the raw bytes are released as soon as the text is out
+        resume_size, resume_text, resume_skills, resume_cached = await extract_upload(resume)
         
         # Process Job Description File
-        print(f"\n--- Processing Job Description: {job_description.filename} ---")
-        jd_contents = await job_description.read()
-        jd_text = extract_text_from_pdf_bytes(jd_contents)
-        
-        print(f"Job description file size: {len(jd_contents)} bytes")
-        print(f"Job description text length: {len(jd_text)} characters")
-        print("\n[JOB DESCRIPTION TEXT PREVIEW]")
-        print(jd_text[:500] + "..." if len(jd_text) > 500 else jd_text)
-        print("\n" + "="*50)
+        jd_size, jd_text, jd_skills, jd_cached = await extract_upload(job_description)
         
         # Calculate matching score
-        print("\n--- Calculating Resume-Job Match Score ---")
         try:
-            matching_result = get_resume_job_match_score(resume_text, jd_text)
-            print(f"Overall Match Score: {matching_result['overall_match_percentage']}%")
-            print(f"Text Similarity Score: {matching_result['text_similarity_score']}%")
-            print("Skill Match Scores:", matching_result['skill_match_scores'])
+            matching_result = await inference_executor.run(
+                get_resume_job_match_score, resume_text, jd_text, resume_skills, jd_skills
+            )
+        except ExecutorSaturated:
+            raise
         except Exception as matching_error:
-            print(f"Warning: Could not calculate matching score: {matching_error}")
+            log_event(logger, logging.ERROR, "match_failed", error=str(matching_error))
             # Set default matching result in case of error
             matching_result = {
                 'overall_match_percentage': 0.0,
@@ -138,34 +396,36 @@ async def process_documents(
                 'error': str(matching_error)
             }
         
-    except HTTPException:
+    except (HTTPException, ExecutorSaturated):
         raise
     except Exception as e:
         raise HTTPException(
             status_code=500,
             detail=f"Unexpected error processing files: {str(e)}"
         )
-    
-    finally:
-        # Ensure file handles are closed
-        await resume.close()
-        await job_description.close()
+
+    log_event(logger, logging.INFO, "documents_processed", sampled=True,
+              resume_bytes=resume_size, resume_chars=len(resume_text), resume_cached=resume_cached,
+              jd_bytes=jd_size, jd_chars=len(jd_text), jd_cached=jd_cached,
+              overall_match_percentage=matching_result['overall_match_percentage'])
     
     # Return comprehensive processing results with matching score
     return {
-        "message": "Documents processed successfully! Check server console for extracted text.",
+        "message": "Documents processed successfully!",
         "files_processed": {
             "resume": {
                 "filename": resume.filename,
-                "size_bytes": len(resume_contents),
+                "size_bytes": resume_size,
                 "text_length": len(resume_text),
-                "content_type": resume.content_type
+                "content_type": resume.content_type,
+                "from_cache": resume_cached
             },
             "job_description": {
                 "filename": job_description.filename,
-                "size_bytes": len(jd_contents),
+                "size_bytes": jd_size,
                 "text_length": len(jd_text),
-                "content_type": job_description.content_type
+                "content_type": job_description.content_type,
+                "from_cache": jd_cached
             }
         },
         "total_text_extracted": len(resume_text) + len(jd_text),
@@ -173,7 +433,414 @@ async def process_documents(
         "matching_analysis": matching_result
     }
 
+def client_id(request: Request) -> str:
+    """The client a queued job counts against: the peer address, or X-Client-ID when TRUST_CLIENT_ID_HEADER is set."""
+    if TRUST_CLIENT_ID_HEADER and request.headers.get("x-client-id"):
+        return request.headers["x-client-id"]
+    return request.client.host if request.client else "unknown"
+
+@app.post("/jobs/process-docs/", status_code=202)
+async def submit_process_documents_job(
+    request: Request,
+    resume: UploadFile = File(..., description="The applicant's resume in PDF format."),
+    job_description: UploadFile = File(..., description="The job description in PDF format."),
+    priority: str = Form("normal", description="high, normal or low."),
+    callback_url: str | None = Form(None, description="Where to POST the finished job; must be an allowed destination."),
+):
+    """
+    Queues the work of /process-docs/ and returns a job ID at once. Poll GET /jobs/{job_id}
+    for the result, or receive it at the callback URL.
+    """
+    validate_pdf_upload(resume, "Resume")
+    validate_pdf_upload(job_description, "Job description")
+
+    try:
+        # The uploads are read now; the request is over by the time the job runs
+        resume_upload = await buffer_upload(resume)
+        jd_upload = await buffer_upload(job_description)
+    finally:
+        await resume.close()
+        await job_description.close()
+
+    async def work() -> dict:
+        return (await match_documents_once(resume_upload, jd_upload))[0]
+
+    try:
+        job = job_queue.submit(
+            work, client_id(request), priority,
+            kind="process-docs", size=resume_upload.size + jd_upload.size, callback_url=callback_url
+        )
+    except ValueError as e:
+        raise HTTPException(status_code=422, detail=str(e))
+
+    status_url = f"/jobs/{job.id}"
+    return JSONResponse(
+        status_code=202,
+        content={"job_id": job.id, "status": job.status, "priority": job.priority, "status_url": status_url},
+        headers={"Location": status_url}
+    )
+
+@app.get("/jobs/stats")
+async def job_stats():
+    """Queue depth, wait and run times, and outcome counts of the job queue."""
+    return job_queue.stats()
+
+@app.get("/jobs/{job_id}")
+async def get_job(job_id: str):
+    """State of a queued job, with its result once it has finished."""
+    job = job_queue.get(job_id)
+    if job is None:
+        raise HTTPException(status_code=404, detail=f"Unknown or expired job: {job_id}")
+    return job
+
+async def _read_pdf_texts(uploads: List[UploadFile]) -> List[dict]:
+    """
+    Read every upload, then extract the ones not in the extracted-text cache in
+    parallel on the PDF pool, preserving order. Only the bytes of cache misses
+    are kept, and only until their text is extracted.
+    """
+    sizes, keys, cached, misses, miss_contents = [], [], [], [], []
+    for i, upload in enumerate(uploads):
+        data = await read_upload(upload)
+        key = await pdf_cache_key_off_loop(data)
+        document = extracted_text_cache.get(key)
+        sizes.append(len(data))
+        keys.append(key)
+        cached.append(document)
+        if document is None:
+            misses.append(i)
+            miss_contents.append(data)
+    extracted = []
+    try:
+        if misses:
+            with stage_timer("pdf_parse"):
+                extracted = await pdf_executor.map(extract_text, miss_contents)
+    except PDFExtractionError as e:
+        raise pdf_http_error(e)
+    del miss_contents
+    texts = [document.text if document is not None else None for document in cached]
+    for i, text in zip(misses, extracted):
+        texts[i] = text
+        extracted_text_cache.put(keys[i], ExtractedDocument(text, None))
+    return [
+        {
+            "filename": upload.filename,
+            "size_bytes": size,
+            "text_length": len(text),
+            "content_type": upload.content_type,
+            "from_cache": document is not None,
+            "text": text
+        }
+        for upload, size, text, document in zip(uploads, sizes, texts, cached)
+    ]
+
+def _validate_bulk_uploads(uploads: List[UploadFile], label: str) -> None:
+    if not uploads:
+        raise HTTPException(status_code=400, detail=f"At least one {label.lower()} is required.")
+    if len(uploads) > MAX_BULK_DOCUMENTS:
+        raise HTTPException(
+            status_code=413,
+            detail=f"Too many {label.lower()} files: {len(uploads)} (limit {MAX_BULK_DOCUMENTS})"
+        )
+    for upload in uploads:
+        validate_pdf_upload(upload, label)
+
+def _file_metadata(document: dict) -> dict:
+    return {key: value for key, value in document.items() if key != "text"}
+
+@app.post("/process-docs/bulk/")
+async def process_documents_bulk(
+    resume: UploadFile = File(..., description="The applicant's resume in PDF format."),
+    job_descriptions: List[UploadFile] = File(..., description="Job descriptions in PDF format."),
+    debug: bool = False
+):
+    """
+    Ranks many job descriptions for one resume. All documents are embedded in a
+    single batch, so this is far cheaper than one /process-docs/ call per role.
+    """
+    validate_pdf_upload(resume, "Resume")
+    _validate_bulk_uploads(job_descriptions, "Job description")
+
+    try:
+        resume_doc = (await _read_pdf_texts([resume]))[0]
+        jd_docs = await _read_pdf_texts(job_descriptions)
+        ranked = await inference_executor.run(
+            get_bulk_match_scores, resume_doc["text"], [doc["text"] for doc in jd_docs]
+        )
+    except (HTTPException, ExecutorSaturated):
+        raise
+    except Exception as e:
+        raise HTTPException(
+            status_code=500,
+            detail=f"Unexpected error processing files: {str(e)}"
+        )
+    finally:
+        await resume.close()
+        for upload in job_descriptions:
+            await upload.close()
+
+    for result in ranked:
+        result["job_description_filename"] = jd_docs[result["job_description_index"]]["filename"]
+
+    return with_timings({
+        "message": f"Ranked {len(jd_docs)} job descriptions for the resume.",
+        "files_processed": {
+            "resume": _file_metadata(resume_doc),
+            "job_descriptions": [_file_metadata(doc) for doc in jd_docs]
+        },
+        "ranked_matches": ranked
+    }, debug)
+
+@app.post("/process-docs/bulk-resumes/")
+async def process_resumes_bulk(
+    resumes: List[UploadFile] = File(..., description="Applicant resumes in PDF format."),
+    job_description: UploadFile = File(..., description="The job description in PDF format."),
+    debug: bool = False
+):
+    """
+    Ranks many resumes for one job description using a single batched embedding pass.
+    """
+    _validate_bulk_uploads(resumes, "Resume")
+    validate_pdf_upload(job_description, "Job description")
+
+    try:
+        resume_docs = await _read_pdf_texts(resumes)
+        jd_doc = (await _read_pdf_texts([job_description]))[0]
+        ranked = await inference_executor.run(
+            get_bulk_resume_match_scores, [doc["text"] for doc in resume_docs], jd_doc["text"]
+        )
+    except (HTTPException, ExecutorSaturated):
+        raise
+    except Exception as e:
+        raise HTTPException(
+            status_code=500,
+            detail=f"Unexpected error processing files: {str(e)}"
+        )
+    finally:
+        for upload in resumes:
+            await upload.close()
+        await job_description.close()
+
+    for result in ranked:
+        result["resume_filename"] = resume_docs[result["resume_index"]]["filename"]
+
+    return with_timings({
+        "message": f"Ranked {len(resume_docs)} resumes for the job description.",
+        "files_processed": {
+            "resumes": [_file_metadata(doc) for doc in resume_docs],
+            "job_description": _file_metadata(jd_doc)
+        },
+        "ranked_matches": ranked
+    }, debug)
+
+@app.post("/job-descriptions/")
+async def create_job_description(
+    job_description: UploadFile = File(..., description="The job description in PDF format."),
+    name: str | None = Form(None, description="Optional display name; defaults to the filename."),
+    debug: bool = False
+):
+    """
+    Registers a job description: its skills, experience requirement and embedding
+    are computed once and stored, so later matches only process the resume.
+    """
+    validate_pdf_upload(job_description, "Job description")
+
+    try:
+        jd_doc = (await _read_pdf_texts([job_description]))[0]
+        entry = await inference_executor.run(
+            register_job_description, jd_doc["text"], name or jd_doc["filename"]
+        )
+    except (HTTPException, ExecutorSaturated):
+        raise
+    except Exception as e:
+        raise HTTPException(
+            status_code=500,
+            detail=f"Unexpected error registering job description: {str(e)}"
+        )
+    finally:
+        await job_description.close()
+
+    return with_timings({
+        "message": "Job description already registered." if entry["already_registered"]
+                   else "Job description registered.",
+        "job_description": entry
+    }, debug)
+
+@app.get("/job-descriptions/")
+async def list_job_descriptions():
+    jd_index = get_jd_index()
+    return {"count": len(jd_index), "job_descriptions": jd_index.list()}
+
+@app.get("/job-descriptions/{jd_id}")
+async def get_job_description(jd_id: str):
+    entry = get_jd_index().get(jd_id)
+    if entry is None:
+        raise HTTPException(status_code=404, detail=f"Unknown job description: {jd_id}")
+    return entry
+
+@app.delete("/job-descriptions/{jd_id}")
+async def delete_job_description(jd_id: str):
+    if not await inference_executor.run(get_jd_index().delete, jd_id):
+        raise HTTPException(status_code=404, detail=f"Unknown job description: {jd_id}")
+    return {"message": "Job description deleted.", "id": jd_id}
+
+async def _match_registered(resume: UploadFile, jd_ids: List[str] | None, debug: bool) -> dict:
+    validate_pdf_upload(resume, "Resume")
+
+    try:
+        resume_doc = (await _read_pdf_texts([resume]))[0]
+        ranked = await inference_executor.run(match_registered_job_descriptions, resume_doc["text"], jd_ids)
+    except KeyError as e:
+        raise HTTPException(status_code=404, detail=f"Unknown job description: {e.args[0]}")
+    except (HTTPException, ExecutorSaturated):
+        raise
+    except Exception as e:
+        raise HTTPException(
+            status_code=500,
+            detail=f"Unexpected error processing files: {str(e)}"
+        )
+    finally:
+        await resume.close()
+
+    return with_timings({
+        "message": f"Ranked {len(ranked)} registered job descriptions for the resume.",
+        "files_processed": {"resume": _file_metadata(resume_doc)},
+        "ranked_matches": ranked
+    }, debug)
+
+@app.post("/job-descriptions/match")
+async def match_all_job_descriptions(
+    resume: UploadFile = File(..., description="The applicant's resume in PDF format."),
+    debug: bool = False
+):
+    """
+    Ranks every registered job description for the resume.
+    """
+    return await _match_registered(resume, None, debug)
+
+@app.post("/job-descriptions/{jd_id}/match")
+async def match_job_description(
+    jd_id: str,
+    resume: UploadFile = File(..., description="The applicant's resume in PDF format."),
+    debug: bool = False
+):
+    """
+    Matches the resume against one registered job description.
+    """
+    return await _match_registered(resume, [jd_id], debug)
+
+@app.post("/resumes/")
+async def create_resumes(
+    resumes: List[UploadFile] = File(..., description="Resumes in PDF format to add to the searchable corpus."),
+    debug: bool = False
+):
+    """
+    Adds resumes to the corpus with their skills, experience and embeddings precomputed.
+    """
+    _validate_bulk_uploads(resumes, "Resume")
+
+    try:
+        resume_docs = await _read_pdf_texts(resumes)
+        entries = await inference_executor.run(
+            add_resumes, [doc["text"] for doc in resume_docs], [doc["filename"] for doc in resume_docs]
+        )
+    except (HTTPException, ExecutorSaturated):
+        raise
+    except Exception as e:
+        raise HTTPException(
+            status_code=500,
+            detail=f"Unexpected error adding resumes: {str(e)}"
+        )
+    finally:
+        for upload in resumes:
+            await upload.close()
+
+    added = sum(not entry["already_registered"] for entry in entries)
+    return with_timings({
+        "message": f"Added {added} resumes to the corpus ({len(entries) - added} already stored).",
+        "resumes": entries
+    }, debug)
+
+@app.get("/resumes/")
+async def list_resumes():
+    corpus = get_resume_corpus()
+    return {"count": len(corpus), "resumes": corpus.list()}
+
+@app.get("/resumes/filter")
+async def filter_resumes(q: str):
+    """
+    Stored resumes matching a boolean skill query, e.g. "kubernetes AND (go OR rust) AND NOT php".
+    """
+    try:
+        matches = get_resume_corpus().filter(q)
+    except SkillQueryError as e:
+        raise HTTPException(status_code=422, detail=str(e))
+    return {"query": q, "count": len(matches), "resumes": matches}
+
+@app.get("/resumes/{resume_id}")
+async def get_resume(resume_id: str):
+    entry = get_resume_corpus().get(resume_id)
+    if entry is None:
+        raise HTTPException(status_code=404, detail=f"Unknown resume: {resume_id}")
+    return entry
+
+@app.delete("/resumes/{resume_id}")
+async def delete_resume(resume_id: str):
+    if not await inference_executor.run(get_resume_corpus().delete, resume_id):
+        raise HTTPException(status_code=404, detail=f"Unknown resume: {resume_id}")
+    return {"message": "Resume deleted.", "id": resume_id}
+
+@app.post("/resumes/search")
+async def search_resume_corpus(
+    job_description: UploadFile = File(..., description="The job description in PDF format."),
+    k: int = Form(50, ge=1, le=MAX_BULK_DOCUMENTS, description="Number of candidates to return."),
+    approximate: bool = Form(False, description="Use the approximate (IVF) index instead of exact search."),
+    n_probe: int = Form(IVF_PROBES, ge=1, description="IVF partitions to scan; higher is slower but more accurate."),
+    skill_query: str | None = Form(None, description='Boolean skill filter, e.g. "kubernetes AND (go OR rust) AND NOT php".'),
+    min_skill_coverage: float = Form(0.0, ge=0.0, le=1.0,
+                                     description="Minimum fraction of the JD's extracted skills a resume must have."),
+    debug: bool = False
+):
+    """
+    Finds the k stored resumes that best fit the job description.
+    """
+    validate_pdf_upload(job_description, "Job description")
+
+    try:
+        jd_doc = (await _read_pdf_texts([job_description]))[0]
+        ranked = await inference_executor.run(
+            search_resumes, jd_doc["text"], k, approximate, n_probe, skill_query, min_skill_coverage
+        )
+    except SkillQueryError as e:
+        raise HTTPException(status_code=422, detail=str(e))
+    except (HTTPException, ExecutorSaturated):
+        raise
+    except Exception as e:
+        raise HTTPException(
+            status_code=500,
+            detail=f"Unexpected error searching resumes: {str(e)}"
+        )
+    finally:
+        await job_description.close()
+
+    return with_timings({
+        "message": f"Found {len(ranked)} candidates for the job description.",
+        "files_processed": {"job_description": _file_metadata(jd_doc)},
+        "search": {
+            "k": k,
+            "approximate": approximate,
+            "n_probe": n_probe if approximate else None,
+            "skill_query": skill_query,
+            "min_skill_coverage": min_skill_coverage
+        },
+        "ranked_matches": ranked
+    }, debug)
+
 if __name__ == "__main__":
+    if int(os.environ.get("WEB_WORKERS", 1)) > 1:
+        # Pre-fork mode sets up its environment before the app is imported, so start it afresh
+        serve_script = os.path.join(os.path.dirname(os.path.abspath(__file__)), "serve.py")
+        os.execv(sys.executable, [sys.executable, serve_script])
     port = int(os.environ.get("PORT", 8000))
     uvicorn.run(
         app,
@@ -0,0 +1,262 @@
+"""
+Offline Batch Scoring
+Scores every resume PDF against every job description PDF without the web
+server, e.g. for nightly re-scoring of the applicant pool.
+
+- Text is extracted in a process pool, one batch ahead of scoring
+- Job descriptions are processed once; each batch of resumes is embedded in a
+  single batched call and scored against all of them
+- Results stream to JSONL (one line per resume/JD pair) or to a Parquet
+  dataset (one file per batch; needs `pip install pyarrow`)
+- Progress is checkpointed after every batch; re-running the same command
+  continues where a killed run stopped
+
+Usage:
+    python batch_score.py --resumes resumes/ --jds jds/ --output scores.jsonl
+    python batch_score.py --resumes manifest.txt --jds jd.pdf --output scores.parquet --workers 8
+
+A manifest is a text file listing one PDF path per line (relative paths are
+resolved against the manifest's directory).
+"""
+
+import argparse
+import glob
+import hashlib
+import json
+import os
+import sys
+import time
+from concurrent.futures import Future, ProcessPoolExecutor
+from typing import Dict, List, Optional, Tuple
+
+from pdf_extraction import PDF_MAX_BYTES, PDF_MAX_PAGES, PDFExtractionError, extract_text
+
+CHECKPOINT_SUFFIX = ".checkpoint.json"
+
+
+def list_pdfs(source: str) -> List[str]:
+    """
+    PDF paths from a directory (sorted), a manifest file or a single PDF
+    """
+    if os.path.isdir(source):
+        return sorted(path for path in glob.glob(os.path.join(source, "*")) if path.lower().endswith(".pdf"))
+    if source.lower().endswith(".pdf"):
+        return [source]
+    base = os.path.dirname(os.path.abspath(source))
+    with open(source) as f:
+        return [os.path.join(base, line.strip()) for line in f
+                if line.strip() and not line.lstrip().startswith("#")]
+
+
+def extract_file(path: str) -> Tuple[str, Optional[str]]:
+    """
+    (text, error) for one PDF. Runs in worker processes, which read the file
+    themselves so only paths and text cross the process boundary.
+    """
+    try:
+        with open(path, "rb") as f:
+            return extract_text(f.read(), PDF_MAX_PAGES, PDF_MAX_BYTES), None
+    except (OSError, PDFExtractionError) as e:
+        return "", f"{type(e).__name__}: {e}"
+
+
+class JsonlWriter:
+    """
+    One JSON object per line. The checkpoint stores the byte offset of the last
+    complete batch; anything written after it is truncated on resume.
+    """
+
+    def __init__(self, path: str):
+        self.path = path
+        self._file = open(path, "ab")
+
+    def restore(self, state: Optional[int]) -> None:
+        self._file.truncate(state or 0)
+        self._file.seek(0, os.SEEK_END)
+
+    def write(self, rows: List[Dict]) -> None:
+        self._file.write("".join(json.dumps(row) + "\n" for row in rows).encode("utf-8"))
+
+    def commit(self) -> int:
+        self._file.flush()
+        os.fsync(self._file.fileno())
+        return self._file.tell()
+
+    def close(self) -> None:
+        self._file.close()
+
+
+class ParquetWriter:
+    """
+    A directory of part files, one per batch. Nested result fields are stored
+    as JSON strings so every part has the same flat schema.
+    """
+
+    TEXT = ("resume", "job_description", "error")
+    NUMERIC = ("overall_match_percentage", "text_similarity_score", "jd_experience_years",
+               "resume_experience_years", "experience_match_score")
+    NESTED = ("skill_match_scores", "resume_skills", "job_description_skills", "matched_skills", "missing_skills",
+              "resume_roles")
+
+    def __init__(self, path: str):
+        try:
+            import pyarrow
+            import pyarrow.parquet
+        except ImportError as e:
+            raise ImportError("Parquet output requires `pip install pyarrow`; use a .jsonl output instead") from e
+        self._pyarrow = pyarrow
+        # Fixed schema, so batches made only of failed extractions still match the others
+        self._schema = pyarrow.schema(
+            [(name, pyarrow.string()) for name in self.TEXT] +
+            [(name, pyarrow.float64()) for name in self.NUMERIC] +
+            [(name, pyarrow.string()) for name in self.NESTED]
+        )
+        self.path = path
+        self._parts = 0
+        os.makedirs(path, exist_ok=True)
+
+    def _part_path(self, index: int) -> str:
+        return os.path.join(self.path, f"part-{index:06d}.parquet")
+
+    def restore(self, state: Optional[int]) -> None:
+        self._parts = state or 0
+        for part in glob.glob(os.path.join(self.path, "part-*.parquet")):
+            if int(os.path.basename(part)[5:11]) >= self._parts:
+                os.remove(part)
+
+    def write(self, rows: List[Dict]) -> None:
+        if not rows:
+            return
+        flat = [{name: json.dumps(row[name]) if name in self.NESTED and row.get(name) is not None else row.get(name)
+                 for name in self._schema.names} for row in rows]
+        table = self._pyarrow.Table.from_pylist(flat, schema=self._schema)
+        self._pyarrow.parquet.write_table(table, self._part_path(self._parts))
+        self._parts += 1
+
+    def commit(self) -> int:
+        return self._parts
+
+    def close(self) -> None:
+        pass
+
+
+def open_writer(path: str):
+    return ParquetWriter(path) if path.lower().endswith(".parquet") else JsonlWriter(path)
+
+
+def run_signature(resume_paths: List[str], jd_paths: List[str]) -> str:
+    """
+    Identifies a run's inputs, so a checkpoint is only resumed by the same command
+    """
+    digest = hashlib.sha256()
+    for path in resume_paths + ["\0"] + jd_paths:
+        digest.update(os.path.abspath(path).encode("utf-8") + b"\n")
+    return digest.hexdigest()
+
+
+def load_checkpoint(path: str, signature: str) -> Dict:
+    if not os.path.exists(path):
+        return {"signature": signature, "resumes_done": 0, "writer_state": None}
+    with open(path) as f:
+        checkpoint = json.load(f)
+    if checkpoint["signature"] != signature:
+        raise SystemExit(f"{path} belongs to a run with different inputs; delete it or pass --restart")
+    return checkpoint
+
+
+def save_checkpoint(path: str, checkpoint: Dict) -> None:
+    tmp = path + ".tmp"
+    with open(tmp, "w") as f:
+        json.dump(checkpoint, f)
+    os.replace(tmp, path)
+
+
+def score_rows(matcher, resume_paths: List[str], extracted: List[Tuple[str, Optional[str]]],
+               jd_paths: List[str], jd_features) -> List[Dict]:
+    """
+    One row per (resume, JD) pair; resumes that failed extraction get one error row
+    """
+    usable = [(path, text) for path, (text, error) in zip(resume_paths, extracted) if not error]
+    rows = [{"resume": path, "job_description": None, "error": error}
+            for path, (_, error) in zip(resume_paths, extracted) if error]
+    if usable:
+        resumes, _ = matcher.extract_features([text for _, text in usable], [])
+        grid = matcher.score_features(resumes, jd_features)
+        for (path, _), results in zip(usable, grid):
+            rows.extend({"resume": path, "job_description": jd_path, "error": None, **result}
+                        for jd_path, result in zip(jd_paths, results))
+    return rows
+
+
+def main(argv: Optional[List[str]] = None) -> None:
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--resumes", required=True, help="directory, manifest or PDF of resumes")
+    parser.add_argument("--jds", required=True, help="directory, manifest or PDF of job descriptions")
+    parser.add_argument("--output", required=True, help="results path: *.jsonl or *.parquet")
+    parser.add_argument("--batch-size", type=int, default=256, help="resumes embedded per batch")
+    parser.add_argument("--workers", type=int, default=os.cpu_count() or 1, help="PDF extraction processes")
+    parser.add_argument("--restart", action="store_true", help="ignore an existing checkpoint and start over")
+    args = parser.parse_args(argv)
+
+    resume_paths, jd_paths = list_pdfs(args.resumes), list_pdfs(args.jds)
+    if not resume_paths or not jd_paths:
+        raise SystemExit("Need at least one resume and one job description PDF")
+
+    checkpoint_path = args.output + CHECKPOINT_SUFFIX
+    if args.restart and os.path.exists(checkpoint_path):
+        os.remove(checkpoint_path)
+    checkpoint = load_checkpoint(checkpoint_path, run_signature(resume_paths, jd_paths))
+    writer = open_writer(args.output)
+    writer.restore(checkpoint["writer_state"])
+    start_index = checkpoint["resumes_done"]
+    if start_index:
+        print(f"Resuming after {start_index}/{len(resume_paths)} resumes")
+
+    # Imported after argument parsing so --help stays fast
+    from matching_engine import get_matcher
+    matcher = get_matcher()
+    started = time.perf_counter()
+
+    with ProcessPoolExecutor(max_workers=max(1, args.workers)) as pool:
+        jd_extracted = list(pool.map(extract_file, jd_paths))
+        failed = [(path, error) for path, (_, error) in zip(jd_paths, jd_extracted) if error]
+        if failed:
+            raise SystemExit("Could not extract job descriptions: " + "; ".join(f"{p}: {e}" for p, e in failed))
+        _, jd_features = matcher.extract_features([], [text for text, _ in jd_extracted])
+        print(f"Prepared {len(jd_paths)} job descriptions in {time.perf_counter() - started:.1f}s")
+
+        batches = [resume_paths[i:i + args.batch_size] for i in range(start_index, len(resume_paths), args.batch_size)]
+
+        def submit(batch: List[str]) -> List[Future]:
+            return [pool.submit(extract_file, path) for path in batch]
+
+        pending = submit(batches[0]) if batches else []
+        done, errors, pairs = start_index, 0, 0
+        scoring_started = time.perf_counter()
+        try:
+            for number, batch in enumerate(batches):
+                extracted = [future.result() for future in pending]
+                # Extraction of the next batch overlaps with embedding and scoring of this one
+                pending = submit(batches[number + 1]) if number + 1 < len(batches) else []
+                rows = score_rows(matcher, batch, extracted, jd_paths, jd_features)
+                writer.write(rows)
+                done += len(batch)
+                errors += sum(1 for _, error in extracted if error)
+                pairs += sum(1 for row in rows if row["error"] is None)
+                checkpoint.update(resumes_done=done, writer_state=writer.commit())
+                save_checkpoint(checkpoint_path, checkpoint)
+
+                elapsed = time.perf_counter() - scoring_started
+                processed = done - start_index
+                print(f"{done}/{len(resume_paths)} resumes, {processed / elapsed:.1f} docs/sec, "
+                      f"{pairs / elapsed:.1f} pairs/sec, {errors} failed")
+        finally:
+            writer.close()
+
+    elapsed = time.perf_counter() - started
+    print(f"Scored {done - start_index} resumes against {len(jd_paths)} job descriptions in {elapsed:.1f}s "
+          f"({(done - start_index) / elapsed:.1f} docs/sec); results in {args.output}")
+
+
+if __name__ == "__main__":
+    sys.exit(main())
@@ -0,0 +1,79 @@
+"""
+Benchmark: encode latency and resident memory of each embedding backend.
+
+Every backend is measured in its own subprocess so peak RSS reflects only that
+backend (torch is never imported by the ONNX runs once their export exists).
+Run check_backend_parity.py first so the ONNX exports are already on disk;
+otherwise the export itself inflates the ONNX memory numbers.
+
+Usage: python benchmarks/bench_embedding_backends.py [--model all-MiniLM-L6-v2]
+"""
+
+import argparse
+import json
+import os
+import resource
+import statistics
+import subprocess
+import sys
+import time
+
+sys.path.insert(0, os.path.join(os.path.dirname(os.path.abspath(__file__)), '..'))
+
+BACKENDS = ["torch", "onnx", "onnx-int8"]
+BATCH_SIZES = [1, 2, 32]
+REPEATS = 10
+SENTENCE = ("experienced software engineer building python and kubernetes services on aws "
+            "with a focus on reliability, observability and developer tooling")
+
+
+def peak_rss_mb() -> float:
+    peak = resource.getrusage(resource.RUSAGE_SELF).ru_maxrss
+    # ru_maxrss is kilobytes on Linux and bytes on macOS
+    return peak / (1024 * 1024) if sys.platform == "darwin" else peak / 1024
+
+
+def measure(backend_name: str, model: str) -> dict:
+    from embedding_backends import create_embedding_backend
+
+    baseline = peak_rss_mb()
+    start = time.perf_counter()
+    backend = create_embedding_backend(backend_name, model)
+    load_s = time.perf_counter() - start
+    backend.encode([SENTENCE] * 4)
+
+    latencies = {}
+    for batch_size in BATCH_SIZES:
+        texts = [f"{SENTENCE} {i}" for i in range(batch_size)]
+        timings = []
+        for _ in range(REPEATS):
+            start = time.perf_counter()
+            backend.encode(texts)
+            timings.append((time.perf_counter() - start) * 1000)
+        latencies[batch_size] = statistics.median(timings)
+    return {"backend": backend_name, "load_s": load_s, "baseline_rss_mb": baseline,
+            "peak_rss_mb": peak_rss_mb(), "latency_ms": latencies}
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument('--model', default=os.environ.get("EMBEDDING_MODEL", 'all-MiniLM-L6-v2'))
+    parser.add_argument('--child', help=argparse.SUPPRESS)
+    args = parser.parse_args()
+
+    if args.child:
+        print(json.dumps(measure(args.child, args.model)))
+        return
+
+    print(f"{'backend':<10} {'load s':>7} {'peak RSS MB':>12}" +
+          ''.join(f" {f'batch {b} ms':>11}" for b in BATCH_SIZES))
+    for backend in BACKENDS:
+        output = subprocess.run([sys.executable, os.path.abspath(__file__), '--model', args.model,
+                                 '--child', backend], capture_output=True, text=True, check=True)
+        result = json.loads(output.stdout.strip().splitlines()[-1])
+        print(f"{backend:<10} {result['load_s']:>7.2f} {result['peak_rss_mb']:>12.1f}" +
+              ''.join(f" {result['latency_ms'][str(b)]:>11.2f}" for b in BATCH_SIZES))
+
+
+if __name__ == '__main__':
+    main()
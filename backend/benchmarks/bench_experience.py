@@ -0,0 +1,82 @@
+"""
+Experience extraction benchmark on large resume sets.
+
+Generates `--count` synthetic resumes of `--pages` pages (plus as many job
+descriptions) and reports documents per second and MB/s of text for
+extract_experience_many, as the bulk and offline paths call it. It also
+reports p50/p95 milliseconds per document for single-document extraction.
+With `--workers N` the resume set is also split across N processes, as an
+offline job would be.
+
+Usage: python benchmarks/bench_experience.py [--count 10000] [--pages 2] [--workers 4]
+"""
+
+import argparse
+import os
+import statistics
+import sys
+import time
+from concurrent.futures import ProcessPoolExecutor
+from typing import List
+
+sys.path.insert(0, os.path.join(os.path.dirname(os.path.abspath(__file__)), '..'))
+
+from experience_extraction import extract_experience, extract_experience_many
+from synthetic_documents import job_description_text, resume_text
+
+
+def _years_of_chunk(texts: List[str]) -> List:
+    return [profile.years for profile in extract_experience_many(texts)]
+
+
+def report(name: str, texts: List[str], seconds: float) -> None:
+    megabytes = sum(len(text) for text in texts) / 1e6
+    print(f"{name:<28} {len(texts) / seconds:>10.0f} docs/s {megabytes / seconds:>8.1f} MB/s")
+
+
+def main() -> int:
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--count", type=int, default=10000)
+    parser.add_argument("--pages", type=int, default=2)
+    parser.add_argument("--workers", type=int, default=1)
+    args = parser.parse_args()
+
+    resumes = [resume_text(args.pages, seed) for seed in range(args.count)]
+    jds = [job_description_text(1, seed) for seed in range(args.count)]
+    print(f"{args.count} resumes of {args.pages} pages ({sum(map(len, resumes)) / 1e6:.1f} MB), "
+          f"{args.count} one-page job descriptions")
+
+    started = time.perf_counter()
+    profiles = extract_experience_many(resumes)
+    report("resumes, batch", resumes, time.perf_counter() - started)
+    started = time.perf_counter()
+    extract_experience_many(jds, requirement=True)
+    report("job descriptions, batch", jds, time.perf_counter() - started)
+
+    latencies = []
+    for text in resumes[:1000]:
+        started = time.perf_counter()
+        extract_experience(text)
+        latencies.append((time.perf_counter() - started) * 1000)
+    latencies.sort()
+    print(f"{'resume, single':<28} p50 {statistics.median(latencies):.3f} ms, "
+          f"p95 {latencies[int(len(latencies) * 0.95)]:.3f} ms")
+
+    if args.workers > 1:
+        size = -(-len(resumes) // (args.workers * 4))
+        chunks = [resumes[i:i + size] for i in range(0, len(resumes), size)]
+        with ProcessPoolExecutor(args.workers) as pool:
+            # Start the processes before timing
+            list(pool.map(_years_of_chunk, [[resumes[0]]] * args.workers))
+            started = time.perf_counter()
+            list(pool.map(_years_of_chunk, chunks))
+            report(f"resumes, {args.workers} processes", resumes, time.perf_counter() - started)
+
+    roles = sum(len(profile.roles) for profile in profiles)
+    print(f"{roles / len(profiles):.1f} roles per resume, "
+          f"{sum(profile.years is not None for profile in profiles) / len(profiles):.0%} with a value")
+    return 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
@@ -0,0 +1,100 @@
+"""
+Microbenchmark: per-document normalisation cost within one match request.
+
+A request used to run the eight-substitution preprocess_text twice per
+document (once for skill extraction, once for similarity) and tokenize the
+result for the lexicon. The new path normalises once with the combined
+patterns, and the second consumer is served from the per-document memo.
+
+Usage: python benchmarks/bench_normalization.py [--pages 1 5 20]
+"""
+
+import argparse
+import os
+import random
+import re
+import statistics
+import sys
+import time
+
+sys.path.insert(0, os.path.join(os.path.dirname(os.path.abspath(__file__)), '..'))
+
+from tech_mappings import SKILL_LEXICON
+from text_normalization import normalize, normalize_document, normalize_text
+
+
+def reference_preprocess(text: str) -> str:
+    """
+    The original ResumeJobMatcher.preprocess_text, kept verbatim as the golden
+    reference (tests/test_text_normalization.py checks normalize against it)
+    """
+    text = text.lower()
+    text = re.sub(r'\s+', ' ', text)
+    text = re.sub(r'[^\w\s\-\+\#\.]', ' ', text)
+    text = re.sub(r'\bc\+\+\b', 'cpp', text)
+    text = re.sub(r'\bc#\b', 'csharp', text)
+    text = re.sub(r'\bf#\b', 'fsharp', text)
+    text = re.sub(r'\bnode\.js\b', 'nodejs', text)
+    text = re.sub(r'\breact\.js\b', 'reactjs', text)
+    text = re.sub(r'\bvue\.js\b', 'vuejs', text)
+    return text.strip()
+
+
+WORDS_PER_PAGE = 500
+REPEATS = 20
+
+VOCABULARY = ("Led the design of REST APIs in Python/Django, deployed with Docker & Kubernetes on AWS; "
+              "built React.js and Node.js front-ends, C++ services, C# tooling (3-5 yrs), "
+              "improved latency by 40% — mentored 4 engineers • owned CI/CD pipelines.").split()
+
+
+def build_document(pages: int, rng: random.Random) -> str:
+    lines = []
+    for page in range(1, pages + 1):
+        words = [rng.choice(VOCABULARY) for _ in range(WORDS_PER_PAGE)]
+        lines.append(f"--- Page {page} ---\n" + '\n'.join(' '.join(words[i:i + 12]) for i in range(0, len(words), 12)))
+    return '\n\n'.join(lines)
+
+
+def legacy_request(text: str) -> None:
+    # Skill extraction and similarity each preprocessed the document
+    SKILL_LEXICON.tokenize(reference_preprocess(text))
+    reference_preprocess(text)
+
+
+def memoized_request(text: str) -> None:
+    normalize_document(text).tokens
+    normalize_document(text).text
+
+
+def median_ms(fn, text: str, clear_memo: bool = False) -> float:
+    timings = []
+    for _ in range(REPEATS):
+        if clear_memo:
+            normalize_document.cache_clear()
+        start = time.perf_counter()
+        fn(text)
+        timings.append((time.perf_counter() - start) * 1000)
+    return statistics.median(timings)
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument('--pages', type=int, nargs='+', default=[1, 5, 20])
+    args = parser.parse_args()
+
+    rng = random.Random(0)
+    print(f"{'pages':>5} {'legacy text':>12} {'single-pass':>12} {'legacy req':>11} {'memo req':>9} {'speedup':>8}")
+    for pages in args.pages:
+        text = build_document(pages, rng)
+        assert normalize(text).text == reference_preprocess(text)
+        legacy_text = median_ms(reference_preprocess, text)
+        single_pass = median_ms(normalize_text, text)
+        legacy = median_ms(legacy_request, text)
+        memoized = median_ms(memoized_request, text, clear_memo=True)
+        print(f"{pages:>5} {legacy_text:>10.2f}ms {single_pass:>10.2f}ms {legacy:>9.2f}ms "
+              f"{memoized:>7.2f}ms {legacy / memoized:>7.1f}x")
+
+
+if __name__ == '__main__':
+    main()
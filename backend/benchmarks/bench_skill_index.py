@@ -0,0 +1,69 @@
+"""
+Benchmark: boolean skill queries over the inverted skill index.
+
+Synthetic resumes draw a Zipf-like handful of skills from TECH_MAPPINGS, so
+popular skills have long posting lists and rare ones short lists, as in a
+real corpus. Reports index build time and per-query latency.
+
+Usage: python benchmarks/bench_skill_index.py [--documents 200000]
+"""
+
+import argparse
+import os
+import statistics
+import sys
+import time
+
+import numpy as np
+
+sys.path.insert(0, os.path.join(os.path.dirname(os.path.abspath(__file__)), '..'))
+
+from skill_index import SkillIndex
+from tech_mappings import TECH_MAPPINGS
+
+QUERIES = [
+    "python",
+    "kubernetes AND (go OR rust) AND NOT php",
+    "category:javascript AND react AND NOT angular",
+    "(aws OR azure OR gcp) AND docker AND terraform",
+    "NOT (java OR c#)",
+]
+REPEATS = 200
+
+
+def synthetic_documents(count: int, rng: np.random.Generator):
+    pairs = [(category, skill) for category, skills in TECH_MAPPINGS.items() for skill in skills]
+    weights = 1.0 / np.arange(1, len(pairs) + 1)
+    weights /= weights.sum()
+    documents = []
+    for picks in (rng.choice(len(pairs), size=rng.integers(3, 15), p=weights) for _ in range(count)):
+        skills = {}
+        for pick in picks:
+            category, skill = pairs[pick]
+            skills.setdefault(category, set()).add(skill)
+        documents.append({category: sorted(found) for category, found in skills.items()})
+    return documents
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument('--documents', type=int, default=200_000)
+    args = parser.parse_args()
+
+    documents = synthetic_documents(args.documents, np.random.default_rng(0))
+    start = time.perf_counter()
+    index = SkillIndex(documents)
+    print(f"Indexed {args.documents} documents, {len(index.postings)} keys in "
+          f"{(time.perf_counter() - start) * 1000:.0f} ms")
+
+    for query in QUERIES:
+        timings = []
+        for _ in range(REPEATS):
+            start = time.perf_counter()
+            matches = index.count(query)
+            timings.append((time.perf_counter() - start) * 1e6)
+        print(f"{statistics.median(timings):>9.1f} us  {matches:>7} matches  {query}")
+
+
+if __name__ == '__main__':
+    main()
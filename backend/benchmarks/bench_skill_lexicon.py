@@ -0,0 +1,111 @@
+"""
+Microbenchmark: skill extraction cost on a 10-page resume as the lexicon grows.
+
+Compares the previous per-call approach (rebuild the skill set, then join
+unigrams/bigrams/trigrams per token) with the compiled SkillLexicon automaton.
+The legacy timings grow with the lexicon; the automaton's stay flat.
+
+Usage: python benchmarks/bench_skill_lexicon.py
+"""
+
+import os
+import random
+import statistics
+import sys
+import time
+from collections import defaultdict
+
+sys.path.insert(0, os.path.join(os.path.dirname(os.path.abspath(__file__)), '..'))
+
+import nltk
+from nltk.tokenize import word_tokenize
+
+nltk.data.path.append(os.path.join(os.path.dirname(os.path.abspath(__file__)), '..', 'nltk_data'))
+
+from tech_mappings import TECH_MAPPINGS, SkillLexicon
+
+WORDS_PER_PAGE = 500
+PAGES = 10
+LEXICON_SCALES = [1, 4, 16, 64]
+REPEATS = 5
+
+FILLER = ("led designed built shipped the team project platform service customers "
+          "improved reduced latency by percent across multiple regions and owned "
+          "delivery of features for internal tools with stakeholders").split()
+
+
+def build_mappings(scale: int) -> dict:
+    """TECH_MAPPINGS padded with synthetic categories to `scale` times its size."""
+    mappings = dict(TECH_MAPPINGS)
+    for copy in range(1, scale):
+        for category, skills in TECH_MAPPINGS.items():
+            mappings[f'{category}_synthetic{copy}'] = [f'{skill}x{copy}' for skill in skills]
+    return mappings
+
+
+def build_resume(seed: int = 7) -> str:
+    rng = random.Random(seed)
+    skills = [skill for skills in TECH_MAPPINGS.values() for skill in skills]
+    words = []
+    for _ in range(WORDS_PER_PAGE * PAGES):
+        words.append(rng.choice(skills) if rng.random() < 0.1 else rng.choice(FILLER))
+    return ' '.join(words)
+
+
+def legacy_extract(text: str, mappings: dict, skill_to_category: dict) -> dict:
+    found_skills = defaultdict(set)
+    all_skills = set()
+    for skills_list in mappings.values():
+        all_skills.update(skill.lower() for skill in skills_list)
+    words = word_tokenize(text)
+    for word in words:
+        if word in all_skills:
+            for category in skill_to_category.get(word, []):
+                found_skills[category].add(word)
+    for i in range(len(words)):
+        if i < len(words) - 1:
+            bigram = ' '.join(words[i:i+2])
+            if bigram in all_skills:
+                for category in skill_to_category.get(bigram, []):
+                    found_skills[category].add(bigram)
+        if i < len(words) - 2:
+            trigram = ' '.join(words[i:i+3])
+            if trigram in all_skills:
+                for category in skill_to_category.get(trigram, []):
+                    found_skills[category].add(trigram)
+    return dict(found_skills)
+
+
+def median_ms(fn, *args) -> float:
+    timings = []
+    for _ in range(REPEATS):
+        start = time.perf_counter()
+        fn(*args)
+        timings.append((time.perf_counter() - start) * 1000)
+    return statistics.median(timings)
+
+
+def main():
+    text = build_resume()
+    tokens = word_tokenize(text)
+    print(f"Resume: {PAGES} pages, {len(tokens)} tokens, {len(text)} characters")
+    print(f"{'scale':>5} {'skills':>8} {'legacy ms':>10} {'lexicon ms':>11} {'compile ms':>11}")
+
+    for scale in LEXICON_SCALES:
+        mappings = build_mappings(scale)
+        skill_to_category = defaultdict(list)
+        for category, skills in mappings.items():
+            for skill in skills:
+                skill_to_category[skill].append(category)
+
+        start = time.perf_counter()
+        lexicon = SkillLexicon(mappings)
+        compile_ms = (time.perf_counter() - start) * 1000
+
+        legacy_ms = median_ms(legacy_extract, text, mappings, skill_to_category)
+        lexicon_ms = median_ms(lexicon.find_skills, text)
+        print(f"{scale:>5} {len(skill_to_category):>8} {legacy_ms:>10.2f} {lexicon_ms:>11.2f} {compile_ms:>11.2f}")
+
+
+if __name__ == '__main__':
+    main()
@@ -0,0 +1,93 @@
+"""
+Benchmark: scoring one resume against many stored job descriptions.
+
+Builds skill features for `--jds` synthetic job descriptions and a few
+resumes with the skill lexicon, gives them random unit embeddings (the model
+is never loaded, as with a warm embedding cache) and times
+ResumeJobMatcher.score_features, which takes the per-category scores of a
+whole JD batch from the skill matrix, against scoring each pair with
+_combine_scores' set algebra. Both must produce byte-identical results.
+
+Usage: python benchmarks/bench_skill_scoring.py [--jds 5000] [--resumes 3] [--repeats 3]
+"""
+
+import argparse
+import json
+import os
+import random
+import sys
+import time
+from typing import Dict, List
+
+import numpy as np
+
+sys.path.insert(0, os.path.join(os.path.dirname(os.path.abspath(__file__)), '..'))
+
+from matching_engine import DocumentFeatures, ResumeJobMatcher
+from synthetic_documents import SKILLS, job_description_text, resume_text
+from tech_mappings import SKILL_LEXICON
+from text_normalization import normalize
+
+
+def features(text: str, years, rng: np.random.Generator) -> DocumentFeatures:
+    vector = rng.standard_normal((1, 384)).astype(np.float32)
+    return DocumentFeatures(SKILL_LEXICON.find_skills_in_tokens(normalize(text).tokens), years,
+                            vector / np.linalg.norm(vector))
+
+
+def short_posting(seed: int) -> str:
+    """
+    A job description naming 8-20 skills, closer to a real posting than the one-page generator
+    """
+    rng = random.Random(f"posting-{seed}")
+    return f"{rng.randint(1, 8)}+ years of experience. " + ", ".join(rng.sample(SKILLS, rng.randint(8, 20)))
+
+
+def per_pair(matcher: ResumeJobMatcher, resumes: List[DocumentFeatures],
+             jds: List[DocumentFeatures]) -> List[List[Dict]]:
+    similarity = matcher.pooled_similarity([resume.vectors for resume in resumes], [jd.vectors for jd in jds])
+    return [[matcher._combine_scores(resume.skills, jd.skills, float(similarity[r, j]),
+                                     resume.experience_years, jd.experience_years, resume.roles)
+             for j, jd in enumerate(jds)]
+            for r, resume in enumerate(resumes)]
+
+
+def best_of(repeats: int, run) -> float:
+    timings = []
+    for _ in range(repeats):
+        started = time.perf_counter()
+        run()
+        timings.append(time.perf_counter() - started)
+    return min(timings)
+
+
+def main() -> int:
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument('--jds', type=int, default=5000)
+    parser.add_argument('--resumes', type=int, default=3)
+    parser.add_argument('--repeats', type=int, default=3)
+    args = parser.parse_args()
+
+    rng = np.random.default_rng(0)
+    matcher = ResumeJobMatcher()
+    resumes = [features(resume_text(1, seed), [None, 4.0][seed % 2], rng) for seed in range(args.resumes)]
+    corpora = {
+        "short postings": [features(short_posting(seed), [None, 3.0][seed % 2], rng) for seed in range(args.jds)],
+        "one-page JDs": [features(job_description_text(1, seed), [None, 3.0][seed % 2], rng)
+                         for seed in range(args.jds)],
+    }
+
+    for name, jds in corpora.items():
+        skills = np.mean([sum(len(found) for found in jd.skills.values()) for jd in jds])
+        batched = best_of(args.repeats, lambda: matcher.score_features(resumes, jds))
+        pairwise = best_of(args.repeats, lambda: per_pair(matcher, resumes, jds))
+        identical = json.dumps(matcher.score_features(resumes, jds)) == json.dumps(per_pair(matcher, resumes, jds))
+        pairs = len(resumes) * len(jds)
+        print(f"{name:<15} {skills:>5.1f} skills/JD  skill matrix {batched / pairs * 1e6:>6.1f} us/pair  "
+              f"set algebra {pairwise / pairs * 1e6:>6.1f} us/pair  ({pairwise / batched:.1f}x)  "
+              f"identical: {identical}")
+    return 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
@@ -0,0 +1,296 @@
+"""
+End-to-end benchmark suite for the matching pipeline, with JSON baselines.
+
+`run` measures, on synthetic resume/JD documents of several sizes:
+- microbenchmarks of preprocess_text, extract_skills_from_text,
+  _extract_experience_years and calculate_text_similarity (cold: unique text,
+  nothing cached; warm: repeated text served from the caches)
+- an HTTP load test of POST /process-docs/ against the app served by an
+  in-process uvicorn, with concurrent clients uploading generated PDFs
+
+and writes every result to a JSON file. Requests the server sheds with 503
+(see PDF_MAX_PENDING / INFERENCE_MAX_PENDING) count towards the error rate,
+not the latency percentiles. `compare` checks a run against a baseline and
+exits non-zero when any metric regressed beyond the threshold.
+
+Usage:
+    python benchmarks/bench_suite.py run --output benchmarks/baselines/main.json
+    python benchmarks/bench_suite.py run --quick --output /tmp/branch.json
+    python benchmarks/bench_suite.py compare benchmarks/baselines/main.json /tmp/branch.json --threshold 0.10
+
+Baselines are only comparable on the same machine and settings; `compare`
+warns when the recorded environment differs.
+"""
+
+import argparse
+import asyncio
+import json
+import os
+import platform
+import statistics
+import sys
+import threading
+import time
+from datetime import datetime, timezone
+from typing import Callable, Dict, List
+
+sys.path.insert(0, os.path.join(os.path.dirname(os.path.abspath(__file__)), '..'))
+# Per-request logging would dominate the load test's output
+os.environ.setdefault("LOG_LEVEL", "WARNING")
+
+import matching_engine
+from synthetic_documents import SIZES, job_description_text, pdf_bytes, resume_text
+from text_normalization import normalize_document
+
+RESULT_VERSION = 1
+
+
+def _metric(value: float, unit: str, better: str = "lower") -> Dict:
+    return {"value": round(value, 4), "unit": unit, "better": better}
+
+
+def _percentile(values: List[float], fraction: float) -> float:
+    ordered = sorted(values)
+    return ordered[min(len(ordered) - 1, int(len(ordered) * fraction))]
+
+
+def time_calls(fn: Callable[[int], object], repeats: int) -> List[float]:
+    """
+    Milliseconds per call of fn(iteration), after one untimed call
+    """
+    fn(-1)
+    timings = []
+    for iteration in range(repeats):
+        start = time.perf_counter()
+        fn(iteration)
+        timings.append((time.perf_counter() - start) * 1000)
+    return timings
+
+
+def run_microbenchmarks(matcher, sizes: Dict[str, int], repeats: int) -> Dict[str, Dict]:
+    metrics = {}
+    for size, pages in sizes.items():
+        resume = resume_text(pages)
+        jd = job_description_text(pages)
+
+        def cold(fn):
+            # A unique suffix per iteration defeats the normalisation memo and the embedding cache
+            return lambda i: fn(f"{resume}\nref-{size}-{i}-{time.perf_counter_ns()}")
+
+        def preprocess(text):
+            normalize_document.cache_clear()
+            return matcher.preprocess_text(text)
+
+        def skills(text):
+            normalize_document.cache_clear()
+            return matcher.extract_skills_from_text(text)
+
+        cases = {
+            "preprocess_text": cold(preprocess),
+            "extract_skills_from_text": cold(skills),
+            "extract_experience_years": lambda i: matcher._extract_experience_years(resume, False),
+            "text_similarity_cold": cold(lambda text: matcher.calculate_text_similarity(text, jd)),
+            "text_similarity_warm": lambda i: matcher.calculate_text_similarity(resume, jd),
+        }
+        for name, fn in cases.items():
+            timings = time_calls(fn, repeats)
+            metrics[f"micro.{name}.{size}.p50_ms"] = _metric(statistics.median(timings), "ms")
+            metrics[f"micro.{name}.{size}.p95_ms"] = _metric(_percentile(timings, 0.95), "ms")
+        print(f"  microbenchmarks: {size} ({pages} pages) done")
+    return metrics
+
+
+class InProcessServer:
+    """
+    The FastAPI app served by uvicorn on an ephemeral port in a background thread
+    """
+
+    def __init__(self):
+        import uvicorn
+        from app import app
+        self.server = uvicorn.Server(uvicorn.Config(app, host="127.0.0.1", port=0, log_level="warning"))
+        self.thread = threading.Thread(target=self.server.run, name="bench-uvicorn", daemon=True)
+
+    def __enter__(self) -> str:
+        self.thread.start()
+        while not self.server.started:
+            if not self.thread.is_alive():
+                raise RuntimeError("uvicorn failed to start")
+            time.sleep(0.05)
+        port = self.server.servers[0].sockets[0].getsockname()[1]
+        return f"http://127.0.0.1:{port}"
+
+    def __exit__(self, *exc) -> None:
+        self.server.should_exit = True
+        self.thread.join(timeout=10)
+
+
+async def _load(base_url: str, payloads: List[Dict], concurrency: int, timeout: float) -> Dict:
+    import httpx
+
+    queue: asyncio.Queue = asyncio.Queue()
+    for payload in payloads:
+        queue.put_nowait(payload)
+    latencies: List[float] = []
+    statuses: Dict[str, int] = {}
+
+    async def client(http: "httpx.AsyncClient"):
+        while not queue.empty():
+            files = queue.get_nowait()
+            start = time.perf_counter()
+            try:
+                response = await http.post("/process-docs/", files=files)
+                status = str(response.status_code)
+            except httpx.HTTPError as e:
+                status = type(e).__name__
+            statuses[status] = statuses.get(status, 0) + 1
+            # Shed (503) and failed requests return early; keep them out of the latency figures
+            if status == "200":
+                latencies.append(time.perf_counter() - start)
+
+    async with httpx.AsyncClient(base_url=base_url, timeout=timeout) as http:
+        # Wait for the background model warm-up so it is not billed to the first requests
+        while (await http.get("/ready")).status_code != 200:
+            await asyncio.sleep(0.2)
+        start = time.perf_counter()
+        await asyncio.gather(*(client(http) for _ in range(concurrency)))
+        wall = time.perf_counter() - start
+    return {"latencies": latencies, "statuses": statuses, "wall": wall}
+
+
+def run_load_test(sizes: Dict[str, int], requests: int, concurrency: int, timeout: float) -> Dict[str, Dict]:
+    metrics = {}
+    with InProcessServer() as base_url:
+        for size, pages in sizes.items():
+            jd = pdf_bytes(job_description_text(pages))
+            # Unique resumes, so each request parses and embeds its resume; the JD is shared as in production
+            payloads = [{"resume": ("resume.pdf", pdf_bytes(resume_text(pages, seed)), "application/pdf"),
+                         "job_description": ("jd.pdf", jd, "application/pdf")}
+                        for seed in range(requests)]
+            result = asyncio.run(_load(base_url, payloads, concurrency, timeout))
+            latencies_ms = [seconds * 1000 for seconds in result["latencies"]]
+            metrics[f"http.process_docs.{size}.rps"] = _metric(len(latencies_ms) / result["wall"], "req/s", "higher")
+            metrics[f"http.process_docs.{size}.error_rate"] = _metric(1 - len(latencies_ms) / len(payloads), "fraction")
+            if latencies_ms:
+                metrics[f"http.process_docs.{size}.p50_ms"] = _metric(statistics.median(latencies_ms), "ms")
+                metrics[f"http.process_docs.{size}.p95_ms"] = _metric(_percentile(latencies_ms, 0.95), "ms")
+                metrics[f"http.process_docs.{size}.p99_ms"] = _metric(_percentile(latencies_ms, 0.99), "ms")
+            print(f"  load test: {size} ({pages} pages) {len(latencies_ms) / result['wall']:.1f} successful req/s, "
+                  f"statuses {result['statuses']}")
+    return metrics
+
+
+def environment() -> Dict:
+    return {
+        "python": platform.python_version(),
+        "platform": platform.platform(),
+        "cpu_count": os.cpu_count(),
+        "embedding_model": matching_engine.EMBEDDING_MODEL_NAME,
+        "embedding_backend": matching_engine.EMBEDDING_BACKEND,
+        "similarity_mode": matching_engine.SIMILARITY_MODE,
+    }
+
+
+def command_run(args) -> int:
+    sizes = {size: pages for size, pages in SIZES.items() if size in args.sizes}
+    if args.quick:
+        args.repeats, args.requests = min(args.repeats, 5), min(args.requests, 16)
+    metrics = {}
+    if not args.skip_micro:
+        print("Running microbenchmarks")
+        matcher = matching_engine.get_matcher()
+        matcher.embedding_backend.encode(["warm up the embedding model"])
+        metrics.update(run_microbenchmarks(matcher, sizes, args.repeats))
+    if not args.skip_http:
+        print(f"Running load test: {args.requests} requests, concurrency {args.concurrency}")
+        metrics.update(run_load_test(sizes, args.requests, args.concurrency, args.timeout))
+
+    result = {
+        "version": RESULT_VERSION,
+        "created": datetime.now(timezone.utc).isoformat(timespec="seconds"),
+        "environment": environment(),
+        "config": {"sizes": sizes, "repeats": args.repeats, "requests": args.requests,
+                   "concurrency": args.concurrency},
+        "metrics": metrics,
+    }
+    os.makedirs(os.path.dirname(os.path.abspath(args.output)), exist_ok=True)
+    with open(args.output, "w") as f:
+        json.dump(result, f, indent=2, sort_keys=True)
+    print(f"Wrote {len(metrics)} metrics to {args.output}")
+    return 0
+
+
+def compare(baseline: Dict, current: Dict, threshold: float, min_ms: float = 0.0) -> List[Dict]:
+    """
+    One row per metric present in both runs; `regressed` when it got worse by more
+    than `threshold`. Millisecond metrics that moved by less than `min_ms` are
+    treated as timer noise.
+    """
+    rows = []
+    for name, base in sorted(baseline["metrics"].items()):
+        now = current["metrics"].get(name)
+        if now is None:
+            continue
+        if base["value"] == 0:
+            change = 0.0 if now["value"] == 0 else float("inf")
+        else:
+            change = (now["value"] - base["value"]) / base["value"]
+        worse = change if base["better"] == "lower" else -change
+        # Error rates start at zero, so any new errors count as a regression
+        if base["unit"] == "fraction":
+            regressed = now["value"] > base["value"]
+        else:
+            regressed = worse > threshold and not (base["unit"] == "ms" and abs(now["value"] - base["value"]) < min_ms)
+        rows.append({"metric": name, "baseline": base["value"], "current": now["value"], "unit": base["unit"],
+                     "change": change, "regressed": regressed})
+    return rows
+
+
+def command_compare(args) -> int:
+    with open(args.baseline) as f:
+        baseline = json.load(f)
+    with open(args.current) as f:
+        current = json.load(f)
+    if baseline["environment"] != current["environment"]:
+        print("Warning: the runs were recorded in different environments:")
+        for key in sorted(set(baseline["environment"]) | set(current["environment"])):
+            if baseline["environment"].get(key) != current["environment"].get(key):
+                print(f"  {key}: {baseline['environment'].get(key)} -> {current['environment'].get(key)}")
+
+    rows = compare(baseline, current, args.threshold, args.min_ms)
+    print(f"{'metric':<52} {'baseline':>11} {'current':>11} {'change':>8}")
+    for row in rows:
+        flag = "  REGRESSION" if row["regressed"] else ""
+        print(f"{row['metric']:<52} {row['baseline']:>11.3f} {row['current']:>11.3f} {row['change']:>+7.1%}{flag}")
+    regressions = [row for row in rows if row["regressed"]]
+    print(f"{len(regressions)} of {len(rows)} metrics regressed by more than {args.threshold:.0%}")
+    return 1 if regressions else 0
+
+
+def main() -> int:
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    commands = parser.add_subparsers(dest="command", required=True)
+
+    run = commands.add_parser("run", help="run the suite and write a JSON result")
+    run.add_argument("--output", required=True, help="result JSON path")
+    run.add_argument("--sizes", nargs="+", choices=list(SIZES), default=list(SIZES))
+    run.add_argument("--repeats", type=int, default=30, help="timed calls per microbenchmark")
+    run.add_argument("--requests", type=int, default=64, help="HTTP requests per document size")
+    run.add_argument("--concurrency", type=int, default=8, help="concurrent HTTP clients")
+    run.add_argument("--timeout", type=float, default=120.0, help="HTTP request timeout in seconds")
+    run.add_argument("--quick", action="store_true", help="few repeats and requests, for a smoke run")
+    run.add_argument("--skip-micro", action="store_true")
+    run.add_argument("--skip-http", action="store_true")
+
+    diff = commands.add_parser("compare", help="compare a result against a baseline")
+    diff.add_argument("baseline")
+    diff.add_argument("current")
+    diff.add_argument("--threshold", type=float, default=0.10, help="allowed slowdown, e.g. 0.10 for 10%%")
+    diff.add_argument("--min-ms", type=float, default=0.1, help="ignore latency changes smaller than this")
+
+    args = parser.parse_args()
+    return command_run(args) if args.command == "run" else command_compare(args)
+
+
+if __name__ == '__main__':
+    sys.exit(main())
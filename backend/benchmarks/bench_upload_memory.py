@@ -0,0 +1,188 @@
+"""
+Memory benchmark: peak server RSS under concurrent large uploads.
+
+Starts the API with uvicorn in a subprocess, fires `--concurrency` simultaneous
+POST /process-docs/ requests whose resume is a `--file-mb` MB PDF (a short
+resume padded with a binary stream, like a scanned document), and samples the
+resident memory of the server and its PDF worker processes throughout.
+
+Three scenarios, each reported as the peak RSS growth over the RSS just before it:
+- request:   bodies above MAX_REQUEST_BYTES, refused from the Content-Length header
+- oversized: files above the per-file limit, refused with 413 before being read
+- accepted:  files within PDF_MAX_BYTES, parsed end to end
+
+Usage: python benchmarks/bench_upload_memory.py [--concurrency 50] [--file-mb 20]
+Needs `pip install psutil`. The server runs with this process's environment,
+so e.g. PDF_WORKERS or MAX_REQUEST_BYTES can be set on the command line.
+"""
+
+import argparse
+import asyncio
+import os
+import socket
+import subprocess
+import sys
+import threading
+import time
+from typing import Dict, List
+
+sys.path.insert(0, os.path.join(os.path.dirname(os.path.abspath(__file__)), '..'))
+
+from synthetic_documents import job_description_text, pdf_bytes, resume_text
+
+BACKEND_DIR = os.path.join(os.path.dirname(os.path.abspath(__file__)), '..')
+MB = 1000 * 1000
+
+
+def free_port() -> int:
+    with socket.socket() as sock:
+        sock.bind(("127.0.0.1", 0))
+        return sock.getsockname()[1]
+
+
+def tree_rss(process) -> int:
+    import psutil
+    total = 0
+    for member in [process] + process.children(recursive=True):
+        try:
+            total += member.memory_info().rss
+        except psutil.NoSuchProcess:
+            pass
+    return total
+
+
+class RssSampler:
+    """
+    Peak RSS of a process tree, sampled every few milliseconds on a background thread
+    """
+
+    def __init__(self, process, interval: float = 0.01):
+        self.process = process
+        self.interval = interval
+        self.peak = 0
+        self._stop = threading.Event()
+        self._thread = threading.Thread(target=self._run, daemon=True)
+
+    def _run(self) -> None:
+        while not self._stop.is_set():
+            self.peak = max(self.peak, tree_rss(self.process))
+            time.sleep(self.interval)
+
+    def __enter__(self) -> "RssSampler":
+        self._thread.start()
+        return self
+
+    def __exit__(self, *exc) -> None:
+        self._stop.set()
+        self._thread.join()
+
+
+async def fire(base_url: str, resume: bytes, jd: bytes, concurrency: int) -> Dict[str, int]:
+    import httpx
+
+    statuses: Dict[str, int] = {}
+    files = {"resume": ("resume.pdf", resume, "application/pdf"), "job_description": ("jd.pdf", jd, "application/pdf")}
+
+    async def client(http: "httpx.AsyncClient"):
+        try:
+            status = str((await http.post("/process-docs/", files=files)).status_code)
+        except httpx.HTTPError as e:
+            status = type(e).__name__
+        statuses[status] = statuses.get(status, 0) + 1
+
+    limits = httpx.Limits(max_connections=concurrency)
+    async with httpx.AsyncClient(base_url=base_url, timeout=600, limits=limits) as http:
+        await asyncio.gather(*(client(http) for _ in range(concurrency)))
+    return statuses
+
+
+async def announce(port: int, body_bytes: int, concurrency: int) -> Dict[str, int]:
+    """
+    Send only the headers of requests declaring a `body_bytes` body and read the status
+    """
+    statuses: Dict[str, int] = {}
+
+    async def client():
+        reader, writer = await asyncio.open_connection("127.0.0.1", port)
+        writer.write(f"POST /process-docs/ HTTP/1.1\r\nHost: 127.0.0.1\r\n"
+                     f"Content-Type: multipart/form-data; boundary=bench\r\n"
+                     f"Content-Length: {body_bytes}\r\n\r\n".encode("ascii"))
+        await writer.drain()
+        status = (await reader.readline()).split()[1].decode("ascii")
+        statuses[status] = statuses.get(status, 0) + 1
+        writer.close()
+
+    await asyncio.gather(*(client() for _ in range(concurrency)))
+    return statuses
+
+
+async def wait_ready(base_url: str, server: subprocess.Popen) -> None:
+    import httpx
+    async with httpx.AsyncClient(base_url=base_url) as http:
+        while True:
+            if server.poll() is not None:
+                raise RuntimeError("server exited during start-up")
+            try:
+                if (await http.get("/ready")).status_code == 200:
+                    return
+            except httpx.HTTPError:
+                pass
+            await asyncio.sleep(0.2)
+
+
+def main() -> int:
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--concurrency", type=int, default=50)
+    parser.add_argument("--file-mb", type=float, default=20, help="size of each uploaded resume (10^6 bytes)")
+    parser.add_argument("--app", default="app:app", help="ASGI app to serve")
+    args = parser.parse_args()
+    try:
+        import psutil
+    except ImportError:
+        raise SystemExit("This benchmark requires `pip install psutil`")
+
+    file_bytes = int(args.file_mb * MB)
+    resume = pdf_bytes(resume_text(2), pad_to=file_bytes)
+    oversized = pdf_bytes(resume_text(2), pad_to=file_bytes + 2 * MB)
+    jd = pdf_bytes(job_description_text(1))
+
+    port = free_port()
+    base_url = f"http://127.0.0.1:{port}"
+    env = dict(os.environ, LOG_LEVEL=os.environ.get("LOG_LEVEL", "WARNING"),
+               PDF_MAX_BYTES=os.environ.get("PDF_MAX_BYTES", str(file_bytes + MB)))
+    server = subprocess.Popen([sys.executable, "-m", "uvicorn", args.app, "--port", str(port), "--log-level", "warning"],
+                              cwd=BACKEND_DIR, env=env)
+    try:
+        asyncio.run(wait_ready(base_url, server))
+        process = psutil.Process(server.pid)
+        # Start the PDF worker pool so its processes count towards the idle figure
+        asyncio.run(fire(base_url, jd, jd, 1))
+        print(f"{args.concurrency} concurrent uploads of {len(resume) / MB:.1f} MB; "
+              f"idle server RSS {tree_rss(process) / 2**20:.0f} MiB")
+        print(f"{'scenario':<10} {'peak RSS':>10} {'growth':>10} {'per upload':>11} {'seconds':>8}  statuses")
+
+        # Bodies declared far over MAX_REQUEST_BYTES are answered before any of them is sent
+        declared = int(env.get("MAX_REQUEST_BYTES", 256 * 1024 * 1024)) + 100 * MB
+        # Freed memory is rarely returned to the OS, so the cheap scenarios run first
+        scenarios: List = [
+            ("request", lambda: announce(port, declared, args.concurrency)),
+            ("oversized", lambda: fire(base_url, oversized, jd, args.concurrency)),
+            ("accepted", lambda: fire(base_url, resume, jd, args.concurrency)),
+        ]
+        for name, run in scenarios:
+            idle = tree_rss(process)
+            started = time.perf_counter()
+            with RssSampler(process) as sampler:
+                statuses = asyncio.run(run())
+            elapsed = time.perf_counter() - started
+            over = max(0, sampler.peak - idle)
+            print(f"{name:<10} {sampler.peak / 2**20:>7.0f}MiB {over / 2**20:>7.0f}MiB "
+                  f"{over / args.concurrency / 2**20:>8.1f}MiB {elapsed:>8.1f}  {statuses}")
+    finally:
+        server.terminate()
+        server.wait(timeout=30)
+    return 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
@@ -0,0 +1,180 @@
+"""
+Multi-worker benchmark: memory per worker and throughput scaling.
+
+For each model-sharing mode and each worker count (1 up to the number of cores
+by default) it starts `serve.py` in a subprocess, waits for /ready and then
+- measures the proportional set size (PSS) of the whole process tree, which
+  splits shared pages (copy-on-write model weights, mapped caches) fairly
+  between the processes mapping them, once idle and once after the load test
+- runs a load test of POST /process-docs/ with unique resumes and a shared JD
+
+Memory is reported as the tree total and as the marginal cost of one more
+worker, (PSS at N workers - PSS at 1 worker) / (N - 1).
+
+Usage: python benchmarks/bench_workers.py [--workers 1,2,4] [--modes fork,socket]
+                                          [--requests 200] [--concurrency 16] [--output result.json]
+Needs `pip install psutil httpx`; Linux for PSS (elsewhere RSS is reported).
+"""
+
+import argparse
+import asyncio
+import importlib.util
+import json
+import os
+import shutil
+import statistics
+import subprocess
+import sys
+import tempfile
+import time
+from typing import Dict, List
+
+sys.path.insert(0, os.path.join(os.path.dirname(os.path.abspath(__file__)), '..'))
+
+from synthetic_documents import job_description_text, pdf_bytes, resume_text
+
+BACKEND_DIR = os.path.join(os.path.dirname(os.path.abspath(__file__)), '..')
+MIB = 2 ** 20
+
+
+def free_port() -> int:
+    import socket
+    with socket.socket() as sock:
+        sock.bind(("127.0.0.1", 0))
+        return sock.getsockname()[1]
+
+
+def tree_pss(process) -> int:
+    import psutil
+    total = 0
+    for member in [process] + process.children(recursive=True):
+        try:
+            info = member.memory_full_info()
+            total += getattr(info, "pss", info.rss)
+        except psutil.NoSuchProcess:
+            pass
+    return total
+
+
+async def wait_ready(base_url: str, server: subprocess.Popen, timeout: float = 300) -> None:
+    import httpx
+    deadline = time.monotonic() + timeout
+    async with httpx.AsyncClient(base_url=base_url) as http:
+        while time.monotonic() < deadline:
+            if server.poll() is not None:
+                raise RuntimeError("server exited during start-up")
+            try:
+                if (await http.get("/ready")).status_code == 200:
+                    return
+            except httpx.HTTPError:
+                pass
+            await asyncio.sleep(0.2)
+    raise RuntimeError("server did not become ready")
+
+
+async def load(base_url: str, payloads: List[Dict], concurrency: int) -> Dict:
+    import httpx
+
+    pending = list(reversed(payloads))
+    latencies: List[float] = []
+    statuses: Dict[str, int] = {}
+
+    async def client(http: "httpx.AsyncClient"):
+        while pending:
+            files = pending.pop()
+            start = time.perf_counter()
+            try:
+                status = str((await http.post("/process-docs/", files=files)).status_code)
+            except httpx.HTTPError as e:
+                status = type(e).__name__
+            statuses[status] = statuses.get(status, 0) + 1
+            if status == "200":
+                latencies.append(time.perf_counter() - start)
+
+    async with httpx.AsyncClient(base_url=base_url, timeout=600,
+                                 limits=httpx.Limits(max_connections=concurrency)) as http:
+        start = time.perf_counter()
+        await asyncio.gather(*(client(http) for _ in range(concurrency)))
+        wall = time.perf_counter() - start
+    latencies.sort()
+    return {
+        "rps": len(latencies) / wall,
+        "p50_ms": statistics.median(latencies) * 1000 if latencies else None,
+        "p95_ms": latencies[min(len(latencies) - 1, int(len(latencies) * 0.95))] * 1000 if latencies else None,
+        "statuses": statuses,
+    }
+
+
+def measure(script: str, mode: str, workers: int, payloads: List[Dict], concurrency: int) -> Dict:
+    import psutil
+
+    port = free_port()
+    base_url = f"http://127.0.0.1:{port}"
+    # A fresh cache directory per run, so no run starts with the previous run's vectors
+    cache_dir = tempfile.mkdtemp(prefix="bench-workers-", dir="/dev/shm" if os.path.isdir("/dev/shm") else None)
+    env = dict(os.environ, WEB_WORKERS=str(workers), MODEL_SHARING=mode, HOST="127.0.0.1", PORT=str(port),
+               SHARED_CACHE_DIR=cache_dir, LOG_LEVEL=os.environ.get("LOG_LEVEL", "WARNING"))
+    server = subprocess.Popen([sys.executable, script], cwd=BACKEND_DIR, env=env,
+                              stdout=subprocess.DEVNULL, stderr=subprocess.DEVNULL)
+    try:
+        asyncio.run(wait_ready(base_url, server))
+        # Every worker runs its warm-up encode once it starts; give them a moment to finish
+        time.sleep(1.0)
+        process = psutil.Process(server.pid)
+        idle = tree_pss(process)
+        result = asyncio.run(load(base_url, payloads, concurrency))
+        loaded = tree_pss(process)
+    finally:
+        server.terminate()
+        server.wait(timeout=60)
+        shutil.rmtree(cache_dir, ignore_errors=True)
+    return dict(result, mode=mode, workers=workers, idle_pss_mib=idle / MIB, loaded_pss_mib=loaded / MIB)
+
+
+def main() -> int:
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--workers", default=",".join(str(n) for n in range(1, (os.cpu_count() or 1) + 1)),
+                        help="comma-separated worker counts (default: 1 to the number of cores)")
+    parser.add_argument("--modes", default="fork,socket", help="comma-separated MODEL_SHARING modes")
+    parser.add_argument("--requests", type=int, default=200)
+    parser.add_argument("--concurrency", type=int, default=16)
+    parser.add_argument("--pages", type=int, default=1, help="pages per resume and JD")
+    parser.add_argument("--script", default=os.path.join(BACKEND_DIR, "serve.py"), help="server entry point")
+    parser.add_argument("--output", help="also write the rows as JSON to this file")
+    args = parser.parse_args()
+    if any(importlib.util.find_spec(name) is None for name in ("httpx", "psutil")):
+        raise SystemExit("This benchmark requires `pip install psutil httpx`")
+
+    jd = pdf_bytes(job_description_text(args.pages))
+    payloads = [{"resume": ("resume.pdf", pdf_bytes(resume_text(args.pages, seed)), "application/pdf"),
+                 "job_description": ("jd.pdf", jd, "application/pdf")}
+                for seed in range(args.requests)]
+    counts = sorted({int(n) for n in args.workers.split(",")})
+
+    rows = []
+    print(f"{args.requests} requests at concurrency {args.concurrency}, {os.cpu_count()} cores")
+    print(f"{'mode':<7} {'workers':>7} {'idle PSS':>10} {'loaded PSS':>11} {'per worker':>11} "
+          f"{'req/s':>7} {'scaling':>8} {'p50 ms':>8} {'p95 ms':>8}  statuses")
+    for mode in args.modes.split(","):
+        base = None
+        for workers in counts:
+            row = measure(args.script, mode, workers, payloads, args.concurrency)
+            base = base or row
+            row["marginal_pss_mib"] = (row["loaded_pss_mib"] - base["loaded_pss_mib"]) / (workers - base["workers"]) \
+                if workers > base["workers"] else None
+            row["scaling"] = row["rps"] / base["rps"] if base["rps"] else None
+            rows.append(row)
+            marginal = f"{row['marginal_pss_mib']:>8.0f}MiB" if row["marginal_pss_mib"] is not None else f"{'-':>11}"
+            print(f"{mode:<7} {workers:>7} {row['idle_pss_mib']:>7.0f}MiB {row['loaded_pss_mib']:>8.0f}MiB "
+                  f"{marginal} {row['rps']:>7.1f} {row['scaling'] or 0:>7.2f}x "
+                  f"{row['p50_ms'] or 0:>8.0f} {row['p95_ms'] or 0:>8.0f}  {row['statuses']}")
+
+    if args.output:
+        with open(args.output, "w") as f:
+            json.dump({"created": time.time(), "cpu_count": os.cpu_count(), "requests": args.requests,
+                       "concurrency": args.concurrency, "rows": rows}, f, indent=2)
+    return 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
@@ -0,0 +1,68 @@
+"""
+Parity check: ONNX backends against the torch backend.
+
+Embeds a fixed set of resume/JD snippets with every backend and compares the
+resume-vs-JD cosine scores with the torch scores. Exits non-zero when a backend
+drifts beyond its tolerance:
+- onnx (fp32):      1e-4 absolute cosine difference
+- onnx-int8 (int8): 0.03 absolute cosine difference
+
+Usage: python benchmarks/check_backend_parity.py [--model all-MiniLM-L6-v2]
+"""
+
+import argparse
+import os
+import sys
+
+sys.path.insert(0, os.path.join(os.path.dirname(os.path.abspath(__file__)), '..'))
+
+import numpy as np
+
+from embedding_backends import create_embedding_backend
+
+TOLERANCES = {"onnx": 1e-4, "onnx-int8": 0.03}
+
+RESUMES = [
+    "senior python developer with 6 years of django, fastapi and postgresql experience",
+    "frontend engineer building react and typescript apps with redux and tailwind",
+    "devops engineer running kubernetes, docker, terraform and prometheus on aws",
+    "data scientist working with pandas, scikit-learn, pytorch and nlp pipelines",
+    "java backend developer, spring boot microservices, kafka and oracle",
+    "mobile developer shipping swift and kotlin apps, some react native",
+]
+JOB_DESCRIPTIONS = [
+    "hiring a backend python engineer: django or fastapi, postgres, 5+ years",
+    "looking for a react developer with strong typescript and css skills",
+    "platform engineer to own kubernetes clusters and terraform infrastructure",
+    "machine learning engineer, pytorch, transformers, production nlp models",
+]
+
+
+def cosine_scores(embeddings: np.ndarray) -> np.ndarray:
+    embeddings = embeddings / np.linalg.norm(embeddings, axis=1, keepdims=True)
+    resumes, jds = embeddings[:len(RESUMES)], embeddings[len(RESUMES):]
+    return resumes @ jds.T
+
+
+def main() -> int:
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument('--model', default=os.environ.get("EMBEDDING_MODEL", 'all-MiniLM-L6-v2'))
+    args = parser.parse_args()
+
+    texts = RESUMES + JOB_DESCRIPTIONS
+    reference = cosine_scores(create_embedding_backend("torch", args.model).encode(texts))
+
+    failed = False
+    for backend, tolerance in TOLERANCES.items():
+        scores = cosine_scores(create_embedding_backend(backend, args.model).encode(texts))
+        drift = float(np.abs(scores - reference).max())
+        ranking_kept = bool((scores.argmax(axis=1) == reference.argmax(axis=1)).all())
+        status = "ok" if drift <= tolerance else "FAIL"
+        failed |= drift > tolerance
+        print(f"{backend:<10} max |cosine diff| = {drift:.6f} (tolerance {tolerance}) "
+              f"best-JD ranking preserved: {ranking_kept}  {status}")
+    return 1 if failed else 0
+
+
+if __name__ == '__main__':
+    sys.exit(main())
@@ -0,0 +1,98 @@
+"""
+Load-test harness for the embedding micro-batcher.
+
+Drives ResumeJobMatcher.calculate_text_similarity from many concurrent threads
+(the same shape as the inference pool under load) with unique documents, so
+every request misses the embedding cache. Reports p50/p99 latency and
+requests/second with micro-batching on and off.
+
+Usage: python benchmarks/load_test_batching.py [--concurrency 32] [--requests 20]
+"""
+
+import argparse
+import os
+import random
+import statistics
+import sys
+import threading
+import time
+
+sys.path.insert(0, os.path.join(os.path.dirname(os.path.abspath(__file__)), '..'))
+
+import matching_engine
+from matching_engine import EmbeddingBatcher
+from tech_mappings import TECH_MAPPINGS
+
+VOCABULARY = [skill for skills in TECH_MAPPINGS.values() for skill in skills] + (
+    "experience team built designed scalable services customers delivery led migrated "
+    "platform reliability performance ownership mentoring roadmap").split()
+
+
+def random_document(rng: random.Random, words: int) -> str:
+    return ' '.join(rng.choice(VOCABULARY) for _ in range(words))
+
+
+def run_load(matcher, concurrency: int, requests_per_client: int, words: int, seed: int) -> dict:
+    latencies = []
+    lock = threading.Lock()
+    barrier = threading.Barrier(concurrency)
+
+    def client(client_id: int):
+        rng = random.Random(seed * 1000 + client_id)
+        documents = [(random_document(rng, words), random_document(rng, words))
+                     for _ in range(requests_per_client)]
+        barrier.wait()
+        for resume_text, jd_text in documents:
+            start = time.perf_counter()
+            matcher.calculate_text_similarity(resume_text, jd_text)
+            elapsed = time.perf_counter() - start
+            with lock:
+                latencies.append(elapsed)
+
+    threads = [threading.Thread(target=client, args=(i,)) for i in range(concurrency)]
+    start = time.perf_counter()
+    for thread in threads:
+        thread.start()
+    for thread in threads:
+        thread.join()
+    wall = time.perf_counter() - start
+
+    latencies.sort()
+    return {
+        "requests": len(latencies),
+        "rps": len(latencies) / wall,
+        "p50_ms": statistics.median(latencies) * 1000,
+        "p99_ms": latencies[min(len(latencies) - 1, int(len(latencies) * 0.99))] * 1000,
+    }
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument('--concurrency', type=int, default=32)
+    parser.add_argument('--requests', type=int, default=20, help='requests per client')
+    parser.add_argument('--words', type=int, default=300, help='words per document')
+    parser.add_argument('--window-ms', type=float, default=matching_engine.EMBEDDING_BATCH_WINDOW_MS or 5)
+    parser.add_argument('--max-texts', type=int, default=matching_engine.EMBEDDING_BATCH_MAX_TEXTS)
+    args = parser.parse_args()
+
+    matcher = matching_engine.get_matcher()
+    # Warm up kernels so neither mode pays first-call costs
+    matcher.embedding_backend.encode(["warm up"] * 8)
+
+    modes = [
+        ("batching off", None),
+        ("batching on", EmbeddingBatcher(matcher._encode, args.window_ms, args.max_texts)),
+    ]
+    print(f"concurrency={args.concurrency} requests/client={args.requests} words/doc={args.words}")
+    print(f"{'mode':<14} {'requests':>8} {'req/s':>8} {'p50 ms':>8} {'p99 ms':>8}")
+    for seed, (label, batcher) in enumerate(modes, start=1):
+        matcher.batcher = batcher
+        result = run_load(matcher, args.concurrency, args.requests, args.words, seed)
+        print(f"{label:<14} {result['requests']:>8} {result['rps']:>8.1f} "
+              f"{result['p50_ms']:>8.1f} {result['p99_ms']:>8.1f}")
+        if batcher is not None:
+            print(f"{'':<14} batches={batcher.batches} mean batch={batcher.stats()['mean_batch_size']}")
+
+
+if __name__ == '__main__':
+    main()
@@ -0,0 +1,91 @@
+"""
+Startup profile: where cold-start time goes.
+
+1. Runs `python -X importtime -c "import app"` and ranks top-level imports by
+   cumulative import time, so heavy modules pulled in at import are obvious.
+2. Times, in a fresh process, importing the app, loading the embedding model
+   (the warm-up done in the background after the port is bound), and the
+   first and second encode calls.
+
+Usage: python benchmarks/profile_startup.py [--top 15]
+"""
+
+import argparse
+import importlib
+import json
+import os
+import re
+import subprocess
+import sys
+import time
+
+BACKEND_DIR = os.path.join(os.path.dirname(os.path.abspath(__file__)), '..')
+
+_IMPORTTIME_RE = re.compile(r"import time:\s+(\d+)\s+\|\s+(\d+)\s+\|(\s*)(\S+)")
+
+
+def import_profile(module: str) -> list:
+    """(cumulative seconds, module) for each import made directly by `module`'s import."""
+    result = subprocess.run([sys.executable, "-X", "importtime", "-c", f"import {module}"],
+                            cwd=BACKEND_DIR, capture_output=True, text=True)
+    # importtime lists children before their parent, indented two more spaces per level
+    children = []
+    for line in result.stderr.splitlines():
+        match = _IMPORTTIME_RE.match(line)
+        if not match:
+            continue
+        depth = len(match.group(3))
+        if depth == 3:
+            children.append((int(match.group(2)) / 1e6, match.group(4)))
+        elif depth == 1:
+            if match.group(4) == module:
+                return children
+            children = []
+    return children
+
+
+def phase_timings() -> dict:
+    """Runs in a child process so every phase starts cold."""
+    timings = {}
+    start = time.perf_counter()
+    importlib.import_module("app")
+    timings["import app"] = time.perf_counter() - start
+
+    import matching_engine
+    start = time.perf_counter()
+    matcher = matching_engine.get_matcher()
+    matcher.load_model()
+    timings["load embedding model"] = time.perf_counter() - start
+
+    for label in ("first encode", "second encode"):
+        start = time.perf_counter()
+        matcher.embedding_backend.encode(["senior python engineer with kubernetes experience"])
+        timings[label] = time.perf_counter() - start
+    return timings
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument('--top', type=int, default=15)
+    parser.add_argument('--phases', action='store_true', help=argparse.SUPPRESS)
+    args = parser.parse_args()
+
+    if args.phases:
+        sys.path.insert(0, BACKEND_DIR)
+        print(json.dumps(phase_timings()))
+        return
+
+    entries = sorted(import_profile("app"), reverse=True)
+    print(f"Imports made by app: {sum(seconds for seconds, _ in entries):.3f}s across {len(entries)} modules")
+    for seconds, module in entries[:args.top]:
+        print(f"  {seconds * 1000:9.1f} ms  {module}")
+
+    output = subprocess.run([sys.executable, os.path.abspath(__file__), '--phases'],
+                            cwd=BACKEND_DIR, capture_output=True, text=True, check=True)
+    print("\nStartup phases:")
+    for label, seconds in json.loads(output.stdout.strip().splitlines()[-1]).items():
+        print(f"  {seconds * 1000:9.1f} ms  {label}")
+
+
+if __name__ == '__main__':
+    main()
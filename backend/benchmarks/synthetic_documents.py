@@ -0,0 +1,96 @@
+"""
+Synthetic resumes and job descriptions for benchmarks, as text or as PDF bytes.
+
+Documents are built from the skill taxonomy plus filler prose, with dated
+roles and experience phrases, so every pipeline stage (skill lexicon,
+experience parsing, embedding) has realistic work to do. Generation is
+seeded, so a given (kind, pages, seed) is identical across runs and machines.
+"""
+
+import random
+from typing import List
+
+from tech_mappings import TECH_MAPPINGS
+
+# Roughly what fits on one page of the rendered PDF
+LINES_PER_PAGE = 45
+WORDS_PER_LINE = 12
+
+SIZES = {"small": 1, "medium": 5, "large": 20}
+
+SKILLS = sorted({skill for skills in TECH_MAPPINGS.values() for skill in skills})
+PROSE = ("designed built shipped owned led migrated scaled improved reduced latency by 40% across "
+         "services for customers, mentored engineers and drove the roadmap with product; partnered "
+         "with design, on-call rotation, reliability, observability, delivery, stakeholders").split()
+TITLES = ("Software Engineer", "Senior Backend Engineer", "Data Engineer", "Platform Engineer",
+          "Full Stack Developer", "Machine Learning Engineer")
+COMPANIES = ("Acme Corp", "Globex", "Initech", "Umbrella Labs", "Hooli", "Vandelay Industries")
+
+
+def _line(rng: random.Random) -> str:
+    words = [rng.choice(SKILLS) if rng.random() < 0.3 else rng.choice(PROSE) for _ in range(WORDS_PER_LINE)]
+    return " ".join(words)
+
+
+def resume_text(pages: int = 1, seed: int = 0) -> str:
+    rng = random.Random(f"resume-{pages}-{seed}")
+    lines = [f"Candidate {seed}", f"{rng.randint(2, 15)} years of experience building production systems", ""]
+    year = 2024
+    while len(lines) < pages * LINES_PER_PAGE:
+        start = year - rng.randint(1, 4)
+        lines.append(f"{rng.choice(TITLES)} at {rng.choice(COMPANIES)} ({start} - {year})")
+        lines.extend(_line(rng) for _ in range(rng.randint(4, 9)))
+        year = start
+    return "\n".join(lines[:pages * LINES_PER_PAGE])
+
+
+def job_description_text(pages: int = 1, seed: int = 0) -> str:
+    rng = random.Random(f"jd-{pages}-{seed}")
+    low = rng.randint(1, 6)
+    lines = [rng.choice(TITLES), f"Requirements: {low}-{low + rng.randint(1, 4)} years of experience",
+             "Must have: " + ", ".join(rng.sample(SKILLS, 8)), ""]
+    while len(lines) < pages * LINES_PER_PAGE:
+        lines.append(_line(rng))
+    return "\n".join(lines[:pages * LINES_PER_PAGE])
+
+
+def _escape(line: str) -> str:
+    return line.replace("\\", "\\\\").replace("(", "\\(").replace(")", "\\)")
+
+
+def pdf_bytes(text: str, pad_to: int = 0) -> bytes:
+    """
+    A minimal single-font PDF with LINES_PER_PAGE lines per page that pypdf extracts back to `text`.
+    `pad_to` adds an unreferenced binary stream until the file is about that many bytes,
+    standing in for the embedded images of a scanned document.
+    """
+    lines = text.split("\n")
+    pages: List[List[str]] = [lines[i:i + LINES_PER_PAGE] for i in range(0, len(lines), LINES_PER_PAGE)] or [[]]
+    objects: List[bytes] = [b"<< /Type /Font /Subtype /Type1 /BaseFont /Helvetica >>"]
+    pages_id = 1 + 2 * len(pages) + 1
+    page_ids = []
+    for page in pages:
+        content = "BT /F1 10 Tf 40 800 Td 12 TL " + " ".join(f"({_escape(line)}) '" for line in page) + " ET"
+        stream = content.encode("latin-1", "replace")
+        objects.append(b"<< /Length %d >>\nstream\n" % len(stream) + stream + b"\nendstream")
+        objects.append(b"<< /Type /Page /Parent %d 0 R /MediaBox [0 0 595 842] /Contents %d 0 R "
+                       b"/Resources << /Font << /F1 1 0 R >> >> >>" % (pages_id, len(objects)))
+        page_ids.append(len(objects))
+    objects.append(b"<< /Type /Pages /Kids [%s] /Count %d >>"
+                   % (b" ".join(b"%d 0 R" % i for i in page_ids), len(page_ids)))
+    objects.append(b"<< /Type /Catalog /Pages %d 0 R >>" % pages_id)
+    catalog_id = len(objects)
+    padding = pad_to - sum(len(body) for body in objects) - 64 * len(objects) - 256
+    if padding > 0:
+        objects.append(b"<< /Length %d >>\nstream\n" % padding + random.Random(padding).randbytes(padding) + b"\nendstream")
+
+    out = b"%PDF-1.4\n"
+    offsets = []
+    for number, body in enumerate(objects, start=1):
+        offsets.append(len(out))
+        out += b"%d 0 obj\n" % number + body + b"\nendobj\n"
+    xref = len(out)
+    out += b"xref\n0 %d\n0000000000 65535 f \n" % (len(objects) + 1)
+    out += b"".join(b"%010d 00000 n \n" % offset for offset in offsets)
+    out += b"trailer\n<< /Size %d /Root %d 0 R >>\nstartxref\n%d\n%%%%EOF\n" % (len(objects) + 1, catalog_id, xref)
+    return out
@@ -0,0 +1,624 @@
+"""
+Document Store
+Persistent collection of documents with their precomputed scoring features
+(skills per category, experience years, embedding rows), shared by the
+job-description index and the resume corpus.
+
+On disk a store is a directory of append-only segments and one manifest:
+- vectors-<generation>.f32:     raw float32 embedding rows of every document,
+                                memory-mapped on load
+- documents-<generation>.jsonl: one line per document with its text and
+                                lexicon tokens, read only when they are needed
+- manifest.json:                the committed state: how many rows and bytes of
+                                the two segments are valid, and one compact entry
+                                per document (skills per category, experience,
+                                roles, where its rows and text are)
+
+Adding documents appends to both segments and then replaces manifest.json, the
+single commit point: anything past the committed lengths (left by a writer that
+crashed before committing) is ignored and cut off by the next append. Deleting
+or re-tagging documents only rewrites the manifest. Once more than
+STORE_COMPACT_GARBAGE of a segment belongs to deleted documents, a background
+thread copies the live rows and texts into segments of a new generation and
+switches the manifest over to them.
+
+The metadata records the hash of every taxonomy category the skills were
+extracted with. When tech_mappings changes, only the added and modified
+categories are matched again, in the stored tokens; nothing is re-parsed or
+re-embedded. Stores written before tokens were kept (version 1) and stores in
+the earlier index.json/vectors.npy layout (versions 1 and 2) are migrated to
+segments on their first write, normalising stored text once where needed.
+
+Several processes (the workers of serve.py) can share a store directory. Every
+write holds an exclusive flock on index.lock across its read-modify-write and
+starts from the files as they are then; reads reload whenever manifest.json has
+been replaced since this process last read it.
+"""
+
+import hashlib
+import json
+import logging
+import os
+import threading
+import time
+from contextlib import contextmanager
+from typing import Dict, Iterator, List, Optional, Sequence, Tuple
+
+import numpy as np
+
+from matching_engine import DocumentFeatures, ResumeJobMatcher
+from structured_logging import get_logger, log_event
+from tech_mappings import TAXONOMY_HASHES, TECH_MAPPINGS, category_lexicon, taxonomy_changes
+from text_normalization import normalize
+
+try:
+    import fcntl
+except ImportError:  # Windows: the store is then only safe within one process
+    fcntl = None
+
+# Share of a segment taken up by deleted documents that triggers a background compaction
+STORE_COMPACT_GARBAGE = float(os.environ.get("STORE_COMPACT_GARBAGE", 0.5))
+
+_STORE_VERSION = 3
+# Versions of the index.json/vectors.npy layout, which load and are migrated on the next write
+_LEGACY_VERSIONS = (1, 2)
+_MANIFEST_FILE = "manifest.json"
+_LEGACY_METADATA_FILE = "index.json"
+_LEGACY_VECTORS_FILE = "vectors.npy"
+_LOCK_FILE = "index.lock"
+_ROW_BYTES = np.dtype(np.float32).itemsize
+
+logger = get_logger("document_store")
+
+
+def stored_skills(skills: Dict) -> Dict[str, List[str]]:
+    """
+    Skills as stored: categories in lexicon order, each category's skills sorted,
+    so a document reads the same however its categories were extracted
+    """
+    return {category: sorted(skills[category]) for category in TECH_MAPPINGS if category in skills}
+
+
+def document_id(text: str) -> str:
+    """
+    Content-derived ID, so adding the same document twice yields the same entry
+    """
+    return hashlib.sha256(text.encode("utf-8")).hexdigest()[:16]
+
+
+def embedding_signature(matcher: ResumeJobMatcher) -> Dict:
+    """
+    Settings that determine the stored vectors; if any differ from the store
+    the stored vectors are stale and must be recomputed
+    """
+    signature = {"model": matcher.cache_namespace, "similarity_mode": matcher.similarity_mode}
+    if matcher.similarity_mode == "chunked":
+        signature.update(chunk_words=matcher.chunk_words, chunk_overlap_words=matcher.chunk_overlap_words)
+    return signature
+
+
+def _garbage(manifest: Optional[Dict]) -> float:
+    """
+    Largest share of either segment that belongs to no current document
+    """
+    if manifest is None or manifest.get("legacy"):
+        return 0.0
+    entries, vectors, documents = manifest["entries"], manifest["vectors"], manifest["documents"]
+    dead_rows = vectors["rows"] - sum(entry["row_count"] for entry in entries)
+    dead_bytes = documents["bytes"] - sum(entry["length"] + 1 for entry in entries)
+    return max(dead_rows / vectors["rows"] if vectors["rows"] else 0.0,
+               dead_bytes / documents["bytes"] if documents["bytes"] else 0.0)
+
+
+class DocumentStore:
+    """
+    Documents with their scoring features, as resumes or as job descriptions
+    (`role`), which decides how experience ranges are read.
+    Reads go against an immutable snapshot; writes append to the segments and
+    commit a new manifest, under a file lock shared with other processes.
+    """
+
+    role = "job_description"
+
+    def __init__(self, directory: str):
+        self.directory = directory
+        self._lock = threading.Lock()
+        self._manifest: Optional[Dict] = None
+        self._entries: List[Dict] = []
+        self._positions: Dict[str, int] = {}
+        self._vectors = np.zeros((0, 0), dtype=np.float32)
+        self._signature: Optional[Dict] = None
+        # Category hashes of the taxonomy the stored skills were extracted with
+        self._taxonomy: Optional[Dict[str, str]] = None
+        # Identity of the manifest the snapshot was read from or written to
+        self._stamp: Optional[Tuple[int, int, int]] = None
+        self._compaction: Optional[threading.Thread] = None
+        # Stands in for the flock where fcntl is missing, so compaction still excludes this process's writes
+        self._file_mutex = threading.Lock()
+        self._sync()
+
+    def _path(self, name: str) -> str:
+        return os.path.join(self.directory, name)
+
+    def _file_stamp(self) -> Optional[Tuple[int, int, int]]:
+        for name in (_MANIFEST_FILE, _LEGACY_METADATA_FILE):
+            try:
+                stat = os.stat(self._path(name))
+            except FileNotFoundError:
+                continue
+            # Every commit replaces the file, so a new inode or mtime means another snapshot
+            return stat.st_ino, stat.st_mtime_ns, stat.st_size
+        return None
+
+    @contextmanager
+    def _file_lock(self, exclusive: bool) -> Iterator[None]:
+        """
+        flock on the store's lock file, shared with every process using the directory:
+        exclusive for a write, shared for reading the manifest and segments together
+        """
+        if fcntl is None:
+            with self._file_mutex:
+                yield
+            return
+        os.makedirs(self.directory, exist_ok=True)
+        with open(self._path(_LOCK_FILE), "a") as f:
+            fcntl.flock(f.fileno(), fcntl.LOCK_EX if exclusive else fcntl.LOCK_SH)
+            yield
+
+    def _sync(self, locked: bool = False) -> None:
+        """
+        Reload the snapshot if another process has written the store since this one
+        last read or wrote it. `locked` when the caller already holds the file lock.
+        """
+        if self._file_stamp() == self._stamp:
+            return
+        if locked:
+            self._load()
+        else:
+            with self._file_lock(exclusive=False):
+                self._load()
+
+    @contextmanager
+    def _writing(self) -> Iterator[None]:
+        """
+        Exclusive file lock for a read-modify-write, with the snapshot first brought
+        up to date so no other process's documents are overwritten
+        """
+        with self._file_lock(exclusive=True):
+            self._sync(locked=True)
+            yield
+
+    def _read_manifest(self) -> Optional[Dict]:
+        """
+        The committed manifest, or the metadata of a store in the index.json layout
+        marked `legacy` (its entries carry their text and tokens inline)
+        """
+        try:
+            with open(self._path(_MANIFEST_FILE)) as f:
+                manifest = json.load(f)
+        except FileNotFoundError:
+            try:
+                with open(self._path(_LEGACY_METADATA_FILE)) as f:
+                    metadata = json.load(f)
+            except FileNotFoundError:
+                return None
+            if metadata.get("version") not in _LEGACY_VERSIONS:
+                raise ValueError(f"{self._path(_LEGACY_METADATA_FILE)} has unsupported store version "
+                                 f"{metadata.get('version')}")
+            return {**metadata, "legacy": True}
+        if manifest.get("version") != _STORE_VERSION:
+            raise ValueError(f"{self._path(_MANIFEST_FILE)} has unsupported store version {manifest.get('version')}")
+        return manifest
+
+    def _open_vectors(self, manifest: Optional[Dict]) -> np.ndarray:
+        if manifest is None or not manifest["entries"]:
+            return np.zeros((0, 0), dtype=np.float32)
+        if manifest.get("legacy"):
+            return np.load(self._path(_LEGACY_VECTORS_FILE), mmap_mode="r")
+        vectors = manifest["vectors"]
+        # Only the committed rows are mapped; rows appended after them are not part of this snapshot
+        return np.memmap(self._path(vectors["file"]), dtype=np.float32, mode="r",
+                         shape=(vectors["rows"], vectors["dim"]))
+
+    def _read_documents(self, manifest: Dict, entries: Sequence[Dict]) -> List[Tuple[str, Optional[str]]]:
+        """
+        (text, space-joined tokens) of each entry; tokens are None for stores that
+        never kept them. Caller holds the file lock and `manifest` is the committed one.
+        """
+        if manifest.get("legacy"):
+            return [(entry["text"], entry.get("tokens")) for entry in entries]
+        documents = []
+        with open(self._path(manifest["documents"]["file"]), "rb") as f:
+            for entry in entries:
+                f.seek(entry["offset"])
+                record = json.loads(f.read(entry["length"]))
+                documents.append((record["text"], record["tokens"]))
+        return documents
+
+    def _load(self) -> None:
+        # Caller holds the file lock, so the manifest and the segments belong together
+        stamp = self._file_stamp()
+        manifest = self._read_manifest()
+        self._set_snapshot(manifest)
+        self._taxonomy = manifest.get("taxonomy") if manifest else None
+        self._stamp = stamp
+
+    def _set_snapshot(self, manifest: Optional[Dict]) -> None:
+        self._manifest = manifest
+        self._entries = manifest["entries"] if manifest else []
+        self._signature = manifest["embedding"] if manifest else None
+        self._positions = {entry["id"]: position for position, entry in enumerate(self._entries)}
+        self._vectors = self._open_vectors(manifest)
+
+    def _write_segments(self, vectors_file: str, documents_file: str, rows: int, dim: int, offset: int,
+                        entries: Sequence[Dict], documents: Sequence[Tuple[str, Optional[str]]],
+                        vectors: Sequence[np.ndarray]) -> List[Dict]:
+        """
+        Append documents and their rows after the first `rows` rows and `offset` bytes of
+        the two segments (creating them if needed) and return the entries laid out over them.
+        Anything past those lengths was never committed and is cut off first.
+        """
+        laid_out = []
+        with open(self._path(vectors_file), "ab") as vectors_out, open(self._path(documents_file), "ab") as documents_out:
+            vectors_out.truncate(rows * dim * _ROW_BYTES)
+            documents_out.truncate(offset)
+            for entry, (text, tokens), document_vectors in zip(entries, documents, vectors):
+                record = json.dumps({"text": text, "tokens": tokens}).encode("utf-8")
+                documents_out.write(record + b"\n")
+                vectors_out.write(np.ascontiguousarray(document_vectors, dtype=np.float32).tobytes())
+                metadata = {key: value for key, value in entry.items() if key not in ("text", "tokens")}
+                laid_out.append({**metadata, "row_start": rows, "row_count": len(document_vectors),
+                                 "offset": offset, "length": len(record)})
+                rows += len(document_vectors)
+                offset += len(record) + 1
+            for f in (vectors_out, documents_out):
+                f.flush()
+                os.fsync(f.fileno())
+        return laid_out
+
+    def _new_generation(self, manifest: Optional[Dict], entries: Sequence[Dict],
+                        documents: Sequence[Tuple[str, Optional[str]]], vectors: Sequence[np.ndarray],
+                        signature: Optional[Dict], taxonomy: Optional[Dict]) -> Dict:
+        """
+        Write `entries` into fresh segments and return the (uncommitted) manifest describing them
+        """
+        generation = (manifest or {}).get("generation", 0) + 1
+        vectors_file, documents_file = f"vectors-{generation:06d}.f32", f"documents-{generation:06d}.jsonl"
+        dim = vectors[0].shape[1] if vectors else 0
+        laid_out = self._write_segments(vectors_file, documents_file, 0, dim, 0, entries, documents, vectors)
+        return {"version": _STORE_VERSION, "generation": generation, "embedding": signature, "taxonomy": taxonomy,
+                "vectors": {"file": vectors_file, "rows": sum(len(rows) for rows in vectors), "dim": dim},
+                "documents": {"file": documents_file,
+                              "bytes": sum(entry["length"] + 1 for entry in laid_out)},
+                "entries": laid_out}
+
+    def _commit(self, manifest: Dict) -> None:
+        """
+        Make `manifest` the store's state with one atomic replace. Caller holds the
+        exclusive file lock; segments the manifest no longer refers to are removed.
+        """
+        tmp = self._path(_MANIFEST_FILE + ".tmp")
+        with open(tmp, "w") as f:
+            json.dump(manifest, f)
+            f.flush()
+            os.fsync(f.fileno())
+        os.replace(tmp, self._path(_MANIFEST_FILE))
+        # Readers only open segments under the file lock, after loading the manifest that names them
+        current = {manifest["vectors"]["file"], manifest["documents"]["file"]}
+        for name in os.listdir(self.directory):
+            segment = (name.startswith("vectors-") and name.endswith(".f32") or
+                       name.startswith("documents-") and name.endswith(".jsonl"))
+            if (segment and name not in current) or name in (_LEGACY_METADATA_FILE, _LEGACY_VECTORS_FILE):
+                try:
+                    os.remove(self._path(name))
+                except OSError:  # Still mapped (Windows); removed by a later commit
+                    pass
+
+    def _apply(self, manifest: Dict) -> None:
+        # After a commit by this snapshot's own writer (caller holds the exclusive file lock)
+        self._stamp = self._file_stamp()
+        self._set_snapshot(manifest)
+        if _garbage(manifest) > STORE_COMPACT_GARBAGE and not (self._compaction and self._compaction.is_alive()):
+            self._compaction = threading.Thread(target=self.compact, name="store-compaction", daemon=True)
+            self._compaction.start()
+
+    def _rewrite(self, entries: Sequence[Dict], documents: Sequence[Tuple[str, Optional[str]]],
+                 vectors: Sequence[np.ndarray], signature: Optional[Dict]) -> None:
+        # Caller holds the exclusive file lock (see _writing)
+        manifest = self._new_generation(self._manifest, entries, documents, vectors, signature, self._taxonomy)
+        self._commit(manifest)
+        self._apply(manifest)
+
+    def _save(self, entries: List[Dict], signature: Optional[Dict]) -> None:
+        """
+        Commit changed metadata of entries already in the segments (a subset of them
+        after a delete). Caller holds the exclusive file lock (see _writing).
+        """
+        if self._manifest.get("legacy"):
+            # The old layout is migrated instead; its tokens may have just been computed
+            self._rewrite(entries, self._read_documents(self._manifest, entries),
+                          [self._rows(entry) for entry in entries], signature)
+            return
+        manifest = {**self._manifest, "generation": self._manifest["generation"] + 1, "embedding": signature,
+                    "taxonomy": self._taxonomy, "entries": entries}
+        self._commit(manifest)
+        self._apply(manifest)
+
+    def _append(self, entries: List[Dict], documents: List[Tuple[str, Optional[str]]],
+                vectors: List[np.ndarray], signature: Dict) -> None:
+        """
+        Add new documents after the committed ones. Caller holds the exclusive file lock.
+        """
+        manifest = self._manifest
+        if manifest is None or manifest.get("legacy"):
+            self._rewrite(self._entries + entries,
+                          (self._read_documents(manifest, self._entries) if manifest else []) + documents,
+                          [self._rows(entry) for entry in self._entries] + vectors, signature)
+            return
+        rows, dim = manifest["vectors"]["rows"], manifest["vectors"]["dim"] or vectors[0].shape[1]
+        laid_out = self._write_segments(manifest["vectors"]["file"], manifest["documents"]["file"], rows, dim,
+                                        manifest["documents"]["bytes"], entries, documents, vectors)
+        manifest = {**manifest, "generation": manifest["generation"] + 1, "embedding": signature,
+                    "taxonomy": self._taxonomy, "entries": self._entries + laid_out,
+                    "vectors": {**manifest["vectors"], "rows": rows + sum(len(rows) for rows in vectors), "dim": dim},
+                    "documents": {**manifest["documents"],
+                                  "bytes": manifest["documents"]["bytes"] + sum(e["length"] + 1 for e in laid_out)}}
+        self._commit(manifest)
+        self._apply(manifest)
+
+    def compact(self) -> bool:
+        """
+        Copy the rows and texts of the current documents into segments of a new
+        generation, dropping those of deleted ones. Runs in the background once
+        the garbage passes STORE_COMPACT_GARBAGE; it works from the files alone, so
+        it never holds up readers of this process's snapshot, which reloads afterwards.
+        Returns whether anything was compacted.
+        """
+        with self._file_lock(exclusive=True):
+            manifest = self._read_manifest()
+            if not _garbage(manifest):
+                return False
+            started = time.perf_counter()
+            entries = manifest["entries"]
+            vectors = self._open_vectors(manifest)
+            compacted = self._new_generation(
+                manifest, entries, self._read_documents(manifest, entries),
+                [vectors[entry["row_start"]:entry["row_start"] + entry["row_count"]] for entry in entries],
+                manifest["embedding"], manifest.get("taxonomy"))
+            self._commit(compacted)
+        log_event(logger, logging.INFO, "store_compacted", directory=self.directory, entries=len(entries),
+                  rows_before=manifest["vectors"]["rows"], rows_after=compacted["vectors"]["rows"],
+                  bytes_before=manifest["documents"]["bytes"], bytes_after=compacted["documents"]["bytes"],
+                  seconds=round(time.perf_counter() - started, 4))
+        return True
+
+    def __len__(self) -> int:
+        return len(self._entries)
+
+    def _rows(self, entry: Dict) -> np.ndarray:
+        return self._vectors[entry["row_start"]:entry["row_start"] + entry["row_count"]]
+
+    def _ensure_compatible(self, matcher: ResumeJobMatcher) -> None:
+        """
+        Re-embed every stored document if the store was built with different embedding settings
+        """
+        signature = embedding_signature(matcher)
+        if self._signature == signature or not self._entries:
+            return
+        with self._writing():
+            self._re_embed(matcher, signature)
+
+    def _re_embed(self, matcher: ResumeJobMatcher, signature: Dict) -> None:
+        # Caller holds the exclusive file lock; another process may have re-embedded already
+        if self._signature == signature or not self._entries:
+            return
+        log_event(logger, logging.WARNING, "store_re_embedding", directory=self.directory,
+                  stored_signature=self._signature, signature=signature, entries=len(self._entries))
+        documents = self._read_documents(self._manifest, self._entries)
+        vectors = matcher.document_vectors([matcher.preprocess_text(text) for text, _ in documents])
+        self._rewrite(self._entries, documents, vectors, signature)
+
+    def _ensure_taxonomy(self) -> Dict:
+        """
+        Bring stored skills up to the current taxonomy: the added and modified categories
+        are matched again in each document's stored tokens and removed ones are dropped.
+        Experience and vectors do not depend on the taxonomy and are kept as they are.
+        """
+        if self._taxonomy != TAXONOMY_HASHES and self._entries:
+            with self._writing():
+                return self._refresh_skills()
+        return self._refresh_skills()
+
+    def _refresh_skills(self) -> Dict:
+        # Writes only when stored skills are stale, which needs the exclusive file lock
+        changes = taxonomy_changes(self._taxonomy)
+        report = {"directory": self.directory, "documents": len(self._entries), "documents_changed": 0,
+                  **{f"categories_{kind}": categories for kind, categories in changes.items()}, "seconds": 0.0}
+        if self._taxonomy == TAXONOMY_HASHES:
+            return report
+        if not self._entries:
+            self._taxonomy = TAXONOMY_HASHES
+            return report
+
+        started = time.perf_counter()
+        stale = changes["added"] + changes["modified"]
+        replaced = set(stale + changes["removed"])
+        lexicon = category_lexicon(stale)
+        entries = []
+        for entry, (text, tokens) in zip(self._entries, self._read_documents(self._manifest, self._entries)):
+            tokens = tokens.split() if tokens is not None else normalize(text).tokens
+            skills = {category: found for category, found in entry["skills"].items() if category not in replaced}
+            skills = stored_skills({**skills, **lexicon.find_skills_in_tokens(tokens)})
+            report["documents_changed"] += skills != entry["skills"]
+            refreshed = {**entry, "skills": skills}
+            if self._manifest.get("legacy"):
+                # The old layout is migrated to segments by _save, tokens included
+                refreshed["tokens"] = " ".join(tokens)
+            entries.append(refreshed)
+        self._taxonomy = TAXONOMY_HASHES
+        self._save(entries, self._signature)
+        report["seconds"] = round(time.perf_counter() - started, 4)
+        log_event(logger, logging.INFO, "store_taxonomy_refreshed", **report)
+        return report
+
+    def refresh_taxonomy(self) -> Dict:
+        """
+        Re-extract whatever the taxonomy change since the last write affects, and report
+        the documents and categories touched and how long it took
+        """
+        with self._lock:
+            self._sync()
+            return self._ensure_taxonomy()
+
+    def snapshot(self, matcher: ResumeJobMatcher) -> Tuple[List[Dict], np.ndarray]:
+        """
+        Current entries and vector matrix, valid for `matcher`'s embedding settings
+        and the current taxonomy
+        """
+        with self._lock:
+            self._sync()
+            self._ensure_taxonomy()
+            self._ensure_compatible(matcher)
+            return self._entries, self._vectors
+
+    def current_entries(self) -> List[Dict]:
+        """
+        Current entries with skills valid for the current taxonomy, without touching the vectors
+        """
+        with self._lock:
+            self._sync()
+            self._ensure_taxonomy()
+            return self._entries
+
+    def extract_features(self, matcher: ResumeJobMatcher, texts: List[str]) -> List[DocumentFeatures]:
+        if self.role == "resume":
+            return matcher.extract_features(texts, [])[0]
+        return matcher.extract_features([], texts)[1]
+
+    def add_many(self, matcher: ResumeJobMatcher, texts: List[str],
+                 names: Optional[List[Optional[str]]] = None) -> List[Dict]:
+        """
+        Compute and store the features of several documents with one batched
+        embedding pass and one write. Returns an entry summary per input, noting
+        which were already stored.
+        """
+        names = names or [None] * len(texts)
+        with self._lock:
+            self._sync()
+            self._ensure_taxonomy()
+            self._ensure_compatible(matcher)
+            new_texts = {}
+            for text, name in zip(texts, names):
+                doc_id = document_id(text)
+                if doc_id not in self._positions and doc_id not in new_texts:
+                    new_texts[doc_id] = (text, name)
+
+            added = set()
+            if new_texts:
+                # Extracted before taking the file lock, so other processes are not held up meanwhile
+                features = self.extract_features(matcher, [text for text, _ in new_texts.values()])
+                created_at = time.time()
+                new_entries = [
+                    {
+                        "id": doc_id,
+                        "name": name,
+                        "skills": stored_skills(document.skills),
+                        "experience_years": document.experience_years,
+                        "roles": list(document.roles),
+                        "created_at": created_at,
+                    }
+                    for (doc_id, (text, name)), document in zip(new_texts.items(), features)
+                ]
+                # Lexicon tokens never contain spaces, so they are stored space-joined
+                new_documents = [(text, " ".join(document.tokens))
+                                 for (text, _), document in zip(new_texts.values(), features)]
+                with self._writing():
+                    # Another process may have written the store since; start from its current state
+                    signature = embedding_signature(matcher)
+                    self._refresh_skills()
+                    self._re_embed(matcher, signature)
+                    fresh = [(entry, stored, document)
+                             for entry, stored, document in zip(new_entries, new_documents, features)
+                             if entry["id"] not in self._positions]
+                    if fresh:
+                        self._append([entry for entry, _, _ in fresh], [stored for _, stored, _ in fresh],
+                                     [document.vectors for _, _, document in fresh], signature)
+                    added = {entry["id"] for entry, _, _ in fresh}
+
+            summaries, reported = [], set()
+            for text in texts:
+                doc_id = document_id(text)
+                entry = self._entries[self._positions[doc_id]]
+                already_stored = doc_id not in added or doc_id in reported
+                reported.add(doc_id)
+                summaries.append({**self._summary(entry), "already_registered": already_stored})
+            return summaries
+
+    def register(self, matcher: ResumeJobMatcher, text: str, name: Optional[str] = None) -> Dict:
+        """
+        Compute and store one document's scoring features
+        """
+        return self.add_many(matcher, [text], [name])[0]
+
+    def delete(self, doc_id: str) -> bool:
+        with self._lock:
+            self._sync()
+            if doc_id not in self._positions:
+                return False
+            with self._writing():
+                if doc_id not in self._positions:
+                    return False
+                self._refresh_skills()
+                kept = [entry for entry in self._entries if entry["id"] != doc_id]
+                self._save(kept, self._signature)
+                return True
+
+    def get(self, doc_id: str) -> Optional[Dict]:
+        with self._lock:
+            self._sync()
+            self._ensure_taxonomy()
+            # Texts are read under the file lock, so a compaction cannot remove their segment meanwhile
+            with self._file_lock(exclusive=False):
+                self._sync(locked=True)
+                position = self._positions.get(doc_id)
+                if position is None:
+                    return None
+                entry = self._entries[position]
+                text = self._read_documents(self._manifest, [entry])[0][0]
+        return {**self._summary(entry), "text": text}
+
+    def texts(self) -> List[str]:
+        """
+        Stored text of every document, in entry order
+        """
+        with self._lock, self._file_lock(exclusive=False):
+            self._sync(locked=True)
+            return [text for text, _ in self._read_documents(self._manifest, self._entries)] if self._entries else []
+
+    def list(self) -> List[Dict]:
+        return [self._summary(entry) for entry in self.current_entries()]
+
+    def features(self, entries: List[Dict], vectors: np.ndarray) -> List[DocumentFeatures]:
+        """
+        Stored features of `entries`, taken from a snapshot's vector matrix
+        """
+        return [
+            DocumentFeatures(
+                {category: set(skills) for category, skills in entry["skills"].items()},
+                entry["experience_years"],
+                vectors[entry["row_start"]:entry["row_start"] + entry["row_count"]],
+                # Stores written before roles were kept have none
+                roles=entry.get("roles", []),
+            )
+            for entry in entries
+        ]
+
+    @staticmethod
+    def _summary(entry: Dict) -> Dict:
+        return {
+            "id": entry["id"],
+            "name": entry["name"],
+            "skills": entry["skills"],
+            "experience_years": entry["experience_years"],
+            "created_at": entry["created_at"],
+        }
@@ -0,0 +1,282 @@
+"""
+Embedding Backends
+Interchangeable implementations of the sentence-embedding model behind one interface:
+- torch:     the SentenceTransformer model as shipped (default)
+- onnx:      the same network exported to ONNX and run with ONNX Runtime
+- onnx-int8: the ONNX export with dynamically quantized int8 weights
+
+The ONNX backends need `pip install onnxruntime onnx`. The first time one is selected
+the model is exported (and quantized) into ONNX_MODEL_DIR; later starts only load the
+exported files and never import torch.
+
+Every backend runs with an InferenceConfig (see inference_config): its thread
+counts, batch size and input length, and warm_up() for its warm-up corpus.
+"""
+
+import json
+import logging
+import os
+from abc import ABC, abstractmethod
+from typing import List, Optional
+
+import numpy as np
+
+from inference_config import InferenceConfig
+from structured_logging import get_logger, log_event
+
+EMBEDDING_BACKENDS = ("torch", "onnx", "onnx-int8")
+
+ONNX_MODEL_DIR = os.environ.get(
+    "ONNX_MODEL_DIR", os.path.join(os.path.dirname(os.path.abspath(__file__)), "onnx_models")
+)
+
+_FP32_FILE = "model.onnx"
+_INT8_FILE = "model_int8.onnx"
+_CONFIG_FILE = "embedding_config.json"
+
+logger = get_logger("embedding_backends")
+
+
+def backend_cache_namespace(backend: str, model_name: str, max_seq_length: int = 0) -> str:
+    """
+    Identifies the vectors a backend produces without loading it; quantized vectors
+    differ slightly from full-precision ones, and a shorter input limit truncates
+    texts, so neither may share cache entries with the default
+    """
+    namespace = model_name if backend == "torch" else f"{model_name}/{backend}"
+    return f"{namespace}@{max_seq_length}" if max_seq_length else namespace
+
+
+class EmbeddingBackend(ABC):
+    """
+    Turns a list of texts into a float32 matrix with one embedding per row
+    """
+
+    name = "base"
+
+    def __init__(self, model_name: str, config: Optional[InferenceConfig] = None):
+        self.model_name = model_name
+        self.config = config or InferenceConfig()
+        # Texts per forward pass; may be changed between calls (the tuner sweeps it)
+        self.max_batch_size = self.config.max_batch_size
+
+    @property
+    def cache_namespace(self) -> str:
+        return backend_cache_namespace(self.name, self.model_name, self.config.max_seq_length)
+
+    @abstractmethod
+    def encode(self, texts: List[str]) -> np.ndarray:
+        """
+        One float32 embedding row per text
+        """
+
+    def warm_up(self, texts: List[str]) -> None:
+        """
+        Encode each warm-up text on its own and then a full batch of them, so the
+        kernels for single requests and for the largest batch are initialised
+        before the first real request needs them
+        """
+        for text in texts:
+            self.encode([text])
+        if texts:
+            self.encode((texts * self.max_batch_size)[:self.max_batch_size])
+
+
+def apply_torch_threads(config: InferenceConfig) -> None:
+    """
+    Set torch's thread counts in this process. Safe to call again, e.g. in a forked
+    worker: the inter-op count can only be set before inter-op work starts, so a
+    process that is already past that point keeps its count and logs a warning.
+    """
+    import torch
+    if config.intra_op_threads and torch.get_num_threads() != config.intra_op_threads:
+        torch.set_num_threads(config.intra_op_threads)
+    if config.inter_op_threads and torch.get_num_interop_threads() != config.inter_op_threads:
+        try:
+            torch.set_num_interop_threads(config.inter_op_threads)
+        except RuntimeError as e:
+            log_event(logger, logging.WARNING, "inter_op_threads_not_applied",
+                      requested=config.inter_op_threads, current=torch.get_num_interop_threads(), error=str(e))
+
+
+class TorchBackend(EmbeddingBackend):
+    name = "torch"
+
+    def __init__(self, model_name: str, config: Optional[InferenceConfig] = None):
+        super().__init__(model_name, config)
+        apply_torch_threads(self.config)
+        from sentence_transformers import SentenceTransformer
+        self.model = SentenceTransformer(model_name)
+        if self.config.max_seq_length:
+            self.model.max_seq_length = min(self.model.max_seq_length, self.config.max_seq_length)
+
+    def encode(self, texts: List[str]) -> np.ndarray:
+        return self.model.encode(texts, batch_size=self.max_batch_size, convert_to_numpy=True)
+
+    def warm_up(self, texts: List[str]) -> None:
+        # A forked worker inherits the model but must set its own threads
+        apply_torch_threads(self.config)
+        super().warm_up(texts)
+
+
+class OnnxBackend(EmbeddingBackend):
+    """
+    Transformer forward pass in ONNX Runtime, followed by the same pooling and
+    normalisation the SentenceTransformer pipeline applies
+    """
+
+    name = "onnx"
+
+    def __init__(self, model_name: str, quantized: bool = False, config: Optional[InferenceConfig] = None):
+        super().__init__(model_name, config)
+        try:
+            import onnxruntime
+        except ImportError as e:
+            raise ImportError("The onnx embedding backends require `pip install onnxruntime onnx`") from e
+
+        if quantized:
+            self.name = "onnx-int8"
+        model_dir = onnx_model_dir(model_name)
+        if not os.path.exists(os.path.join(model_dir, _CONFIG_FILE)):
+            export_onnx_model(model_name, model_dir)
+        model_path = os.path.join(model_dir, _INT8_FILE if quantized else _FP32_FILE)
+        if quantized and not os.path.exists(model_path):
+            quantize_onnx_model(model_dir)
+
+        with open(os.path.join(model_dir, _CONFIG_FILE)) as f:
+            config = json.load(f)
+        self.max_seq_length = min(filter(None, (config["max_seq_length"], self.config.max_seq_length)))
+        self.pooling = config["pooling"]
+        self.normalize = config["normalize"]
+        self._tokenizer = _load_tokenizer(model_dir, self.max_seq_length)
+
+        options = onnxruntime.SessionOptions()
+        options.graph_optimization_level = onnxruntime.GraphOptimizationLevel.ORT_ENABLE_ALL
+        if self.config.intra_op_threads:
+            options.intra_op_num_threads = self.config.intra_op_threads
+        if self.config.inter_op_threads:
+            # Inter-op threads are only used when independent nodes may run in parallel
+            options.inter_op_num_threads = self.config.inter_op_threads
+            if self.config.inter_op_threads > 1:
+                options.execution_mode = onnxruntime.ExecutionMode.ORT_PARALLEL
+        self.session = onnxruntime.InferenceSession(model_path, options, providers=["CPUExecutionProvider"])
+        self._input_names = {model_input.name for model_input in self.session.get_inputs()}
+
+    def encode(self, texts: List[str]) -> np.ndarray:
+        batches = [self._encode_batch(texts[start:start + self.max_batch_size])
+                   for start in range(0, len(texts), self.max_batch_size)]
+        return np.vstack(batches) if batches else np.zeros((0, 0), dtype=np.float32)
+
+    def _encode_batch(self, texts: List[str]) -> np.ndarray:
+        features = {name: value for name, value in self._tokenizer(texts).items() if name in self._input_names}
+        token_embeddings = self.session.run(None, features)[0]
+        mask = features["attention_mask"][..., None].astype(np.float32)
+        if self.pooling == "cls":
+            pooled = token_embeddings[:, 0]
+        else:
+            pooled = (token_embeddings * mask).sum(axis=1) / np.maximum(mask.sum(axis=1), 1e-9)
+        if self.normalize:
+            pooled = pooled / np.maximum(np.linalg.norm(pooled, axis=1, keepdims=True), 1e-12)
+        return pooled.astype(np.float32, copy=False)
+
+
+def onnx_model_dir(model_name: str) -> str:
+    return os.path.join(ONNX_MODEL_DIR, model_name.replace("/", "__"))
+
+
+def _load_tokenizer(model_dir: str, max_seq_length: int):
+    """
+    Returns a callable mapping texts to int64 input arrays. Uses the standalone
+    `tokenizers` runtime when a tokenizer.json was exported, so torch is never imported.
+    """
+    tokenizer_file = os.path.join(model_dir, "tokenizer.json")
+    if os.path.exists(tokenizer_file):
+        from tokenizers import Tokenizer
+        tokenizer = Tokenizer.from_file(tokenizer_file)
+        tokenizer.enable_truncation(max_length=max_seq_length)
+        tokenizer.enable_padding()
+
+        def tokenize(texts: List[str]):
+            encodings = tokenizer.encode_batch(texts)
+            return {
+                "input_ids": np.array([e.ids for e in encodings], dtype=np.int64),
+                "attention_mask": np.array([e.attention_mask for e in encodings], dtype=np.int64),
+                "token_type_ids": np.array([e.type_ids for e in encodings], dtype=np.int64),
+            }
+        return tokenize
+
+    from transformers import AutoTokenizer
+    tokenizer = AutoTokenizer.from_pretrained(model_dir)
+    return lambda texts: dict(tokenizer(texts, padding=True, truncation=True,
+                                        max_length=max_seq_length, return_tensors="np"))
+
+
+def export_onnx_model(model_name: str, model_dir: str) -> None:
+    """
+    Export the SentenceTransformer's transformer to ONNX together with its tokenizer
+    and the pooling/normalisation settings needed to reproduce its embeddings
+    """
+    import torch
+    from sentence_transformers import SentenceTransformer
+
+    model = SentenceTransformer(model_name, device="cpu")
+    transformer, pooling = model[0], model[1] if len(model) > 1 else None
+    pooling_mode = "mean"
+    if pooling is not None:
+        mode = getattr(pooling, "pooling_mode", None) or (
+            pooling.get_pooling_mode_str() if hasattr(pooling, "get_pooling_mode_str") else "mean")
+        pooling_mode = "cls" if "cls" in str(mode) else "mean"
+    normalize = any(type(module).__name__ == "Normalize" for module in model)
+
+    class _TokenEmbeddings(torch.nn.Module):
+        def __init__(self, auto_model):
+            super().__init__()
+            self.auto_model = auto_model
+
+        def forward(self, input_ids, attention_mask, token_type_ids):
+            return self.auto_model(input_ids=input_ids, attention_mask=attention_mask,
+                                   token_type_ids=token_type_ids).last_hidden_state
+
+    os.makedirs(model_dir, exist_ok=True)
+    dummy = model.tokenizer(["an example sentence"], return_tensors="pt")
+    token_type_ids = dummy.get("token_type_ids", torch.zeros_like(dummy["input_ids"]))
+    dynamic = {0: "batch", 1: "sequence"}
+    torch.onnx.export(
+        _TokenEmbeddings(transformer.auto_model).eval(),
+        (dummy["input_ids"], dummy["attention_mask"], token_type_ids),
+        os.path.join(model_dir, _FP32_FILE),
+        input_names=["input_ids", "attention_mask", "token_type_ids"],
+        output_names=["token_embeddings"],
+        dynamic_axes={"input_ids": dynamic, "attention_mask": dynamic, "token_type_ids": dynamic,
+                      "token_embeddings": dynamic},
+        opset_version=17,
+        dynamo=False,
+    )
+    model.tokenizer.save_pretrained(model_dir)
+    with open(os.path.join(model_dir, _CONFIG_FILE), "w") as f:
+        json.dump({
+            "model_name": model_name,
+            "max_seq_length": model.max_seq_length,
+            "pooling": pooling_mode,
+            "normalize": normalize,
+        }, f, indent=2)
+
+
+def quantize_onnx_model(model_dir: str) -> None:
+    """
+    Dynamic int8 quantization of the exported weights (activations stay float)
+    """
+    from onnxruntime.quantization import QuantType, quantize_dynamic
+    quantize_dynamic(os.path.join(model_dir, _FP32_FILE), os.path.join(model_dir, _INT8_FILE),
+                     weight_type=QuantType.QInt8)
+
+
+def create_embedding_backend(backend: str, model_name: str,
+                             config: Optional[InferenceConfig] = None) -> EmbeddingBackend:
+    if backend == "torch":
+        return TorchBackend(model_name, config)
+    if backend == "onnx":
+        return OnnxBackend(model_name, config=config)
+    if backend == "onnx-int8":
+        return OnnxBackend(model_name, quantized=True, config=config)
+    raise ValueError(f"EMBEDDING_BACKEND must be one of {EMBEDDING_BACKENDS}, got {backend!r}")
@@ -0,0 +1,211 @@
+"""
+Content-addressed embedding cache
+In-memory LRU bounded by a byte budget, with an optional memory-mapped
+on-disk store so warm embeddings survive process restarts. Several processes
+can share one store file: appends are serialised with a file lock and each
+process picks up rows written by the others when it misses. On a tmpfs such
+as /dev/shm the mapped pages are shared memory.
+"""
+
+import hashlib
+import os
+import threading
+from collections import OrderedDict
+from typing import Dict, Optional
+
+import numpy as np
+
+try:
+    import fcntl
+except ImportError:  # Windows: the store is then only safe within one process
+    fcntl = None
+
+_DISK_MAGIC = b"EMBC"
+_DISK_HEADER_BYTES = 8  # magic + uint32 embedding dimension
+
+
+def embedding_cache_key(model_name: str, text: str) -> str:
+    """
+    Hash the (model, preprocessed text) pair so vectors from different models never collide
+    """
+    return hashlib.sha256(f"{model_name}\0{text}".encode("utf-8")).hexdigest()
+
+
+class DiskEmbeddingStore:
+    """
+    Append-only file of fixed-size (key, float32 vector) records, read through np.memmap.
+    The key index is rebuilt from the mapped file on open and extended with rows
+    appended by other processes as they are needed.
+    """
+
+    def __init__(self, path: str):
+        self.path = path
+        self.dim: Optional[int] = None
+        self._rows: Dict[str, int] = {}
+        self._map = None
+        self._indexed = 0
+        self._lock = threading.Lock()
+        if os.path.exists(path) and os.path.getsize(path) >= _DISK_HEADER_BYTES:
+            with open(path, "r+b") as f:
+                _lock_file(f)
+                self._read_header(f)
+                # Drop a torn trailing record left by a crash mid-append so new rows stay aligned
+                record_bytes = self._record_dtype().itemsize
+                size = os.fstat(f.fileno()).st_size
+                complete = _DISK_HEADER_BYTES + (size - _DISK_HEADER_BYTES) // record_bytes * record_bytes
+                if complete != size:
+                    f.truncate(complete)
+            self._sync()
+
+    def _read_header(self, f) -> None:
+        f.seek(0)
+        header = f.read(_DISK_HEADER_BYTES)
+        if header[:4] != _DISK_MAGIC:
+            raise ValueError(f"{self.path} is not an embedding cache file")
+        self.dim = int(np.frombuffer(header[4:], dtype="<u4")[0])
+
+    def _record_dtype(self) -> np.dtype:
+        return np.dtype([("key", "S64"), ("vec", "<f4", (self.dim,))])
+
+    def _remap(self) -> None:
+        record = self._record_dtype()
+        count = (os.path.getsize(self.path) - _DISK_HEADER_BYTES) // record.itemsize
+        self._map = np.memmap(self.path, dtype=record, mode="r", offset=_DISK_HEADER_BYTES,
+                              shape=(count,)) if count else np.zeros(0, dtype=record)
+
+    def _sync(self) -> None:
+        """
+        Map the file as it is now and index the complete rows appended since the last sync
+        """
+        if self.dim is None:
+            if not os.path.exists(self.path) or os.path.getsize(self.path) < _DISK_HEADER_BYTES:
+                return
+            with open(self.path, "rb") as f:
+                self._read_header(f)
+        elif self._map is not None:
+            count = (os.path.getsize(self.path) - _DISK_HEADER_BYTES) // self._record_dtype().itemsize
+            if count == self._indexed:
+                return
+        self._remap()
+        for row in range(self._indexed, len(self._map)):
+            self._rows.setdefault(self._map[row]["key"].decode("ascii"), row)
+        self._indexed = len(self._map)
+
+    def __len__(self) -> int:
+        return len(self._rows)
+
+    def get(self, key: str) -> Optional[np.ndarray]:
+        with self._lock:
+            row = self._rows.get(key)
+            if row is None:
+                # Another process may have written it since
+                self._sync()
+                row = self._rows.get(key)
+                if row is None:
+                    return None
+            if self._map is None or row >= len(self._map):
+                self._remap()
+            return np.array(self._map[row]["vec"], dtype=np.float32)
+
+    def put(self, key: str, vector: np.ndarray) -> None:
+        with self._lock:
+            if key in self._rows:
+                return
+            os.makedirs(os.path.dirname(self.path) or ".", exist_ok=True)
+            with open(self.path, "ab") as f:
+                _lock_file(f)
+                if os.fstat(f.fileno()).st_size == 0:
+                    self.dim = int(vector.shape[-1])
+                    f.write(_DISK_MAGIC + np.array([self.dim], dtype="<u4").tobytes())
+                    f.flush()
+                elif self.dim is None:
+                    with open(self.path, "rb") as header:
+                        self._read_header(header)
+                if vector.shape[-1] != self.dim:
+                    return
+                record = np.zeros(1, dtype=self._record_dtype())
+                record[0]["key"] = key.encode("ascii")
+                record[0]["vec"] = vector
+                # The row number comes from the file size, which other processes may have grown
+                row = (os.fstat(f.fileno()).st_size - _DISK_HEADER_BYTES) // record.itemsize
+                f.write(record.tobytes())
+            self._rows[key] = row
+
+
+def _lock_file(f) -> None:
+    """
+    Exclusive lock on an open store file, released when it is closed
+    """
+    if fcntl is not None:
+        fcntl.flock(f.fileno(), fcntl.LOCK_EX)
+
+
+class EmbeddingCache:
+    """
+    LRU cache of embedding vectors keyed by content hash, bounded by `max_bytes`
+    of vector data. Misses fall through to the optional disk store before the model.
+    """
+
+    def __init__(self, max_bytes: int, disk_path: Optional[str] = None):
+        self.max_bytes = max_bytes
+        self.current_bytes = 0
+        self._entries: "OrderedDict[str, np.ndarray]" = OrderedDict()
+        self._lock = threading.Lock()
+        self.disk = DiskEmbeddingStore(disk_path) if disk_path else None
+        self.hits = 0
+        self.disk_hits = 0
+        self.misses = 0
+        self.evictions = 0
+
+    def get(self, key: str) -> Optional[np.ndarray]:
+        with self._lock:
+            vector = self._entries.get(key)
+            if vector is not None:
+                self._entries.move_to_end(key)
+                self.hits += 1
+                return vector
+        if self.disk is not None:
+            vector = self.disk.get(key)
+            if vector is not None:
+                with self._lock:
+                    self.disk_hits += 1
+                    self._insert(key, vector)
+                return vector
+        with self._lock:
+            self.misses += 1
+        return None
+
+    def put(self, key: str, vector: np.ndarray) -> None:
+        vector = np.asarray(vector, dtype=np.float32)
+        with self._lock:
+            self._insert(key, vector)
+        if self.disk is not None:
+            self.disk.put(key, vector)
+
+    def _insert(self, key: str, vector: np.ndarray) -> None:
+        if vector.nbytes > self.max_bytes:
+            return
+        previous = self._entries.pop(key, None)
+        if previous is not None:
+            self.current_bytes -= previous.nbytes
+        self._entries[key] = vector
+        self.current_bytes += vector.nbytes
+        while self.current_bytes > self.max_bytes:
+            _, evicted = self._entries.popitem(last=False)
+            self.current_bytes -= evicted.nbytes
+            self.evictions += 1
+
+    def stats(self) -> Dict:
+        with self._lock:
+            lookups = self.hits + self.disk_hits + self.misses
+            return {
+                "entries": len(self._entries),
+                "bytes": self.current_bytes,
+                "max_bytes": self.max_bytes,
+                "hits": self.hits,
+                "disk_hits": self.disk_hits,
+                "misses": self.misses,
+                "evictions": self.evictions,
+                "hit_rate": round((self.hits + self.disk_hits) / lookups, 4) if lookups else 0.0,
+                "disk_entries": len(self.disk) if self.disk is not None else None
+            }
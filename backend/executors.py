@@ -0,0 +1,159 @@
+"""
+Executor Layer
+Runs CPU-bound work (PDF parsing, model inference) off the asyncio event loop
+on bounded pools, rejecting new work once a pool's queue is full
+"""
+
+import asyncio
+import contextvars
+import os
+import threading
+from concurrent.futures import Executor, ProcessPoolExecutor, ThreadPoolExecutor
+from typing import AsyncIterator, Callable, Dict, Iterable, List, Optional, Tuple
+
+# PDF parsing: pypdf holds the GIL, so it scales across cores only in processes
+PDF_EXECUTOR_KIND = os.environ.get("PDF_EXECUTOR", "process")
+PDF_WORKERS = int(os.environ.get("PDF_WORKERS", os.cpu_count() or 1))
+PDF_MAX_PENDING = int(os.environ.get("PDF_MAX_PENDING", PDF_WORKERS * 4))
+
+# Model inference: torch releases the GIL inside its kernels, so threads suffice by default.
+# Encode calls from these threads are coalesced by the micro-batcher in matching_engine,
+# so most of them spend their time waiting on a batch rather than competing for cores.
+INFERENCE_EXECUTOR_KIND = os.environ.get("INFERENCE_EXECUTOR", "thread")
+INFERENCE_WORKERS = int(os.environ.get("INFERENCE_WORKERS", 8))
+INFERENCE_MAX_PENDING = int(os.environ.get("INFERENCE_MAX_PENDING", INFERENCE_WORKERS * 8))
+
+# Seconds clients are told to wait before retrying a rejected request
+RETRY_AFTER_SECONDS = int(os.environ.get("RETRY_AFTER_SECONDS", 2))
+
+
+class ExecutorSaturated(Exception):
+    """Raised when a pool already holds its maximum number of pending calls."""
+
+    def __init__(self, name: str, retry_after: int):
+        super().__init__(f"{name} executor is at capacity, retry after {retry_after}s")
+        self.name = name
+        self.retry_after = retry_after
+
+
+class BoundedExecutor:
+    """
+    A lazily created thread or process pool with a cap on admitted-but-unfinished
+    calls. Each `run` call counts once against the cap, however many workers it uses.
+    """
+
+    def __init__(self, name: str, kind: str, workers: int, max_pending: int,
+                 retry_after: int = RETRY_AFTER_SECONDS):
+        if kind not in ("thread", "process"):
+            raise ValueError(f"{name} executor kind must be 'thread' or 'process', got {kind!r}")
+        self.name = name
+        self.kind = kind
+        self.workers = max(1, workers)
+        self.max_pending = max(1, max_pending)
+        self.retry_after = retry_after
+        self.pending = 0
+        self.completed = 0
+        self.rejected = 0
+        self._pool: Optional[Executor] = None
+        self._lock = threading.Lock()
+        # Guards the counters against callers on other threads or event loops
+        self._counts_lock = threading.Lock()
+
+    @property
+    def pool(self) -> Executor:
+        with self._lock:
+            if self._pool is None:
+                if self.kind == "process":
+                    self._pool = ProcessPoolExecutor(max_workers=self.workers)
+                else:
+                    self._pool = ThreadPoolExecutor(max_workers=self.workers,
+                                                    thread_name_prefix=f"{self.name}-worker")
+            return self._pool
+
+    def _admit(self) -> None:
+        with self._counts_lock:
+            if self.pending >= self.max_pending:
+                self.rejected += 1
+                raise ExecutorSaturated(self.name, self.retry_after)
+            self.pending += 1
+
+    def _release(self) -> None:
+        with self._counts_lock:
+            self.pending -= 1
+            self.completed += 1
+
+    def _submit(self, loop: asyncio.AbstractEventLoop, fn: Callable, *args) -> asyncio.Future:
+        if self.kind == "thread":
+            # Carry the caller's context (e.g. the request's stage timings) into the worker thread
+            return loop.run_in_executor(self.pool, contextvars.copy_context().run, fn, *args)
+        return loop.run_in_executor(self.pool, fn, *args)
+
+    async def run(self, fn: Callable, *args):
+        """
+        Run `fn(*args)` on the pool without blocking the event loop.
+        Raises ExecutorSaturated instead of queueing past `max_pending`.
+        """
+        self._admit()
+        try:
+            return await self._submit(asyncio.get_running_loop(), fn, *args)
+        finally:
+            self._release()
+
+    async def map(self, fn: Callable, items: Iterable) -> List:
+        """
+        Run `fn(item)` for every item concurrently across the pool, admitted as one call
+        """
+        self._admit()
+        try:
+            loop = asyncio.get_running_loop()
+            return list(await asyncio.gather(*(self._submit(loop, fn, item) for item in items)))
+        finally:
+            self._release()
+
+    async def imap_ordered(self, fn: Callable, arg_tuples: Iterable[Tuple]) -> AsyncIterator:
+        """
+        Submit `fn(*args)` for every tuple at once and yield results in submission
+        order as each becomes available, admitted as one call. Iterate it inside
+        contextlib.aclosing so the slot is released at once if the consumer stops early.
+        """
+        self._admit()
+        futures = []
+        try:
+            loop = asyncio.get_running_loop()
+            futures = [self._submit(loop, fn, *args) for args in arg_tuples]
+            for future in futures:
+                yield await future
+        finally:
+            for future in futures:
+                future.cancel()
+            self._release()
+
+    def shutdown(self) -> None:
+        with self._lock:
+            if self._pool is not None:
+                self._pool.shutdown(wait=False, cancel_futures=True)
+                self._pool = None
+
+    def stats(self) -> Dict:
+        return {
+            "kind": self.kind,
+            "workers": self.workers,
+            "pending": self.pending,
+            "max_pending": self.max_pending,
+            "completed": self.completed,
+            "rejected": self.rejected
+        }
+
+
+pdf_executor = BoundedExecutor("pdf", PDF_EXECUTOR_KIND, PDF_WORKERS, PDF_MAX_PENDING)
+inference_executor = BoundedExecutor("inference", INFERENCE_EXECUTOR_KIND, INFERENCE_WORKERS,
+                                     INFERENCE_MAX_PENDING)
+
+
+def shutdown_executors() -> None:
+    pdf_executor.shutdown()
+    inference_executor.shutdown()
+
+
+def get_executor_stats() -> Dict:
+    return {"pdf": pdf_executor.stats(), "inference": inference_executor.stats()}
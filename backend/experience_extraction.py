@@ -0,0 +1,228 @@
+"""
+Experience Extraction
+Years of experience from free text in one pass of a single compiled pattern.
+
+Every match is classified as one of:
+- an employment date range: 'Jan 2019 - Present', '03/2017 to 11/2020',
+  '2015 – 2018', 'since 2021'
+- a range of years: '3-5 years', '2 to 4 yrs'
+- a mention of years: '5 years', qualified when it reads as a total
+  ('5+ years', 'at least 5 years', '5 years of backend experience')
+- a seniority word (senior / mid-level / junior), looked for only when the
+  text has none of the above
+
+Employment periods are counted in whole months. An end with a month is
+inclusive ('03/2017 to 11/2020' is 45 months, 'Jan - Dec 2019' is 12), and an
+open end ('Present', 'since 2021') runs through the current month. A bare end
+year is exclusive, the usual reading of a resume's year-only dates: the period
+runs to the start of that year, so '2015 - 2018' is 3 years and
+'Mar 2017 - 2020' is 34 months. A period that starts and ends in the same bare
+year ('2019 - 2019') counts that whole year.
+
+A resume's experience is the larger of its merged employment history
+(overlapping roles count once) and its largest qualified statement, so a
+'2 years' inside a project description no longer wins over the real total.
+A job description's requirement is its first qualified mention (ranges give
+their lower bound). Bare mentions are the fallback in both cases.
+"""
+
+import re
+from dataclasses import dataclass, field
+from datetime import date
+from typing import Iterable, List, NamedTuple, Optional, Tuple
+
+_MONTH_NUMBERS = {"jan": 1, "feb": 2, "mar": 3, "apr": 4, "may": 5, "jun": 6,
+                  "jul": 7, "aug": 8, "sep": 9, "oct": 10, "nov": 11, "dec": 12}
+
+_MONTH = (r"(?:jan(?:uary)?|feb(?:ruary)?|mar(?:ch)?|apr(?:il)?|may|june?|july?|aug(?:ust)?"
+          r"|sep(?:t(?:ember)?)?|oct(?:ober)?|nov(?:ember)?|dec(?:ember)?)\.?")
+_YEAR = r"(?:19[5-9]\d|20\d\d)\b"
+_PRESENT = r"(?:present|current(?:ly)?|now|today|date|ongoing)\b"
+_YEARS_WORD = r"(?:years?|yrs?)\b"
+
+# Every alternative begins with the same digit, so the engine jumps from digit to
+# digit instead of trying each alternative at every character; the words that can
+# precede a number (month names, 'since', 'at least') are checked afterwards
+_EXPERIENCE_RE = re.compile(
+    r"(?P<lead>\d)(?<![\d.]\d)(?:"
+    # A year or month/year, optionally opening an employment period
+    rf"(?P<start>\d{{3}}(?<=19[5-9]\d|20\d\d)\b|\d?\s*[/.]\s*{_YEAR})"
+    rf"(?P<period>\s*(?:-+|–|—|to\b|until\b|till\b|through\b)\s*"
+    rf"(?:(?P<present>{_PRESENT})|(?P<end_month>{_MONTH}),?\s*(?P<end_year>{_YEAR})"
+    rf"|(?P<end>(?:(?:0?[1-9]|1[0-2])\s*[/.]\s*)?{_YEAR})))?"
+    # '3-5 years', '3 to 5 years'
+    rf"|(?P<number>\d?(?:\.\d+)?)\s*(?:(?P<span>(?:-|–|—|to)\s*(?P<span_high>\d{{1,2}}(?:\.\d+)?)\s*\+?\s*{_YEARS_WORD})"
+    # '5 years', '5+ years', '5 years of backend experience'
+    rf"|(?P<plus>\+)?\s*{_YEARS_WORD}(?P<experience>(?:\s+[\w-]+){{0,4}}?\s+experience)?)"
+    r")"
+)
+# Looked for just before a match
+_MONTH_BEFORE_RE = re.compile(rf"\b(?P<month>{_MONTH}),?\s*$")
+_SINCE_BEFORE_RE = re.compile(r"\b(?:since|from)\s+$")
+_QUALIFIER_BEFORE_RE = re.compile(r"\b(?:at least|minimum(?: of)?|min\.?|over|more than|>=)\s*$")
+_LOOKBACK = 16
+
+# Seniority words, the last resort, in order of precedence
+_LEVEL_RE = re.compile(r"\b(?:(?P<senior>senior)|(?P<mid>mid[- ]?level|mid|experienced)|(?P<junior>junior|entry[- ]?level))\b")
+_LEVEL_YEARS = {"senior": 5.0, "mid": 3.0, "junior": 1.0}
+
+# Punctuation left around a role title once its dates are cut out of the line
+_TITLE_STRIP = " \t|,;:-–—()[]•*"
+
+
+class Role(NamedTuple):
+    title: str
+    # Months since year 0; `end` is exclusive
+    start: int
+    end: int
+
+    @property
+    def years(self) -> float:
+        return round((self.end - self.start) / 12, 2)
+
+    def as_dict(self) -> dict:
+        return {"title": self.title, "start": _month_label(self.start), "end": _month_label(self.end - 1),
+                "years": self.years}
+
+
+@dataclass
+class ExperienceProfile:
+    # The value used for scoring (None when the text gives no clue)
+    years: Optional[float]
+    # Total of the merged employment periods
+    employment_years: Optional[float] = None
+    # Largest (resume) or first (job description) qualified statement
+    stated_years: Optional[float] = None
+    roles: List[Role] = field(default_factory=list)
+
+
+def _month_label(month: int) -> str:
+    return f"{month // 12:04d}-{month % 12 + 1:02d}"
+
+
+def _point(text: str, month_name: Optional[str] = None) -> Tuple[int, Optional[int]]:
+    """
+    (year, month or None) of '2019', '03/2019' or a year preceded by `month_name`
+    """
+    if month_name:
+        return int(text[-4:]), _MONTH_NUMBERS[month_name[:3]]
+    if len(text) == 4:
+        return int(text), None
+    return int(text[-4:]), int(re.split(r"\s*[/.]", text, maxsplit=1)[0])
+
+
+def _period(lowered: str, match: re.Match, today_month: int) -> Optional[Tuple[int, int, int]]:
+    """
+    (first character, start, exclusive end) of an employment period, with start and end
+    in months; None for a lone year that is no period, or for a period running backwards
+    """
+    first = match.start()
+    window = max(0, first - _LOOKBACK)
+    month_before = _MONTH_BEFORE_RE.search(lowered, window, first)
+    if month_before:
+        first = month_before.start()
+    year, month = _point(match.group("lead") + match.group("start"), month_before and month_before.group("month"))
+    start = year * 12 + (month - 1 if month else 0)
+    since = _SINCE_BEFORE_RE.search(lowered, max(0, first - _LOOKBACK), first)
+    if since:
+        first = since.start()
+    if match.group("period") is None:
+        # Only 'since 2019' / 'from 2019' open a period without an end
+        if since is None:
+            return None
+        end = today_month + 1
+    elif match.group("present"):
+        end = today_month + 1
+    else:
+        end_year, end_month = _point(match.group("end_year") or match.group("end"), match.group("end_month"))
+        # A month-precise end is inclusive ('Jan - Dec 2019' is 12 months); a bare year is exclusive
+        # ('2015 - 2018' is 3 years) unless the period would otherwise be empty ('2019 - 2019')
+        end = end_year * 12 + end_month if end_month else end_year * 12
+        if end <= start and end_month is None:
+            end = end_year * 12 + 12
+    return (first, start, end) if end > start else None
+
+
+def _role_title(text: str, lowered: str, start: int, end: int) -> str:
+    source = text if len(text) == len(lowered) else lowered
+    line_start = lowered.rfind("\n", 0, start) + 1
+    line_end = lowered.find("\n", end)
+    line_end = len(lowered) if line_end == -1 else line_end
+    before = source[line_start:start].strip(_TITLE_STRIP)
+    after = source[end:line_end].strip(_TITLE_STRIP)
+    return (before or after)[:120]
+
+
+def merged_months(periods: Iterable[Tuple[int, int]]) -> int:
+    """
+    Months covered by the union of (start, exclusive end) periods
+    """
+    total = 0
+    current_start = current_end = None
+    for start, end in sorted(periods):
+        if current_end is None or start > current_end:
+            if current_end is not None:
+                total += current_end - current_start
+            current_start, current_end = start, end
+        else:
+            current_end = max(current_end, end)
+    if current_end is not None:
+        total += current_end - current_start
+    return total
+
+
+def extract_experience(text: str, requirement: bool = False, today: Optional[date] = None) -> ExperienceProfile:
+    """
+    Experience described by a resume, or required by a job description when `requirement` is set
+    """
+    if not text:
+        return ExperienceProfile(None)
+    lowered = text.lower()
+    today = today or date.today()
+    today_month = today.year * 12 + today.month - 1
+
+    roles: List[Role] = []
+    qualified: List[Tuple[float, float]] = []
+    bare: List[float] = []
+    for match in _EXPERIENCE_RE.finditer(lowered):
+        if match.group("start"):
+            period = _period(lowered, match, today_month) if not requirement else None
+            if period is not None:
+                first, start, end = period
+                roles.append(Role(_role_title(text, lowered, first, match.end()), start, end))
+            continue
+        low = float(match.group("lead") + match.group("number"))
+        if match.group("span"):
+            qualified.append((low, float(match.group("span_high"))))
+        elif match.group("plus") or match.group("experience") or \
+                _QUALIFIER_BEFORE_RE.search(lowered, max(0, match.start() - _LOOKBACK), match.start()):
+            qualified.append((low, low))
+        else:
+            bare.append(low)
+    level = None
+    if not (roles or qualified or bare):
+        levels = {found.lastgroup for found in _LEVEL_RE.finditer(lowered)}
+        level = next((years for name, years in _LEVEL_YEARS.items() if name in levels), None)
+
+    if requirement:
+        stated = qualified[0][0] if qualified else None
+        years = stated if stated is not None else (bare[0] if bare else level)
+        return ExperienceProfile(years, stated_years=stated)
+
+    employment = round(merged_months((role.start, role.end) for role in roles) / 12, 2) if roles else None
+    stated = max(high for _, high in qualified) if qualified else None
+    if employment is not None or stated is not None:
+        years = max(value for value in (employment, stated) if value is not None)
+    else:
+        years = bare[0] if bare else level
+    return ExperienceProfile(years, employment, stated, roles)
+
+
+def extract_experience_many(texts: List[str], requirement: bool = False,
+                            today: Optional[date] = None) -> List[ExperienceProfile]:
+    """
+    Profiles for many documents against one reference date; repeated documents are parsed once
+    """
+    today = today or date.today()
+    profiles = {text: extract_experience(text, requirement, today) for text in dict.fromkeys(texts)}
+    return [profiles[text] for text in texts]
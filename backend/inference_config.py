@@ -0,0 +1,126 @@
+"""
+Inference Configuration
+How the embedding model runs on this machine: intra-op and inter-op thread
+counts, the most texts encoded in one forward pass, the longest input in word
+pieces, and the corpus used to warm the model up at start-up.
+
+Settings come from a JSON file (INFERENCE_CONFIG, by default
+inference_config.json next to this module, as written by tune_inference.py),
+and each can be overridden by an environment variable:
+- INFERENCE_INTRA_OP_THREADS: threads one operator may use (0: the runtime's
+  default, which honours OMP_NUM_THREADS)
+- INFERENCE_INTER_OP_THREADS: threads running independent operators (0: default)
+- INFERENCE_MAX_BATCH_SIZE: texts per forward pass (default ONNX_BATCH_SIZE or 32)
+- INFERENCE_MAX_SEQ_LENGTH: word pieces read per text, at most the model's own
+  limit (0: that limit). A shorter limit truncates texts and changes their vectors,
+  which are then cached apart from the full-length ones.
+- INFERENCE_WARMUP_CORPUS: UTF-8 file of warm-up texts separated by blank lines
+  (empty: a built-in set of resume-like texts of a few lengths)
+"""
+
+import json
+import os
+from dataclasses import asdict, dataclass, fields
+from typing import Dict, List, Optional
+
+INFERENCE_CONFIG_PATH = os.environ.get(
+    "INFERENCE_CONFIG", os.path.join(os.path.dirname(os.path.abspath(__file__)), "inference_config.json")
+)
+
+# Written by tune_inference.py next to the settings; informational only
+_TUNING_KEY = "tuning"
+
+_ENV_OVERRIDES = {
+    "intra_op_threads": "INFERENCE_INTRA_OP_THREADS",
+    "inter_op_threads": "INFERENCE_INTER_OP_THREADS",
+    "max_batch_size": "INFERENCE_MAX_BATCH_SIZE",
+    "max_seq_length": "INFERENCE_MAX_SEQ_LENGTH",
+    "warmup_corpus": "INFERENCE_WARMUP_CORPUS",
+}
+
+_WARMUP_SENTENCES = (
+    "Senior backend engineer with 6 years of experience building Python, Django and FastAPI services.",
+    "Designed data pipelines on AWS with Spark, Kafka and PostgreSQL, deployed with Docker and Kubernetes.",
+    "Led a team of four engineers, mentored juniors and owned on-call for the payments platform.",
+    "Requirements: 3+ years of React and TypeScript, REST and GraphQL APIs, CI/CD and automated testing.",
+)
+# One sentence, a paragraph and a text past the model's input limit, so the
+# kernels for short, medium and truncated inputs are all initialised
+BUILTIN_WARMUP_TEXTS = [
+    _WARMUP_SENTENCES[0],
+    " ".join(_WARMUP_SENTENCES),
+    " ".join(_WARMUP_SENTENCES * 6),
+]
+
+
+@dataclass
+class InferenceConfig:
+    intra_op_threads: int = 0
+    inter_op_threads: int = 0
+    max_batch_size: int = int(os.environ.get("ONNX_BATCH_SIZE", 32))
+    max_seq_length: int = 0
+    warmup_corpus: str = ""
+
+    def __post_init__(self):
+        for name in ("intra_op_threads", "inter_op_threads", "max_seq_length"):
+            if getattr(self, name) < 0:
+                raise ValueError(f"{name} must be 0 or more, got {getattr(self, name)}")
+        if self.max_batch_size < 1:
+            raise ValueError(f"max_batch_size must be at least 1, got {self.max_batch_size}")
+
+    def as_dict(self) -> Dict:
+        return asdict(self)
+
+
+def load_inference_config(path: Optional[str] = None) -> InferenceConfig:
+    """
+    The settings in `path` (INFERENCE_CONFIG_PATH by default, if it exists) with
+    the environment overrides applied. Raises ValueError for unknown or invalid settings.
+    """
+    path = path or INFERENCE_CONFIG_PATH
+    settings: Dict = {}
+    if os.path.exists(path):
+        with open(path) as f:
+            settings = json.load(f)
+        settings.pop(_TUNING_KEY, None)
+    known = {field.name: field.type for field in fields(InferenceConfig)}
+    unknown = sorted(set(settings) - set(known))
+    if unknown:
+        raise ValueError(f"Unknown inference settings in {path}: {', '.join(unknown)}")
+    for name, variable in _ENV_OVERRIDES.items():
+        if os.environ.get(variable) is not None:
+            settings[name] = os.environ[variable]
+    try:
+        return InferenceConfig(**{name: str(value) if known[name] is str else int(value)
+                                  for name, value in settings.items()})
+    except (TypeError, ValueError) as e:
+        raise ValueError(f"Invalid inference settings ({path}): {e}") from e
+
+
+def write_inference_config(config: InferenceConfig, path: str, tuning: Optional[Dict] = None) -> None:
+    """
+    Save `config` (and the measurements behind it) where load_inference_config reads it
+    """
+    document = config.as_dict()
+    if tuning is not None:
+        document[_TUNING_KEY] = tuning
+    directory = os.path.dirname(os.path.abspath(path))
+    os.makedirs(directory, exist_ok=True)
+    temporary = f"{path}.{os.getpid()}.tmp"
+    with open(temporary, "w") as f:
+        json.dump(document, f, indent=2)
+        f.write("\n")
+    os.replace(temporary, path)
+
+
+def warmup_texts(config: InferenceConfig) -> List[str]:
+    """
+    The warm-up corpus: paragraphs of config.warmup_corpus, or the built-in texts
+    """
+    if not config.warmup_corpus:
+        return list(BUILTIN_WARMUP_TEXTS)
+    with open(config.warmup_corpus, encoding="utf-8") as f:
+        texts = [paragraph.strip() for paragraph in f.read().split("\n\n") if paragraph.strip()]
+    if not texts:
+        raise ValueError(f"Warm-up corpus {config.warmup_corpus} has no texts")
+    return texts
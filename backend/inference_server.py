@@ -0,0 +1,164 @@
+"""
+Inference Server
+One local process that owns the embedding model and the embedding cache and
+answers encode requests from the web workers over a Unix socket, so the model
+is loaded (and its memory paid for) once however many workers are running.
+Requests from all workers go through the server's micro-batching scheduler and
+hit the same cache.
+
+Wire format: every message is a 4-byte big-endian length followed by that many
+bytes. A request is one JSON message, {"texts": [...]}. The reply is a JSON
+header, {"rows": n, "dim": d} or {"error": "..."}, followed on success by the
+n x d matrix as raw little-endian float32.
+"""
+
+import json
+import logging
+import os
+import queue
+import socket
+import socketserver
+import struct
+import time
+from typing import List, Optional
+
+import numpy as np
+
+from embedding_backends import EmbeddingBackend, backend_cache_namespace
+from inference_config import InferenceConfig, warmup_texts
+from structured_logging import get_logger, log_event
+
+# How long a worker waits for the inference server to come up before giving up
+INFERENCE_CONNECT_TIMEOUT = float(os.environ.get("INFERENCE_CONNECT_TIMEOUT", 120))
+
+logger = get_logger("inference_server")
+
+_LENGTH = struct.Struct(">I")
+
+
+def _send(sock: socket.socket, payload: bytes) -> None:
+    sock.sendall(_LENGTH.pack(len(payload)))
+    sock.sendall(payload)
+
+
+def _recv_exactly(sock: socket.socket, size: int) -> bytearray:
+    buffer = bytearray(size)
+    view = memoryview(buffer)
+    received = 0
+    while received < size:
+        count = sock.recv_into(view[received:])
+        if count == 0:
+            raise ConnectionError("inference connection closed")
+        received += count
+    return buffer
+
+
+def _recv(sock: socket.socket) -> bytearray:
+    return _recv_exactly(sock, _LENGTH.unpack(_recv_exactly(sock, _LENGTH.size))[0])
+
+
+class _EncodeHandler(socketserver.BaseRequestHandler):
+    """
+    Serves one worker connection until the worker closes it
+    """
+
+    def handle(self) -> None:
+        while True:
+            try:
+                texts = json.loads(_recv(self.request))["texts"]
+            except ConnectionError:
+                return
+            try:
+                vectors = np.ascontiguousarray(self.server.matcher.embed_texts(texts), dtype="<f4")
+            except Exception as e:
+                log_event(logger, logging.WARNING, "inference_failed", texts=len(texts), error=str(e))
+                _send(self.request, json.dumps({"error": str(e)}).encode("utf-8"))
+                continue
+            _send(self.request, json.dumps({"rows": vectors.shape[0], "dim": vectors.shape[1]}).encode("utf-8"))
+            _send(self.request, vectors.tobytes())
+
+
+class InferenceServer(socketserver.ThreadingUnixStreamServer):
+    daemon_threads = True
+
+    def __init__(self, path: str, matcher):
+        if os.path.exists(path):
+            os.unlink(path)
+        self.matcher = matcher
+        super().__init__(path, _EncodeHandler)
+
+
+def serve(path: str) -> None:
+    """
+    Load and warm up the model, then answer encode requests on `path` until the process is stopped.
+    The socket only appears once the model is ready, so a worker that connects can encode at once.
+    """
+    from matching_engine import INFERENCE_CONFIG, ResumeJobMatcher
+
+    started = time.perf_counter()
+    matcher = ResumeJobMatcher(inference_socket=None)
+    matcher.load_model(warmup_texts(INFERENCE_CONFIG))
+    server = InferenceServer(path, matcher)
+    log_event(logger, logging.INFO, "inference_server_ready", socket=path,
+              seconds=round(time.perf_counter() - started, 2))
+    server.serve_forever()
+
+
+class RemoteEmbeddingBackend(EmbeddingBackend):
+    """
+    Encodes by asking the inference server on `path`; holds no model of its own.
+    Vectors are cached under the namespace of the backend the server runs.
+    """
+
+    name = "remote"
+
+    def __init__(self, path: str, backend: str, model_name: str, config: Optional[InferenceConfig] = None):
+        super().__init__(model_name, config)
+        self.path = path
+        self.backend = backend
+        self._idle: "queue.SimpleQueue[socket.socket]" = queue.SimpleQueue()
+        # Wait for the server, so the worker only reports its model as ready once encoding works
+        self._idle.put(self._connect(timeout=INFERENCE_CONNECT_TIMEOUT))
+
+    @property
+    def cache_namespace(self) -> str:
+        return backend_cache_namespace(self.backend, self.model_name, self.config.max_seq_length)
+
+    def warm_up(self, texts: List[str]) -> None:
+        # The server warmed the model before it started listening; one round trip checks the connection
+        self.encode(texts[:1])
+
+    def _connect(self, timeout: float = 0.0) -> socket.socket:
+        deadline = time.monotonic() + timeout
+        while True:
+            sock = socket.socket(socket.AF_UNIX, socket.SOCK_STREAM)
+            try:
+                sock.connect(self.path)
+                return sock
+            except (FileNotFoundError, ConnectionRefusedError):
+                sock.close()
+                if time.monotonic() >= deadline:
+                    raise
+                time.sleep(0.1)
+
+    def encode(self, texts: List[str]) -> np.ndarray:
+        request = json.dumps({"texts": list(texts)}).encode("utf-8")
+        for attempt in range(2):
+            try:
+                conn = self._idle.get_nowait()
+            except queue.Empty:
+                conn = self._connect(timeout=INFERENCE_CONNECT_TIMEOUT)
+            try:
+                _send(conn, request)
+                header = json.loads(_recv(conn))
+                data = _recv(conn) if "error" not in header else None
+            except OSError:
+                conn.close()
+                # A pooled connection goes stale when the server restarts; retry once on a fresh one
+                if attempt:
+                    raise
+                continue
+            self._idle.put(conn)
+            if data is None:
+                raise RuntimeError(f"inference server: {header['error']}")
+            return np.frombuffer(data, dtype="<f4").reshape(header["rows"], header["dim"])
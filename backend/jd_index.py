@@ -0,0 +1,76 @@
+"""
+Job Description Index
+Registry of job descriptions whose skills, experience requirement and embedding
+are computed once at registration, so resumes can be matched against them
+without any JD-side work. Storage format is described in document_store.
+"""
+
+import os
+import threading
+from typing import Dict, List, Optional
+
+from document_store import DocumentStore
+from matching_engine import ResumeJobMatcher, get_matcher
+
+JD_INDEX_DIR = os.environ.get(
+    "JD_INDEX_DIR", os.path.join(os.path.dirname(os.path.abspath(__file__)), "jd_index")
+)
+
+
+class JobDescriptionIndex(DocumentStore):
+    """
+    Registered job descriptions with their precomputed scoring features
+    """
+
+    role = "job_description"
+
+    def __init__(self, directory: str = JD_INDEX_DIR):
+        super().__init__(directory)
+
+    def match(self, matcher: ResumeJobMatcher, resume_text: str, jd_ids: Optional[List[str]] = None) -> List[Dict]:
+        """
+        Score a resume against the given registered JDs (all of them by default),
+        best first. Only the resume is processed; JD features come from the index.
+        Raises KeyError for unknown IDs.
+        """
+        entries, vectors = self.snapshot(matcher)
+        by_id = {entry["id"]: entry for entry in entries}
+        missing = [jd_id for jd_id in jd_ids or [] if jd_id not in by_id]
+        if missing:
+            raise KeyError(", ".join(missing))
+        selected = [by_id[jd_id] for jd_id in jd_ids] if jd_ids is not None else entries
+        if not selected:
+            return []
+
+        (resume,), _ = matcher.extract_features([resume_text], [])
+        results = matcher.score_features([resume], self.features(selected, vectors))[0]
+        ranked = matcher.rank_results(list(enumerate(results)), 'job_description_index')
+        for result in ranked:
+            entry = selected[result.pop('job_description_index')]
+            result['job_description_id'] = entry["id"]
+            result['job_description_name'] = entry["name"]
+        return ranked
+
+
+_jd_index: Optional[JobDescriptionIndex] = None
+_jd_index_lock = threading.Lock()
+
+
+def get_jd_index() -> JobDescriptionIndex:
+    """
+    The process-wide index, opened (and its vectors mapped) on first use
+    """
+    global _jd_index
+    if _jd_index is None:
+        with _jd_index_lock:
+            if _jd_index is None:
+                _jd_index = JobDescriptionIndex()
+    return _jd_index
+
+
+def register_job_description(text: str, name: Optional[str] = None) -> Dict:
+    return get_jd_index().register(get_matcher(), text, name)
+
+
+def match_registered_job_descriptions(resume_text: str, jd_ids: Optional[List[str]] = None) -> List[Dict]:
+    return get_jd_index().match(get_matcher(), resume_text, jd_ids)
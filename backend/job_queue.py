@@ -0,0 +1,495 @@
+"""
+Job Queue
+Runs slow matches in the background of the web process. Submitting returns a
+job ID at once. Worker tasks on the event loop run the jobs, with the parsing
+and inference themselves still going through the bounded executors, and the
+result is fetched by ID or POSTed to a callback URL.
+
+- Priorities high, normal and low; first come, first served within a priority
+- Per client, at most JOB_CLIENT_CONCURRENCY jobs run at once. The client's
+  other jobs wait without holding up anyone else's, and at most
+  JOB_CLIENT_MAX_QUEUED of them may wait (429 past that).
+- At most JOB_MAX_QUEUED jobs, or JOB_MAX_QUEUED_BYTES of uploads, wait in
+  total; past that submissions get 503 + Retry-After, as from a full executor
+- A job that finds the executors full keeps retrying for up to
+  JOB_SATURATED_RETRY_SECONDS, then fails with 503
+- Finished jobs are kept for JOB_RESULT_TTL seconds, at most JOB_MAX_RESULTS
+  of them. With JOB_RESULT_DIR set every state change is also written there,
+  so worker processes sharing the directory can answer each other's polls.
+- A finished job is POSTed as JSON to its callback URL, which has to fall
+  under one of JOB_CALLBACK_ALLOWED_PREFIXES, or else to JOB_CALLBACK_URL.
+  Delivery is retried with backoff and signed with HMAC-SHA256
+  (X-Signature-256) when JOB_CALLBACK_SECRET is set.
+
+Jobs still waiting when the process stops are lost; clients see their polls
+return 404 and resubmit.
+"""
+
+import asyncio
+import hashlib
+import heapq
+import hmac
+import itertools
+import json
+import logging
+import os
+import re
+import time
+import urllib.parse
+import urllib.request
+import uuid
+from collections import OrderedDict, deque
+from dataclasses import dataclass
+from typing import Awaitable, Callable, Deque, Dict, List, Optional, Set, Tuple
+
+from executors import RETRY_AFTER_SECONDS, ExecutorSaturated
+from metrics import collect_timings, current_timings_ms, record_job
+from structured_logging import get_logger, log_event
+
+JOB_WORKERS = int(os.environ.get("JOB_WORKERS", 4))
+JOB_MAX_QUEUED = int(os.environ.get("JOB_MAX_QUEUED", 1000))
+JOB_MAX_QUEUED_BYTES = int(os.environ.get("JOB_MAX_QUEUED_BYTES", 512 * 1024 * 1024))
+JOB_CLIENT_CONCURRENCY = int(os.environ.get("JOB_CLIENT_CONCURRENCY", 2))
+JOB_CLIENT_MAX_QUEUED = int(os.environ.get("JOB_CLIENT_MAX_QUEUED", 100))
+# How long a running job keeps retrying while the executors are saturated before it fails
+JOB_SATURATED_RETRY_SECONDS = float(os.environ.get("JOB_SATURATED_RETRY_SECONDS", 300))
+JOB_RESULT_TTL = float(os.environ.get("JOB_RESULT_TTL", 3600))
+JOB_MAX_RESULTS = int(os.environ.get("JOB_MAX_RESULTS", 10000))
+# Set to a directory shared by the worker processes so any of them can answer a poll
+JOB_RESULT_DIR = os.environ.get("JOB_RESULT_DIR") or None
+# Default callback target, and the prefixes a job's own callback URL must fall under
+JOB_CALLBACK_URL = os.environ.get("JOB_CALLBACK_URL") or None
+JOB_CALLBACK_ALLOWED_PREFIXES = [
+    prefix.strip() for prefix in os.environ.get("JOB_CALLBACK_ALLOWED_PREFIXES", JOB_CALLBACK_URL or "").split(",")
+    if prefix.strip()
+]
+JOB_CALLBACK_SECRET = os.environ.get("JOB_CALLBACK_SECRET") or None
+JOB_CALLBACK_TIMEOUT = float(os.environ.get("JOB_CALLBACK_TIMEOUT", 10))
+JOB_CALLBACK_ATTEMPTS = int(os.environ.get("JOB_CALLBACK_ATTEMPTS", 4))
+
+PRIORITIES = {"high": 0, "normal": 1, "low": 2}
+
+# Recent wait and run times kept for the percentiles in stats()
+_SAMPLES = 1000
+_JOB_ID_RE = re.compile(r"[0-9a-f]{32}")
+
+logger = get_logger("job_queue")
+
+
+class JobQuotaExceeded(Exception):
+    """Raised when a client already has its maximum number of jobs waiting."""
+
+    def __init__(self, client: str, limit: int, retry_after: int):
+        super().__init__(f"client {client} already has {limit} jobs waiting")
+        self.client = client
+        self.limit = limit
+        self.retry_after = retry_after
+
+
+@dataclass
+class Job:
+    id: str
+    kind: str
+    client: str
+    priority: str
+    size: int
+    callback_url: Optional[str]
+    submitted_at: float
+    # Held while the job waits and dropped when it starts, so its uploads can be freed
+    work: Optional[Callable[[], Awaitable[Dict]]] = None
+    status: str = "queued"
+    started_at: Optional[float] = None
+    finished_at: Optional[float] = None
+    result: Optional[Dict] = None
+    error: Optional[Dict] = None
+    timings_ms: Optional[Dict[str, float]] = None
+    callback: Optional[Dict] = None
+
+    def as_dict(self) -> Dict:
+        return {
+            "job_id": self.id,
+            "kind": self.kind,
+            "status": self.status,
+            "priority": self.priority,
+            "submitted_at": self.submitted_at,
+            "started_at": self.started_at,
+            "finished_at": self.finished_at,
+            "wait_seconds": round(self.started_at - self.submitted_at, 4) if self.started_at else None,
+            "run_seconds": round(self.finished_at - self.started_at, 4) if self.finished_at else None,
+            "result": self.result,
+            "error": self.error,
+            "timings_ms": self.timings_ms,
+            "callback": self.callback,
+            "worker_pid": os.getpid(),
+        }
+
+
+def _post_json(url: str, body: bytes, headers: Dict[str, str], timeout: float) -> int:
+    request = urllib.request.Request(url, data=body, headers=headers, method="POST")
+    with urllib.request.urlopen(request, timeout=timeout) as response:
+        return response.status
+
+
+def _url_under(url: str, prefix: str) -> bool:
+    """
+    Whether `url` has the scheme and host of `prefix` and a path below it
+    (a plain string prefix would let 'http://sink' admit 'http://sink.evil.example')
+    """
+    target, allowed = urllib.parse.urlsplit(url), urllib.parse.urlsplit(prefix)
+    return (target.scheme, target.netloc) == (allowed.scheme, allowed.netloc) and \
+        target.path.startswith(allowed.path)
+
+
+def _process_alive(pid: int) -> bool:
+    try:
+        os.kill(pid, 0)
+    except ProcessLookupError:
+        return False
+    except PermissionError:
+        pass
+    return True
+
+
+def _percentiles(samples: Deque[float]) -> Dict:
+    if not samples:
+        return {"p50": None, "p95": None, "max": None}
+    ordered = sorted(samples)
+    return {
+        "p50": round(ordered[len(ordered) // 2], 4),
+        "p95": round(ordered[min(len(ordered) - 1, int(len(ordered) * 0.95))], 4),
+        "max": round(ordered[-1], 4),
+    }
+
+
+class JobQueue:
+    """
+    Priority queue of jobs with per-client limits, run by `workers` tasks on the
+    event loop. Only touched from the event loop thread, so it needs no locks.
+    """
+
+    def __init__(self, workers: int = JOB_WORKERS, max_queued: int = JOB_MAX_QUEUED,
+                 max_queued_bytes: int = JOB_MAX_QUEUED_BYTES, client_concurrency: int = JOB_CLIENT_CONCURRENCY,
+                 client_max_queued: int = JOB_CLIENT_MAX_QUEUED, result_ttl: float = JOB_RESULT_TTL,
+                 max_results: int = JOB_MAX_RESULTS, result_dir: Optional[str] = JOB_RESULT_DIR,
+                 callback_url: Optional[str] = JOB_CALLBACK_URL,
+                 callback_allowed_prefixes: List[str] = JOB_CALLBACK_ALLOWED_PREFIXES,
+                 callback_secret: Optional[str] = JOB_CALLBACK_SECRET,
+                 retry_after: int = RETRY_AFTER_SECONDS,
+                 saturated_retry_seconds: float = JOB_SATURATED_RETRY_SECONDS):
+        self.workers = max(1, workers)
+        self.max_queued = max(1, max_queued)
+        self.max_queued_bytes = max_queued_bytes
+        self.client_concurrency = max(1, client_concurrency)
+        self.client_max_queued = max(1, client_max_queued)
+        self.result_ttl = result_ttl
+        self.max_results = max(1, max_results)
+        self.result_dir = result_dir
+        self.callback_url = callback_url
+        self.callback_allowed_prefixes = list(callback_allowed_prefixes)
+        self.callback_secret = callback_secret
+        self.retry_after = retry_after
+        self.saturated_retry_seconds = saturated_retry_seconds
+
+        # Runnable jobs as (priority rank, sequence, job); a job whose client is at its
+        # concurrency limit is parked in the client's own heap until one of its jobs finishes
+        self._ready: List[Tuple[int, int, Job]] = []
+        self._parked: Dict[str, List[Tuple[int, int, Job]]] = {}
+        self._sequence = itertools.count()
+        self._running: Dict[str, int] = {}
+        self._queued_by_client: Dict[str, int] = {}
+        self._queued_bytes = 0
+        self._active: Dict[str, Job] = {}
+        self._finished: "OrderedDict[str, Job]" = OrderedDict()
+        self._wakeup = asyncio.Event()
+        self._tasks: List[asyncio.Task] = []
+        self._deliveries: Set[asyncio.Task] = set()
+        self._wait_samples: Deque[float] = deque(maxlen=_SAMPLES)
+        self._run_samples: Deque[float] = deque(maxlen=_SAMPLES)
+        self.submitted = 0
+        self.succeeded = 0
+        self.failed = 0
+        self.rejected = 0
+        self.expired = 0
+        self.callbacks_delivered = 0
+        self.callbacks_failed = 0
+
+    def start(self) -> None:
+        """
+        Start the worker tasks on the running event loop
+        """
+        if self._tasks:
+            return
+        self._sweep_disk()
+        self._tasks = [asyncio.create_task(self._worker(), name=f"job-worker-{i}") for i in range(self.workers)]
+
+    async def stop(self) -> None:
+        tasks = self._tasks + list(self._deliveries)
+        for task in tasks:
+            task.cancel()
+        await asyncio.gather(*tasks, return_exceptions=True)
+        self._tasks = []
+
+    @property
+    def queued(self) -> int:
+        return sum(self._queued_by_client.values())
+
+    def _callback_target(self, callback_url: Optional[str]) -> Optional[str]:
+        if callback_url is None:
+            return self.callback_url
+        if not any(_url_under(callback_url, prefix) for prefix in self.callback_allowed_prefixes):
+            if not self.callback_allowed_prefixes:
+                raise ValueError("callback_url is not accepted: no callback destinations are configured "
+                                 "(JOB_CALLBACK_ALLOWED_PREFIXES)")
+            raise ValueError(f"callback_url must be under one of {self.callback_allowed_prefixes}")
+        return callback_url
+
+    def submit(self, work: Callable[[], Awaitable[Dict]], client: str, priority: str = "normal",
+               kind: str = "match", size: int = 0, callback_url: Optional[str] = None) -> Job:
+        """
+        Queue `work` (a coroutine function returning the result) and return its job.
+        Raises ValueError for a bad priority or callback URL, ExecutorSaturated when the
+        queue is full and JobQuotaExceeded when the client has too many jobs waiting.
+        """
+        if priority not in PRIORITIES:
+            raise ValueError(f"priority must be one of {list(PRIORITIES)}, got {priority!r}")
+        callback_url = self._callback_target(callback_url)
+        queued = self.queued
+        if queued >= self.max_queued or (queued and self._queued_bytes + size > self.max_queued_bytes):
+            self.rejected += 1
+            raise ExecutorSaturated("jobs", self.retry_after)
+        if self._queued_by_client.get(client, 0) >= self.client_max_queued:
+            self.rejected += 1
+            raise JobQuotaExceeded(client, self.client_max_queued, self.retry_after)
+
+        job = Job(uuid.uuid4().hex, kind, client, priority, size, callback_url, time.time(), work)
+        self._active[job.id] = job
+        self._queued_by_client[client] = self._queued_by_client.get(client, 0) + 1
+        self._queued_bytes += size
+        self.submitted += 1
+        heapq.heappush(self._ready, (PRIORITIES[priority], next(self._sequence), job))
+        self._wakeup.set()
+        self._persist(job)
+        return job
+
+    async def _next(self) -> Job:
+        while True:
+            while self._ready:
+                entry = heapq.heappop(self._ready)
+                job = entry[2]
+                if self._running.get(job.client, 0) < self.client_concurrency:
+                    return job
+                heapq.heappush(self._parked.setdefault(job.client, []), entry)
+            self._wakeup.clear()
+            await self._wakeup.wait()
+
+    def _unpark(self, client: str) -> None:
+        parked = self._parked.get(client)
+        if parked:
+            heapq.heappush(self._ready, heapq.heappop(parked))
+            self._wakeup.set()
+        if not parked:
+            self._parked.pop(client, None)
+
+    async def _worker(self) -> None:
+        while True:
+            await self._run(await self._next())
+
+    async def _run(self, job: Job) -> None:
+        client = job.client
+        self._running[client] = self._running.get(client, 0) + 1
+        self._queued_by_client[client] -= 1
+        if not self._queued_by_client[client]:
+            del self._queued_by_client[client]
+        self._queued_bytes -= job.size
+        job.status, job.started_at = "running", time.time()
+        work, job.work = job.work, None
+        self._persist(job)
+        try:
+            with collect_timings():
+                try:
+                    deadline = time.monotonic() + self.saturated_retry_seconds
+                    while True:
+                        try:
+                            job.result = await work()
+                            break
+                        except ExecutorSaturated as e:
+                            # Interactive requests have the pools full; a queued job can wait its turn,
+                            # but not forever
+                            if time.monotonic() + e.retry_after > deadline:
+                                raise
+                            await asyncio.sleep(e.retry_after)
+                    job.status = "succeeded"
+                except ExecutorSaturated as e:
+                    job.status = "failed"
+                    job.error = {"status_code": 503,
+                                 "detail": f"{e}; gave up after {self.saturated_retry_seconds:g}s"}
+                except Exception as e:
+                    job.status = "failed"
+                    job.error = {"status_code": getattr(e, "status_code", 500),
+                                 "detail": getattr(e, "detail", None) or str(e)}
+                job.timings_ms = current_timings_ms()
+        finally:
+            self._running[client] -= 1
+            if not self._running[client]:
+                del self._running[client]
+            self._unpark(client)
+        self._finish(job)
+
+    def _finish(self, job: Job) -> None:
+        job.finished_at = time.time()
+        waited, ran = job.started_at - job.submitted_at, job.finished_at - job.started_at
+        self._wait_samples.append(waited)
+        self._run_samples.append(ran)
+        record_job(job.priority, job.status, waited, ran)
+        if job.status == "succeeded":
+            self.succeeded += 1
+        else:
+            self.failed += 1
+        del self._active[job.id]
+        self._finished[job.id] = job
+        self._evict()
+        self._persist(job)
+        log_event(logger, logging.INFO, "job_finished", job_id=job.id, kind=job.kind, priority=job.priority,
+                  status=job.status, wait_seconds=round(waited, 4), run_seconds=round(ran, 4),
+                  error=job.error and job.error["detail"])
+        if job.callback_url:
+            task = asyncio.create_task(self._deliver(job))
+            self._deliveries.add(task)
+            task.add_done_callback(self._deliveries.discard)
+
+    async def _deliver(self, job: Job) -> None:
+        body = json.dumps(job.as_dict()).encode("utf-8")
+        headers = {"Content-Type": "application/json", "X-Job-ID": job.id}
+        if self.callback_secret:
+            digest = hmac.new(self.callback_secret.encode("utf-8"), body, hashlib.sha256).hexdigest()
+            headers["X-Signature-256"] = f"sha256={digest}"
+        loop = asyncio.get_running_loop()
+        error = None
+        for attempt in range(1, JOB_CALLBACK_ATTEMPTS + 1):
+            try:
+                status = await loop.run_in_executor(None, _post_json, job.callback_url, body, headers,
+                                                    JOB_CALLBACK_TIMEOUT)
+                job.callback = {"status": "delivered", "attempts": attempt, "response_status": status}
+                self.callbacks_delivered += 1
+                break
+            except (OSError, ValueError) as e:
+                error = str(e)
+                if attempt < JOB_CALLBACK_ATTEMPTS:
+                    await asyncio.sleep(2 ** (attempt - 1))
+        else:
+            job.callback = {"status": "failed", "attempts": JOB_CALLBACK_ATTEMPTS, "error": error}
+            self.callbacks_failed += 1
+            log_event(logger, logging.WARNING, "job_callback_failed", job_id=job.id, url=job.callback_url,
+                      error=error)
+        if job.id in self._finished:
+            self._persist(job)
+
+    def _evict(self) -> None:
+        """
+        Drop finished jobs past their TTL, and the oldest beyond max_results
+        """
+        now = time.time()
+        while self._finished:
+            job = next(iter(self._finished.values()))
+            if len(self._finished) <= self.max_results and job.finished_at + self.result_ttl > now:
+                break
+            self._finished.popitem(last=False)
+            self.expired += 1
+            self._remove_file(job.id)
+
+    def get(self, job_id: str) -> Optional[Dict]:
+        """
+        The job's state (with its result once finished), or None for unknown and expired jobs
+        """
+        self._evict()
+        job = self._active.get(job_id) or self._finished.get(job_id)
+        if job is not None:
+            return job.as_dict()
+        return self._read_file(job_id)
+
+    def _file(self, job_id: str) -> str:
+        return os.path.join(self.result_dir, f"{job_id}.json")
+
+    def _persist(self, job: Job) -> None:
+        if not self.result_dir:
+            return
+        path = self._file(job.id)
+        try:
+            os.makedirs(self.result_dir, exist_ok=True)
+            tmp = f"{path}.{os.getpid()}.tmp"
+            with open(tmp, "w") as f:
+                json.dump(job.as_dict(), f)
+            os.replace(tmp, path)
+        except OSError as e:
+            log_event(logger, logging.WARNING, "job_persist_failed", job_id=job.id, error=str(e))
+
+    def _remove_file(self, job_id: str) -> None:
+        if self.result_dir:
+            try:
+                os.unlink(self._file(job_id))
+            except OSError:
+                pass
+
+    def _read_file(self, job_id: str) -> Optional[Dict]:
+        """
+        A job another worker process holds, from the shared result directory
+        """
+        if not self.result_dir or not _JOB_ID_RE.fullmatch(job_id):
+            return None
+        try:
+            with open(self._file(job_id)) as f:
+                stored = json.load(f)
+        except (OSError, ValueError):
+            return None
+        if stored["finished_at"] is not None:
+            if stored["finished_at"] + self.result_ttl <= time.time():
+                self._remove_file(job_id)
+                return None
+        elif not _process_alive(stored["worker_pid"]):
+            # The process holding the job is gone, and the job with it
+            if stored["submitted_at"] + self.result_ttl <= time.time():
+                self._remove_file(job_id)
+                return None
+            stored.update(status="failed", error={"status_code": 500, "detail": "the worker process running the "
+                                                                                 "job exited; resubmit it"})
+        return stored
+
+    def _sweep_disk(self) -> None:
+        """
+        Remove expired results, including those left behind by processes that exited
+        """
+        if not self.result_dir or not os.path.isdir(self.result_dir):
+            return
+        for name in os.listdir(self.result_dir):
+            job_id = name[:-len(".json")]
+            if name.endswith(".json") and _JOB_ID_RE.fullmatch(job_id):
+                self._read_file(job_id)
+
+    def stats(self) -> Dict:
+        self._evict()
+        queued = [job for job in self._active.values() if job.status == "queued"]
+        now = time.time()
+        return {
+            "workers": self.workers,
+            "queued": len(queued),
+            "queued_by_priority": {priority: sum(job.priority == priority for job in queued)
+                                   for priority in PRIORITIES},
+            "queued_bytes": self._queued_bytes,
+            "max_queued": self.max_queued,
+            "waiting_on_client_limit": sum(len(parked) for parked in self._parked.values()),
+            "oldest_queued_seconds": round(now - min(job.submitted_at for job in queued), 4) if queued else None,
+            "running": sum(self._running.values()),
+            "results_stored": len(self._finished),
+            "submitted": self.submitted,
+            "succeeded": self.succeeded,
+            "failed": self.failed,
+            "rejected": self.rejected,
+            "expired": self.expired,
+            "callbacks_delivered": self.callbacks_delivered,
+            "callbacks_failed": self.callbacks_failed,
+            "wait_seconds": _percentiles(self._wait_samples),
+            "run_seconds": _percentiles(self._run_samples),
+        }
+
+
+job_queue = JobQueue()
@@ -0,0 +1,99 @@
+"""
+Match Result Cache
+Request-level deduplication for /process-docs/. Requests carrying the same
+resume and job description (by content hash) share one computation while it
+is in flight (single flight), and repeats within MATCH_CACHE_TTL seconds are
+answered with the stored result. A double click or a client retry then costs
+one PDF parse and one inference instead of one per request.
+
+The shared computation runs as its own task, so a client that disconnects
+does not cancel it for the others waiting on the same key. Failures are
+shared with the requests already waiting but never stored.
+"""
+
+import asyncio
+import os
+import time
+from collections import OrderedDict
+from typing import Any, Awaitable, Callable, Dict, Hashable, Tuple
+
+# Seconds a result is reused after it was computed; 0 keeps only the coalescing
+MATCH_CACHE_TTL = float(os.environ.get("MATCH_CACHE_TTL", 30))
+MATCH_CACHE_MAX_ENTRIES = int(os.environ.get("MATCH_CACHE_MAX_ENTRIES", 1000))
+
+
+class SingleFlightCache:
+    """
+    Results by key for `ttl` seconds (at most `max_entries` of them), with
+    concurrent computations of one key coalesced into one. Only used from the
+    event loop thread, so it needs no locks.
+    """
+
+    def __init__(self, ttl: float, max_entries: int):
+        self.ttl = ttl
+        self.max_entries = max(1, max_entries)
+        # Key -> (expiry on the monotonic clock, value); insertion order is expiry order
+        self._results: "OrderedDict[Hashable, Tuple[float, Any]]" = OrderedDict()
+        self._in_flight: Dict[Hashable, asyncio.Task] = {}
+        self.hits = 0
+        self.coalesced = 0
+        self.computed = 0
+        self.evictions = 0
+
+    async def get_or_compute(self, key: Hashable, compute: Callable[[], Awaitable[Any]],
+                             cacheable: Callable[[Any], bool] = lambda value: True) -> Tuple[Any, str]:
+        """
+        (value, source) for `key`, where source says whether the value was "cached",
+        "coalesced" with a computation already running, or "computed" by this call.
+        Values failing `cacheable` are shared with concurrent callers but not stored.
+        """
+        entry = self._results.get(key)
+        if entry is not None:
+            if entry[0] > time.monotonic():
+                self.hits += 1
+                return entry[1], "cached"
+            del self._results[key]
+
+        task = self._in_flight.get(key)
+        if task is not None:
+            self.coalesced += 1
+            return await asyncio.shield(task), "coalesced"
+
+        self.computed += 1
+        task = asyncio.ensure_future(compute())
+        self._in_flight[key] = task
+        task.add_done_callback(lambda done: self._settle(key, done, cacheable))
+        return await asyncio.shield(task), "computed"
+
+    def _settle(self, key: Hashable, task: asyncio.Task, cacheable: Callable[[Any], bool]) -> None:
+        self._in_flight.pop(key, None)
+        # Reading the exception also keeps asyncio from logging it when every waiter went away
+        if task.cancelled() or task.exception() is not None or self.ttl <= 0:
+            return
+        value = task.result()
+        if not cacheable(value):
+            return
+        now = time.monotonic()
+        self._results[key] = (now + self.ttl, value)
+        while self._results:
+            expires = next(iter(self._results.values()))[0]
+            if len(self._results) <= self.max_entries and expires > now:
+                break
+            self._results.popitem(last=False)
+            self.evictions += 1
+
+    def stats(self) -> Dict:
+        lookups = self.hits + self.coalesced + self.computed
+        return {
+            "entries": len(self._results),
+            "in_flight": len(self._in_flight),
+            "ttl_seconds": self.ttl,
+            "hits": self.hits,
+            "coalesced": self.coalesced,
+            "computed": self.computed,
+            "evictions": self.evictions,
+            "deduplicated_rate": round((self.hits + self.coalesced) / lookups, 4) if lookups else 0.0,
+        }
+
+
+match_result_cache = SingleFlightCache(MATCH_CACHE_TTL, MATCH_CACHE_MAX_ENTRIES)
@@ -3,93 +3,317 @@ Resume-Job Description Matching Module
 Includes text preprocessing, skill extraction, and similarity scoring
 """
 
-import re
-import string
-from typing import Dict, List, Set, Tuple
-from collections import defaultdict
+import asyncio
+import logging
+import os
+import queue
+import threading
+import time
+from concurrent.futures import Future
+from dataclasses import dataclass
+from typing import Callable, Dict, Iterable, List, Optional, Sequence, Set, Tuple
+from functools import cached_property
 import numpy as np
-from sentence_transformers import SentenceTransformer, util
-import nltk
-from nltk.corpus import stopwords
-from nltk.tokenize import word_tokenize
-from nltk.stem import PorterStemmer
 
-from tech_mappings import TECH_MAPPINGS, SKILL_TO_CATEGORY
+from tech_mappings import SKILL_LEXICON
+from text_normalization import NormalizedText, normalize, normalize_document
+from embedding_cache import EmbeddingCache, embedding_cache_key
+from embedding_backends import EmbeddingBackend, backend_cache_namespace, create_embedding_backend
+from inference_config import load_inference_config, warmup_texts
+from experience_extraction import extract_experience, extract_experience_many
+from metrics import stage_timer
+from skill_matrix import SkillBatch, encode_skills
+from structured_logging import get_logger, log_event
 
 # NLTK data is pre-bundled, no need to download at runtime
+NLTK_DATA_DIR = os.path.join(os.path.dirname(os.path.abspath(__file__)), 'nltk_data')
+
+# Load the embedding model in a background thread as soon as the server starts
+WARMUP_ON_STARTUP = os.environ.get("WARMUP_ON_STARTUP", "1") == "1"
+
+EMBEDDING_MODEL_NAME = os.environ.get("EMBEDDING_MODEL", 'all-MiniLM-L6-v2')
+# Inference runtime for the model: torch | onnx | onnx-int8 (see embedding_backends)
+EMBEDDING_BACKEND = os.environ.get("EMBEDDING_BACKEND", "torch")
+# Set to the Unix socket of an inference server (see serve.py) to encode there instead of loading the model
+INFERENCE_SOCKET = os.environ.get("INFERENCE_SOCKET") or None
+# Threads, batch size, input length and warm-up corpus of the model (see inference_config)
+INFERENCE_CONFIG = load_inference_config()
+
+# Embedding cache: in-memory byte budget and optional directory for the on-disk store
+EMBEDDING_CACHE_MAX_BYTES = int(os.environ.get("EMBEDDING_CACHE_MAX_BYTES", 64 * 1024 * 1024))
+EMBEDDING_CACHE_DIR = os.environ.get("EMBEDDING_CACHE_DIR")
+
+# Micro-batching: how long the scheduler waits for more texts, and the most it packs
+# into one encode call. A window of 0 disables batching (each caller encodes directly).
+EMBEDDING_BATCH_WINDOW_MS = float(os.environ.get("EMBEDDING_BATCH_WINDOW_MS", 5))
+EMBEDDING_BATCH_MAX_TEXTS = int(os.environ.get("EMBEDDING_BATCH_MAX_TEXTS", 64))
+
+# Text similarity: 'document' embeds each document whole (the model truncates long
+# ones); 'chunked' embeds overlapping word windows and pools chunk similarities.
+SIMILARITY_MODE = os.environ.get("SIMILARITY_MODE", "document")
+SIMILARITY_POOLING = os.environ.get("SIMILARITY_POOLING", "mean")  # mean | max | topk
+SIMILARITY_TOP_K = int(os.environ.get("SIMILARITY_TOP_K", 3))
+# all-MiniLM-L6-v2 reads 256 word pieces, roughly 150-180 English words
+CHUNK_WORDS = int(os.environ.get("CHUNK_WORDS", 150))
+CHUNK_OVERLAP_WORDS = int(os.environ.get("CHUNK_OVERLAP_WORDS", 30))
+
+SIMILARITY_MODES = ("document", "chunked")
+SIMILARITY_POOLINGS = ("mean", "max", "topk")
+
+logger = get_logger("matching_engine")
+
+class EmbeddingBatcher:
+    """
+    Dynamic micro-batching scheduler for the embedding model. Concurrent callers
+    submit texts; a single scheduler thread collects them for up to `window_ms`
+    (or until `max_texts` are pending), runs one batched encode call and hands
+    each caller its slice of the result.
+    """
+
+    def __init__(self, encode_fn: Callable[[List[str]], np.ndarray], window_ms: float, max_texts: int):
+        self._encode = encode_fn
+        self.window = window_ms / 1000.0
+        self.max_texts = max(1, max_texts)
+        self._queue: "queue.Queue[Tuple[List[str], Future]]" = queue.Queue()
+        self._thread: Optional[threading.Thread] = None
+        self._start_lock = threading.Lock()
+        self.batches = 0
+        self.texts = 0
+        self.requests = 0
+
+    def submit(self, texts: List[str]) -> Future:
+        """
+        Queue texts for the next batch; the future resolves to their embedding matrix
+        """
+        future: Future = Future()
+        if not texts:
+            future.set_result(np.zeros((0, 0), dtype=np.float32))
+            return future
+        self._ensure_started()
+        self._queue.put((list(texts), future))
+        return future
+
+    def encode(self, texts: List[str]) -> np.ndarray:
+        """
+        Blocking helper for worker threads
+        """
+        return self.submit(texts).result()
+
+    async def encode_async(self, texts: List[str]) -> np.ndarray:
+        """
+        Awaitable helper for coroutines
+        """
+        return await asyncio.wrap_future(self.submit(texts))
+
+    def _ensure_started(self) -> None:
+        if self._thread is None:
+            with self._start_lock:
+                if self._thread is None:
+                    self._thread = threading.Thread(target=self._run, name="embedding-batcher", daemon=True)
+                    self._thread.start()
+
+    def _run(self) -> None:
+        while True:
+            pending = [self._queue.get()]
+            count = len(pending[0][0])
+            deadline = time.perf_counter() + self.window
+            while count < self.max_texts:
+                remaining = deadline - time.perf_counter()
+                if remaining <= 0:
+                    break
+                try:
+                    item = self._queue.get(timeout=remaining)
+                except queue.Empty:
+                    break
+                pending.append(item)
+                count += len(item[0])
+            self._dispatch(pending)
+
+    def _dispatch(self, pending: List[Tuple[List[str], Future]]) -> None:
+        # Identical texts from different callers are encoded once
+        unique = list(dict.fromkeys(text for texts, _ in pending for text in texts))
+        try:
+            encoded = self._encode(unique)
+        except Exception as e:
+            for _, future in pending:
+                future.set_exception(e)
+            return
+        row = {text: i for i, text in enumerate(unique)}
+        for texts, future in pending:
+            future.set_result(encoded[[row[text] for text in texts]])
+        self.batches += 1
+        self.texts += len(unique)
+        self.requests += len(pending)
+
+    def stats(self) -> Dict:
+        return {
+            "window_ms": self.window * 1000.0,
+            "max_texts": self.max_texts,
+            "batches": self.batches,
+            "requests": self.requests,
+            "texts_encoded": self.texts,
+            "mean_batch_size": round(self.texts / self.batches, 2) if self.batches else 0.0
+        }
+
+class IncrementalSkillExtractor:
+    """
+    Accumulates skills from a document delivered piece by piece (e.g. PDF pages
+    as they finish parsing). The tail of each piece is carried into the next scan
+    so phrases split across a page boundary are still found.
+    """
+
+    def __init__(self, normalize: Callable[[str], NormalizedText] = normalize):
+        self._normalize = normalize
+        self._tail: List[str] = []
+        self.skills: Dict[str, Set[str]] = {}
+
+    def feed(self, text: str) -> None:
+        with stage_timer("skill_extraction"):
+            tokens = self._tail + list(self._normalize(text).tokens)
+            for skill in SKILL_LEXICON.iter_matches(tokens):
+                for category in SKILL_LEXICON.skill_to_categories[skill]:
+                    self.skills.setdefault(category, set()).add(skill)
+            overlap = SKILL_LEXICON.max_phrase_tokens - 1
+            self._tail = tokens[-overlap:] if overlap > 0 else []
+
+def _import_nltk():
+    """
+    Import NLTK on first use (it is slow to import) and register the bundled data
+    """
+    import nltk
+    if NLTK_DATA_DIR not in nltk.data.path:
+        nltk.data.path.append(NLTK_DATA_DIR)
+    return nltk
+
+@dataclass
+class DocumentFeatures:
+    """
+    Everything scoring needs from one document, computed once and reusable
+    (e.g. stored for registered job descriptions)
+    """
+    skills: Dict[str, Set[str]]
+    experience_years: float | None
+    # Unit-normalised embedding rows: one per document, or one per chunk in chunked mode
+    vectors: np.ndarray
+    # Lexicon tokens the skills were matched in, kept so stores can re-match them when the taxonomy changes
+    tokens: Sequence[str] = ()
+    # A resume's employment periods behind experience_years (Role.as_dict); empty for job descriptions
+    roles: Sequence[Dict] = ()
 
 class ResumeJobMatcher:
-    def __init__(self):
-        self.stemmer = PorterStemmer()
-        self.stop_words = set(stopwords.words('english'))
-        # Load a pre-trained SentenceTransformer model for semantic similarity
-        self.embedding_model = SentenceTransformer('all-MiniLM-L6-v2')
+    def __init__(self, inference_socket: Optional[str] = INFERENCE_SOCKET):
+        # The embedding model is the slowest thing to load, so it is loaded on first
+        # use (or by warm_up) rather than when the matcher is created
+        self._embedding_backend: Optional[EmbeddingBackend] = None
+        self._model_lock = threading.Lock()
+        self.model_state = "not_loaded"
+        self.inference_socket = inference_socket
+        self.cache_namespace = backend_cache_namespace(EMBEDDING_BACKEND, EMBEDDING_MODEL_NAME,
+                                                       INFERENCE_CONFIG.max_seq_length)
+        cache_file = self.cache_namespace.replace(os.sep, "__").replace("/", "__") + ".emb"
+        # With an inference server the on-disk store is its to keep; workers only hold a memory tier
+        disk_path = os.path.join(EMBEDDING_CACHE_DIR, cache_file) \
+            if EMBEDDING_CACHE_DIR and not inference_socket else None
+        self.embedding_cache = EmbeddingCache(EMBEDDING_CACHE_MAX_BYTES, disk_path=disk_path)
+        self.batcher = EmbeddingBatcher(self._encode, EMBEDDING_BATCH_WINDOW_MS,
+                                        EMBEDDING_BATCH_MAX_TEXTS) if EMBEDDING_BATCH_WINDOW_MS > 0 else None
+        if SIMILARITY_MODE not in SIMILARITY_MODES:
+            raise ValueError(f"SIMILARITY_MODE must be one of {SIMILARITY_MODES}, got {SIMILARITY_MODE!r}")
+        if SIMILARITY_POOLING not in SIMILARITY_POOLINGS:
+            raise ValueError(f"SIMILARITY_POOLING must be one of {SIMILARITY_POOLINGS}, got {SIMILARITY_POOLING!r}")
+        if CHUNK_WORDS < 1 or not 0 <= CHUNK_OVERLAP_WORDS < CHUNK_WORDS:
+            raise ValueError(f"CHUNK_OVERLAP_WORDS must be at least 0 and less than CHUNK_WORDS, "
+                             f"got CHUNK_WORDS={CHUNK_WORDS}, CHUNK_OVERLAP_WORDS={CHUNK_OVERLAP_WORDS}")
+        self.similarity_mode = SIMILARITY_MODE
+        self.similarity_pooling = SIMILARITY_POOLING
+        self.similarity_top_k = SIMILARITY_TOP_K
+        self.chunk_words = CHUNK_WORDS
+        self.chunk_overlap_words = CHUNK_OVERLAP_WORDS
+
+    @cached_property
+    def stemmer(self):
+        _import_nltk()
+        from nltk.stem import PorterStemmer
+        return PorterStemmer()
+
+    @cached_property
+    def stop_words(self) -> Set[str]:
+        _import_nltk()
+        from nltk.corpus import stopwords
+        return set(stopwords.words('english'))
+
+    @property
+    def embedding_backend(self) -> EmbeddingBackend:
+        if self._embedding_backend is None:
+            return self.load_model()
+        return self._embedding_backend
+
+    def load_model(self, warmup_texts: Optional[List[str]] = None) -> EmbeddingBackend:
+        """
+        Load the embedding model once; concurrent callers wait for the same load.
+        With `warmup_texts` the model also runs them in this process before it
+        reports ready (see EmbeddingBackend.warm_up), even if it was loaded
+        already, e.g. by the supervisor before this worker was forked.
+        """
+        with self._model_lock:
+            if self._embedding_backend is None:
+                self.model_state = "loading"
+                try:
+                    if self.inference_socket:
+                        from inference_server import RemoteEmbeddingBackend
+                        self._embedding_backend = RemoteEmbeddingBackend(
+                            self.inference_socket, EMBEDDING_BACKEND, EMBEDDING_MODEL_NAME, INFERENCE_CONFIG)
+                    else:
+                        # Load a pre-trained SentenceTransformer model for semantic similarity
+                        self._embedding_backend = create_embedding_backend(
+                            EMBEDDING_BACKEND, EMBEDDING_MODEL_NAME, INFERENCE_CONFIG)
+                except Exception:
+                    self.model_state = "failed"
+                    raise
+            try:
+                if warmup_texts:
+                    self.model_state = "warming_up"
+                    self._embedding_backend.warm_up(warmup_texts)
+            finally:
+                # A failed warm-up leaves a working model that is merely cold
+                self.model_state = "ready"
+        return self._embedding_backend
 
     def preprocess_text(self, text: str) -> str:
         """
-        Clean and preprocess text for analysis
+        Clean and preprocess text for analysis (see text_normalization; memoized per document)
         """
-        # Convert to lowercase
-        text = text.lower()
-        
-        # Remove extra whitespace and newlines
-        text = re.sub(r'\s+', ' ', text)
-        
-        # Remove special characters but keep alphanumeric and common punctuation
-        text = re.sub(r'[^\w\s\-\+\#\.]', ' ', text)
-        
-        # Handle common variations
-        text = re.sub(r'\bc\+\+\b', 'cpp', text)
-        text = re.sub(r'\bc#\b', 'csharp', text)
-        text = re.sub(r'\bf#\b', 'fsharp', text)
-        text = re.sub(r'\bnode\.js\b', 'nodejs', text)
-        text = re.sub(r'\breact\.js\b', 'reactjs', text)
-        text = re.sub(r'\bvue\.js\b', 'vuejs', text)
-        
-        return text.strip()
+        with stage_timer("preprocessing"):
+            return normalize_document(text).text
     
     def extract_skills_from_text(self, text: str) -> Dict[str, Set[str]]:
         """
         Extract technical skills from text using the technology mappings
         """
-        preprocessed_text = self.preprocess_text(text)
-        found_skills = defaultdict(set)
-        
-        # Create a set of all possible skills for faster lookup
-        all_skills = set()
-        for skills_list in TECH_MAPPINGS.values():
-            all_skills.update(skill.lower() for skill in skills_list)
-        
-        # Tokenize text into words and phrases
-        words = word_tokenize(preprocessed_text)
-        
-        # Check individual words
-        for word in words:
-            if word in all_skills:
-                categories = SKILL_TO_CATEGORY.get(word, [])
-                for category in categories:
-                    found_skills[category].add(word)
-        
-        # Check bigrams and trigrams
-        for i in range(len(words)):
-            # Bigrams
-            if i < len(words) - 1:
-                bigram = ' '.join(words[i:i+2])
-                if bigram in all_skills:
-                    categories = SKILL_TO_CATEGORY.get(bigram, [])
-                    for category in categories:
-                        found_skills[category].add(bigram)
-            
-            # Trigrams
-            if i < len(words) - 2:
-                trigram = ' '.join(words[i:i+3])
-                if trigram in all_skills:
-                    categories = SKILL_TO_CATEGORY.get(trigram, [])
-                    for category in categories:
-                        found_skills[category].add(trigram)
-        
-        # Convert defaultdict to regular dict
-        return {category: skills for category, skills in found_skills.items()}
+        # The lexicon automaton is compiled once at import and matches phrases of any length;
+        # it consumes the token stream produced alongside the normalised text
+        with stage_timer("preprocessing"):
+            tokens = normalize_document(text).tokens
+        with stage_timer("skill_extraction"):
+            return SKILL_LEXICON.find_skills_in_tokens(tokens)
+
+    def skill_extractor(self) -> IncrementalSkillExtractor:
+        """
+        Start incremental skill extraction for a document that arrives in pieces
+        """
+        return IncrementalSkillExtractor()
+
+    def extract_skills_from_pages(self, pages: Iterable[str]) -> Tuple[Dict[str, Set[str]], List[str]]:
+        """
+        Extract skills from a stream of page texts while it is still being produced.
+        Returns the skills and the consumed pages.
+        """
+        extractor = self.skill_extractor()
+        consumed = []
+        for page in pages:
+            extractor.feed(page)
+            consumed.append(page)
+        return extractor.skills, consumed
     
     def calculate_skill_match_score(self, resume_skills: Dict[str, Set[str]], 
                                    jd_skills: Dict[str, Set[str]]) -> Dict[str, float]:
@@ -118,6 +342,115 @@ class ResumeJobMatcher:
         
         return skill_scores
     
+    def embed_texts(self, processed_texts: List[str]) -> np.ndarray:
+        """
+        Embed preprocessed texts, serving repeats from the content-addressed cache
+        and encoding all misses in a single batch (shared with other concurrent
+        requests when micro-batching is enabled)
+        """
+        with stage_timer("embedding"):
+            keys = [embedding_cache_key(self.cache_namespace, text) for text in processed_texts]
+            vectors = [self.embedding_cache.get(key) for key in keys]
+
+            missing = {}
+            for i, vector in enumerate(vectors):
+                if vector is None:
+                    missing.setdefault(keys[i], processed_texts[i])
+            if missing:
+                if self.batcher is not None:
+                    # Coalesced with texts from other in-flight requests
+                    encoded = self.batcher.encode(list(missing.values()))
+                else:
+                    encoded = self._encode(list(missing.values()))
+                fresh = dict(zip(missing.keys(), encoded))
+                for key, vector in fresh.items():
+                    self.embedding_cache.put(key, vector)
+                vectors = [fresh[key] if vector is None else vector for key, vector in zip(keys, vectors)]
+
+            return np.vstack(vectors).astype(np.float32, copy=False)
+
+    def chunk_text(self, processed_text: str) -> List[str]:
+        """
+        Split a preprocessed document into overlapping word windows that each fit
+        the model's input, so no part of a long document is silently truncated
+        """
+        words = processed_text.split()
+        size = self.chunk_words
+        step = size - self.chunk_overlap_words
+        if len(words) <= size:
+            return [processed_text]
+        return [' '.join(words[start:start + size])
+                for start in range(0, len(words) - self.chunk_overlap_words, step)]
+
+    def document_vectors(self, processed_texts: List[str]) -> List[np.ndarray]:
+        """
+        Unit-normalised embedding rows for each preprocessed document: one row in
+        'document' mode, one per chunk in 'chunked' mode. All documents share one batch.
+        """
+        if not processed_texts:
+            return []
+        pieces = [[text] if self.similarity_mode == "document" else self.chunk_text(text)
+                  for text in processed_texts]
+        flat = self.embed_texts([piece for document in pieces for piece in document])
+        flat = flat / np.maximum(np.linalg.norm(flat, axis=1, keepdims=True), 1e-12)
+        bounds = np.cumsum([0] + [len(document) for document in pieces])
+        return [flat[bounds[i]:bounds[i + 1]] for i in range(len(pieces))]
+
+    def pooled_similarity(self, resume_vectors: List[np.ndarray], jd_vectors: List[np.ndarray]) -> np.ndarray:
+        """
+        Similarity of every resume against every JD given their document_vectors.
+        Whole-document and mean-pooled scores come from one matrix product; the
+        chunk-alignment poolings are reduced pair by pair.
+        """
+        if not resume_vectors or not jd_vectors:
+            return np.zeros((len(resume_vectors), len(jd_vectors)), dtype=np.float32)
+
+        if self.similarity_mode == "document" or self.similarity_pooling == "mean":
+            resumes = np.vstack([vectors.mean(axis=0) for vectors in resume_vectors])
+            jds = np.vstack([vectors.mean(axis=0) for vectors in jd_vectors])
+            return self._cosine_matrix(resumes, jds)
+
+        similarity = np.empty((len(resume_vectors), len(jd_vectors)), dtype=np.float32)
+        for r, resume in enumerate(resume_vectors):
+            for j, jd in enumerate(jd_vectors):
+                similarity[r, j] = self._pool_chunk_similarity(resume @ jd.T)
+        return similarity
+
+    def similarity_matrix(self, processed_resumes: List[str], processed_jds: List[str]) -> np.ndarray:
+        """
+        Semantic similarity of every preprocessed resume against every preprocessed JD.
+        In chunked mode the chunks of all documents are embedded in one batch and the
+        chunk-level similarities are pooled per pair.
+        """
+        unique_texts = list(dict.fromkeys(processed_resumes + processed_jds))
+        vectors = dict(zip(unique_texts, self.document_vectors(unique_texts)))
+        with stage_timer("scoring"):
+            return self.pooled_similarity([vectors[text] for text in processed_resumes],
+                                          [vectors[text] for text in processed_jds])
+
+    def _pool_chunk_similarity(self, chunk_similarity: np.ndarray) -> float:
+        """
+        Reduce a (resume chunks x JD chunks) cosine matrix to one score:
+        'max' averages, over JD chunks, the best-matching resume chunk (max-sim);
+        'topk' averages the k strongest chunk alignments overall.
+        """
+        if self.similarity_pooling == "max":
+            return float(chunk_similarity.max(axis=0).mean())
+        k = min(max(1, self.similarity_top_k), chunk_similarity.size)
+        return float(np.partition(chunk_similarity.ravel(), -k)[-k:].mean())
+
+    def _encode(self, texts: List[str]) -> np.ndarray:
+        return self.embedding_backend.encode(texts)
+
+    @staticmethod
+    def _cosine_matrix(a: np.ndarray, b: np.ndarray) -> np.ndarray:
+        """
+        Pairwise cosine similarity of the rows of `a` against the rows of `b`
+        """
+        a = a / np.maximum(np.linalg.norm(a, axis=1, keepdims=True), 1e-12)
+        b = b / np.maximum(np.linalg.norm(b, axis=1, keepdims=True), 1e-12)
+        return a @ b.T
+
     def calculate_text_similarity(self, resume_text: str, jd_text: str) -> float:
         """
         Calculate overall text similarity using semantic embeddings only
@@ -128,76 +461,94 @@ class ResumeJobMatcher:
             processed_jd = self.preprocess_text(jd_text)
 
             # Semantic Similarity using SentenceTransformer
-            embeddings = self.embedding_model.encode([processed_resume, processed_jd], convert_to_tensor=True)
-            semantic_similarity = util.pytorch_cos_sim(embeddings[0], embeddings[1]).item()
-
-            # Log semantic similarity score
-            print(f"Semantic Similarity Score: {semantic_similarity}")
+            semantic_similarity = float(self.similarity_matrix([processed_resume], [processed_jd])[0, 0])
 
             return semantic_similarity
 
         except Exception as e:
-            print(f"Error calculating text similarity: {e}")
+            log_event(logger, logging.ERROR, "text_similarity_failed", error=str(e))
             return 0.0
 
     def _extract_experience_years(self, text: str, prefer_lower_for_range: bool = True) -> float | None:
         """
-        Extract a years-of-experience value from free text. Returns a float number of years
-        or None if not found. For ranges in JD (prefer_lower_for_range=True) we return the
-        lower bound (e.g. '3-5 years' -> 3). For resume ranges we tend to take the higher
-        bound to represent the candidate's experience.
-        Also maps level words (senior/mid/junior) to approximate years when numeric data
-        isn't present.
+        Extract a years-of-experience value from free text, or None if not found.
+        prefer_lower_for_range=True reads a job description's requirement (ranges give
+        their lower bound); False reads a resume's experience (merged employment
+        periods or stated totals). See experience_extraction.
         """
-        if not text:
-            return None
+        return extract_experience(text, requirement=prefer_lower_for_range).years
 
-        t = text.lower()
-
-        # Try to find explicit ranges like '3-5 years' or '3 – 5 years'
-        range_match = re.search(r"(\d+(?:\.\d+)?)\s*[–\-—]\s*(\d+(?:\.\d+)?)\s*(?:years?|yrs?)", t)
-        if range_match:
-            a = float(range_match.group(1))
-            b = float(range_match.group(2))
-            return a if prefer_lower_for_range else b
+    def calculate_overall_match_score(self, resume_text: str, jd_text: str,
+                                      resume_skills: Dict[str, Set[str]] | None = None,
+                                      jd_skills: Dict[str, Set[str]] | None = None) -> Dict:
+        """
+        Calculate comprehensive matching score between resume and job description.
+        Skills already extracted (e.g. page by page during parsing) can be passed in.
+        """
+        # Extract skills from both texts
+        if resume_skills is None:
+            resume_skills = self.extract_skills_from_text(resume_text)
+        if jd_skills is None:
+            jd_skills = self.extract_skills_from_text(jd_text)
 
-        # Try to find patterns like '3+ years', 'at least 3 years', 'minimum 3 years'
-        plus_match = re.search(r"(?:at least|minimum|min|>=)?\s*(\d+(?:\.\d+)?)\+?\s*(?:years?|yrs?)", t)
-        if plus_match:
-            return float(plus_match.group(1))
+        # Calculate overall text similarity
+        text_similarity = self.calculate_text_similarity(resume_text, jd_text)
+        # Extract experience (years) from JD and Resume if present
+        with stage_timer("experience_parsing"):
+            jd_experience = self._extract_experience_years(jd_text, prefer_lower_for_range=True)
+            resume_profile = extract_experience(resume_text)
+            resume_experience = resume_profile.years
 
-        # Try common phrases: '5 years of experience'
-        years_match = re.search(r"(\d+(?:\.\d+)?)\s*(?:years?|yrs?)", t)
-        if years_match:
-            return float(years_match.group(1))
+        with stage_timer("scoring"):
+            result = self._combine_scores(resume_skills, jd_skills, text_similarity,
+                                          resume_experience, jd_experience,
+                                          [role.as_dict() for role in resume_profile.roles])
 
-        # Map level words to approximate years
-        if re.search(r"\bsenior\b", t):
-            return 5.0
-        if re.search(r"\bmid[- ]?level\b|\bmid\b|\bexperienced\b", t):
-            return 3.0
-        if re.search(r"\bjunior\b|\bentry[- ]?level\b", t):
-            return 1.0
+        log_event(logger, logging.DEBUG, "match_scored", sampled=True,
+                  overall_match_percentage=result['overall_match_percentage'],
+                  text_similarity=round(text_similarity, 4),
+                  jd_experience_years=jd_experience, resume_experience_years=resume_experience,
+                  experience_match_score=result['experience_match_score'])
 
-        return None
+        return result
 
-    def calculate_overall_match_score(self, resume_text: str, jd_text: str) -> Dict:
+    def _combine_scores(self, resume_skills: Dict[str, Set[str]], jd_skills: Dict[str, Set[str]],
+                        text_similarity: float, resume_experience: float | None,
+                        jd_experience: float | None, resume_roles: Sequence[Dict] = ()) -> Dict:
         """
-        Calculate comprehensive matching score between resume and job description
+        Combine per-document features (skills, similarity, experience) into the match result
         """
-        # Extract skills from both texts
-        resume_skills = self.extract_skills_from_text(resume_text)
-        jd_skills = self.extract_skills_from_text(jd_text)
-
         # Calculate skill matching scores
         skill_scores = self.calculate_skill_match_score(resume_skills, jd_skills)
 
-        # Calculate overall text similarity
-        text_similarity = self.calculate_text_similarity(resume_text, jd_text)
-        # Extract experience (years) from JD and Resume if present
-        jd_experience = self._extract_experience_years(jd_text, prefer_lower_for_range=True)
-        resume_experience = self._extract_experience_years(resume_text, prefer_lower_for_range=False)
+        # Calculate average skill score (only for categories required by JD)
+        jd_categories = set(jd_skills.keys())
+        if jd_categories:
+            relevant_skill_scores = [skill_scores[cat] for cat in jd_categories if cat in skill_scores]
+            avg_skill_score = np.mean(relevant_skill_scores) if relevant_skill_scores else 0.0
+        else:
+            avg_skill_score = 0.0
+
+        return self._match_result(
+            avg_skill_score, text_similarity, resume_experience, jd_experience,
+            {cat: round(score * 100, 2) for cat, score in skill_scores.items()},
+            {cat: list(skills) for cat, skills in resume_skills.items()},
+            {cat: list(skills) for cat, skills in jd_skills.items()},
+            self._get_matched_skills(resume_skills, jd_skills),
+            self._get_missing_skills(resume_skills, jd_skills),
+            resume_roles,
+        )
 
+    @staticmethod
+    def _match_result(avg_skill_score: float, text_similarity: float, resume_experience: float | None,
+                      jd_experience: float | None, skill_match_scores: Dict[str, float],
+                      resume_skills: Dict[str, List[str]], jd_skills: Dict[str, List[str]],
+                      matched_skills: Dict[str, List[str]], missing_skills: Dict[str, List[str]],
+                      resume_roles: Sequence[Dict] = ()) -> Dict:
+        """
+        Weight the skill, similarity and experience scores into the match result,
+        the one schema of single, bulk and stored-document results
+        """
         # Calculate weighted overall score
         # Base weights
         skill_weight = 0.7
@@ -216,14 +567,6 @@ class ResumeJobMatcher:
             skill_weight = remaining * skill_ratio
             text_weight = remaining * text_ratio
 
-        # Calculate average skill score (only for categories required by JD)
-        jd_categories = set(jd_skills.keys())
-        if jd_categories:
-            relevant_skill_scores = [skill_scores[cat] for cat in jd_categories if cat in skill_scores]
-            avg_skill_score = np.mean(relevant_skill_scores) if relevant_skill_scores else 0.0
-        else:
-            avg_skill_score = 0.0
-
         # Experience match: compute ratio of resume_experience/jd_experience up to 1.0
         experience_score = 0.0
         if jd_experience is not None:
@@ -234,35 +577,152 @@ class ResumeJobMatcher:
                 # If candidate has equal or more years, full score
                 experience_score = min(1.0, resume_experience / jd_experience)
 
-        # Log experience details
-        try:
-            jd_exp_str = f"{jd_experience}" if jd_experience is not None else "not specified"
-            resume_exp_str = f"{resume_experience}" if resume_experience is not None else "not specified"
-            print(f"Experience - JD requirement: {jd_exp_str} years, Resume: {resume_exp_str} years, Experience match: {round(experience_score*100,2)}%")
-        except Exception:
-            # Fail-safe: don't break scoring on logging errors
-            pass
-
         overall_score = (skill_weight * avg_skill_score) + (text_weight * text_similarity) + (experience_weight * experience_score)
 
         # Convert score to percentage
         overall_percentage = min(100.0, overall_score * 100)
 
-        # Log combined score
-        print(f"Combined Overall Match Score: {overall_percentage}% (skills={avg_skill_score:.2f}, text={text_similarity:.2f}, experience={experience_score:.2f})")
-
         return {
             'overall_match_percentage': round(overall_percentage, 2),
             'text_similarity_score': round(text_similarity * 100, 2),
-            'skill_match_scores': {cat: round(score * 100, 2) for cat, score in skill_scores.items()},
-            'resume_skills': {cat: list(skills) for cat, skills in resume_skills.items()},
-            'job_description_skills': {cat: list(skills) for cat, skills in jd_skills.items()},
-            'matched_skills': self._get_matched_skills(resume_skills, jd_skills),
-            'missing_skills': self._get_missing_skills(resume_skills, jd_skills),
+            'skill_match_scores': skill_match_scores,
+            'resume_skills': resume_skills,
+            'job_description_skills': jd_skills,
+            'matched_skills': matched_skills,
+            'missing_skills': missing_skills,
             'jd_experience_years': jd_experience,
             'resume_experience_years': resume_experience,
-            'experience_match_score': round(experience_score * 100, 2)
+            'experience_match_score': round(experience_score * 100, 2),
+            # Per-role durations behind resume_experience_years
+            'resume_roles': list(resume_roles)
         }
+
+    def _score_skill_batch(self, resume: DocumentFeatures, jds: List[DocumentFeatures], batch: SkillBatch,
+                           jd_listed: List[Dict[str, List[str]]], similarity: np.ndarray) -> Dict[int, Dict]:
+        """
+        Results of one resume against the encoded JDs of `batch`, by JD position.
+        Identical to _combine_scores, with the per-category counts, percentages and
+        averages taken from one product over the batch instead of set algebra; the
+        sets are only intersected where a category has matched or missing skills.
+        """
+        resume_ids = encode_skills(resume.skills)
+        if resume_ids is None or not len(batch):
+            return {}
+        scores = batch.score(resume_ids)
+        matched_rows, percent_rows = scores.matched.tolist(), scores.percentages.tolist()
+        required_rows = batch.required.tolist()
+        resume_skills = resume.skills
+        resume_categories = set(resume_skills.keys())
+        resume_listed = {cat: list(skills) for cat, skills in resume_skills.items()}
+
+        results = {}
+        for row, j in enumerate(batch.positions):
+            jd_skills = jds[j].skills
+            columns = batch.columns[row]
+            matched_row, percent_row, required_row = matched_rows[row], percent_rows[row], required_rows[row]
+            # Categories in set-union order like calculate_skill_match_score, 0.0 unless the JD has them
+            skill_match_scores = dict.fromkeys(resume_categories | set(jd_skills.keys()), 0.0)
+            skill_match_scores.update((cat, percent_row[column]) for cat, column in zip(jd_skills, columns))
+            matched, missing = {}, {}
+            for cat, column in zip(jd_skills, columns):
+                hits = matched_row[column]
+                if hits:
+                    matched[cat] = list(resume_skills[cat] & jd_skills[cat])
+                if hits < required_row[column]:
+                    missing[cat] = list(jd_skills[cat] - resume_skills.get(cat, set()))
+            results[j] = self._match_result(
+                scores.averages[row] if columns else 0.0, float(similarity[j]),
+                resume.experience_years, jds[j].experience_years,
+                skill_match_scores, resume_listed, jd_listed[j], matched, missing, resume.roles,
+            )
+        return results
+    
+    def match_many(self, resume_text: str, jd_texts: List[str]) -> List[Dict]:
+        """
+        Score one resume against many job descriptions and return results ranked
+        by overall match. Each result carries the JD's position in `jd_texts`.
+        """
+        grid = self._match_grid([resume_text], jd_texts)
+        return self.rank_results([(i, result) for i, result in enumerate(grid[0])], 'job_description_index')
+
+    def match_many_resumes(self, resume_texts: List[str], jd_text: str) -> List[Dict]:
+        """
+        Score many resumes against one job description and return results ranked
+        by overall match. Each result carries the resume's position in `resume_texts`.
+        """
+        grid = self._match_grid(resume_texts, [jd_text])
+        return self.rank_results([(i, row[0]) for i, row in enumerate(grid)], 'resume_index')
+
+    def extract_features(self, resume_texts: List[str],
+                         jd_texts: List[str]) -> Tuple[List[DocumentFeatures], List[DocumentFeatures]]:
+        """
+        Scoring features for resumes and job descriptions. Each unique document is
+        preprocessed, skill-extracted and embedded exactly once; all uncached
+        embeddings come from a single batched encode call.
+        """
+        unique_texts = list(dict.fromkeys(resume_texts + jd_texts))
+        # Normalise each document exactly once, even when the batch outgrows the normalisation memo
+        with stage_timer("preprocessing"):
+            normalized = [normalize(text) for text in unique_texts]
+        tokens = {text: document.tokens for text, document in zip(unique_texts, normalized)}
+        with stage_timer("skill_extraction"):
+            skills = {text: SKILL_LEXICON.find_skills_in_tokens(tokens[text]) for text in unique_texts}
+        vectors = dict(zip(unique_texts, self.document_vectors([document.text for document in normalized])))
+
+        with stage_timer("experience_parsing"):
+            unique_resumes = list(dict.fromkeys(resume_texts))
+            unique_jds = list(dict.fromkeys(jd_texts))
+            resume_profiles = dict(zip(unique_resumes, extract_experience_many(unique_resumes)))
+            jd_years = {text: profile.years
+                        for text, profile in zip(unique_jds, extract_experience_many(unique_jds, requirement=True))}
+        resumes = {text: DocumentFeatures(skills[text], profile.years, vectors[text], tokens[text],
+                                          [role.as_dict() for role in profile.roles])
+                   for text, profile in resume_profiles.items()}
+        jds = {text: DocumentFeatures(skills[text], years, vectors[text], tokens[text])
+               for text, years in jd_years.items()}
+        return [resumes[text] for text in resume_texts], [jds[text] for text in jd_texts]
+
+    def score_features(self, resumes: List[DocumentFeatures], jds: List[DocumentFeatures]) -> List[List[Dict]]:
+        """
+        Score every resume against every job description from precomputed features,
+        with all similarities from one pooled matrix computation and each resume's
+        per-category skill scores against all job descriptions from one product
+        over their skill matrix (see skill_matrix). Results share each document's
+        skill lists, so treat them as read-only.
+        """
+        with stage_timer("scoring"):
+            similarity = self.pooled_similarity([resume.vectors for resume in resumes], [jd.vectors for jd in jds])
+            batch = SkillBatch([jd.skills for jd in jds])
+            jd_listed = [{cat: list(skills) for cat, skills in jd.skills.items()} for jd in jds]
+            grid = []
+            for r, resume in enumerate(resumes):
+                encoded = self._score_skill_batch(resume, jds, batch, jd_listed, similarity[r])
+                # Documents whose skills do not encode are scored with set algebra
+                grid.append([
+                    encoded[j] if j in encoded else
+                    self._combine_scores(resume.skills, jd.skills, float(similarity[r, j]),
+                                         resume.experience_years, jd.experience_years, resume.roles)
+                    for j, jd in enumerate(jds)
+                ])
+            return grid
+
+    def _match_grid(self, resume_texts: List[str], jd_texts: List[str]) -> List[List[Dict]]:
+        """
+        Score every resume against every job description in one batched pass
+        """
+        if not resume_texts or not jd_texts:
+            return [[] for _ in resume_texts]
+        resumes, jds = self.extract_features(resume_texts, jd_texts)
+        return self.score_features(resumes, jds)
+
+    @staticmethod
+    def rank_results(indexed_results: List[Tuple[int, Dict]], index_key: str) -> List[Dict]:
+        """
+        Sort (input index, result) pairs by overall match, best first, and annotate ranks
+        """
+        ordered = sorted(indexed_results, key=lambda item: (-item[1]['overall_match_percentage'], item[0]))
+        return [{'rank': rank, index_key: index, **result}
+                for rank, (index, result) in enumerate(ordered, start=1)]
     
     def _get_matched_skills(self, resume_skills: Dict[str, Set[str]], 
                           jd_skills: Dict[str, Set[str]]) -> Dict[str, List[str]]:
@@ -290,11 +750,82 @@ class ResumeJobMatcher:
                 missing[category] = missing_in_category
         return missing
 
-# Create global matcher instance
-matcher = ResumeJobMatcher()
+# Global matcher instance, created on first use so importing this module stays cheap
+_matcher: Optional[ResumeJobMatcher] = None
+_matcher_lock = threading.Lock()
+
+def get_matcher() -> ResumeJobMatcher:
+    """
+    Shared matcher instance (the embedding model inside it loads lazily)
+    """
+    global _matcher
+    if _matcher is None:
+        with _matcher_lock:
+            if _matcher is None:
+                _matcher = ResumeJobMatcher()
+    return _matcher
+
+def __getattr__(name: str):
+    # Keep `matching_engine.matcher` working without creating it at import time
+    if name == "matcher":
+        return get_matcher()
+    raise AttributeError(f"module {__name__!r} has no attribute {name!r}")
 
-def get_resume_job_match_score(resume_text: str, jd_text: str) -> Dict:
+def warm_up() -> None:
+    """
+    Load the model and run the warm-up corpus through it, so the first request
+    pays no initialisation cost
+    """
+    started = time.perf_counter()
+    try:
+        texts = warmup_texts(INFERENCE_CONFIG)
+        get_matcher().load_model(texts)
+        log_event(logger, logging.INFO, "model_ready", seconds=round(time.perf_counter() - started, 2),
+                  warmup_texts=len(texts), **INFERENCE_CONFIG.as_dict())
+    except Exception as e:
+        log_event(logger, logging.WARNING, "model_warm_up_failed", error=str(e))
+
+def get_model_state() -> str:
+    """
+    'not_loaded', 'loading', 'warming_up', 'ready' or 'failed'
+    """
+    return _matcher.model_state if _matcher is not None else "not_loaded"
+
+def get_resume_job_match_score(resume_text: str, jd_text: str,
+                               resume_skills: Dict[str, Set[str]] | None = None,
+                               jd_skills: Dict[str, Set[str]] | None = None) -> Dict:
     """
     Main function to get matching score between resume and job description
     """
-    return matcher.calculate_overall_match_score(resume_text, jd_text)
\ No newline at end of file
+    return get_matcher().calculate_overall_match_score(resume_text, jd_text, resume_skills, jd_skills)
+
+def new_skill_extractor() -> IncrementalSkillExtractor:
+    """
+    Incremental skill extractor bound to the shared matcher's preprocessing
+    """
+    return get_matcher().skill_extractor()
+
+def get_bulk_match_scores(resume_text: str, jd_texts: List[str]) -> List[Dict]:
+    """
+    Rank many job descriptions for one resume in a single batched pass
+    """
+    return get_matcher().match_many(resume_text, jd_texts)
+
+def get_bulk_resume_match_scores(resume_texts: List[str], jd_text: str) -> List[Dict]:
+    """
+    Rank many resumes for one job description in a single batched pass
+    """
+    return get_matcher().match_many_resumes(resume_texts, jd_text)
+
+def get_embedding_cache_stats() -> Dict:
+    """
+    Hit/miss/eviction counters of the shared embedding cache
+    """
+    return get_matcher().embedding_cache.stats()
+
+def get_embedding_batcher_stats() -> Dict | None:
+    """
+    Batch counters of the shared micro-batching scheduler, or None when disabled
+    """
+    batcher = get_matcher().batcher
+    return batcher.stats() if batcher is not None else None
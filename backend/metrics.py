@@ -0,0 +1,185 @@
+"""
+Metrics
+Per-stage latency histograms and request counters, rendered in the Prometheus
+text exposition format for the /metrics endpoint.
+
+Stages are timed with `stage_timer("embedding")`. Besides feeding the
+histogram, a timer adds its duration to the current request's timing
+breakdown when one is being collected (see collect_timings), which endpoints
+return behind their debug flag. The breakdown lives in a context variable, so
+it follows the request into worker threads started with copy_context().
+"""
+
+import contextvars
+import threading
+import time
+from contextlib import contextmanager
+from typing import Dict, Iterator, List, Optional, Tuple
+
+STAGES = ("upload_read", "pdf_parse", "preprocessing", "skill_extraction",
+          "embedding", "experience_parsing", "scoring")
+
+# Seconds; spans sub-millisecond lexicon passes to multi-second cold model loads
+DEFAULT_BUCKETS = (0.0005, 0.001, 0.0025, 0.005, 0.01, 0.025, 0.05, 0.1, 0.25, 0.5, 1.0, 2.5, 5.0, 10.0)
+# Seconds; queued jobs can wait minutes behind a backlog
+JOB_BUCKETS = (0.01, 0.05, 0.1, 0.25, 0.5, 1.0, 2.5, 5.0, 10.0, 30.0, 60.0, 120.0, 300.0, 600.0)
+
+_request_timings: contextvars.ContextVar[Optional[Dict[str, float]]] = contextvars.ContextVar(
+    "request_timings", default=None
+)
+
+
+def _format_labels(labels: Tuple[Tuple[str, str], ...], extra: str = "") -> str:
+    parts = [f'{name}="{value}"' for name, value in labels] + ([extra] if extra else [])
+    return "{" + ",".join(parts) + "}" if parts else ""
+
+
+class Histogram:
+    """
+    Cumulative-bucket histogram keyed by label values
+    """
+
+    def __init__(self, name: str, help_text: str, label_names: Tuple[str, ...],
+                 buckets: Tuple[float, ...] = DEFAULT_BUCKETS):
+        self.name = name
+        self.help = help_text
+        self.label_names = label_names
+        self.buckets = buckets
+        self._series: Dict[Tuple[str, ...], List] = {}
+        self._lock = threading.Lock()
+
+    def observe(self, value: float, *label_values: str) -> None:
+        with self._lock:
+            series = self._series.get(label_values)
+            if series is None:
+                series = self._series[label_values] = [[0] * len(self.buckets), 0.0, 0]
+            counts = series[0]
+            for i, bound in enumerate(self.buckets):
+                if value <= bound:
+                    counts[i] += 1
+                    break
+            series[1] += value
+            series[2] += 1
+
+    def render(self) -> List[str]:
+        lines = [f"# HELP {self.name} {self.help}", f"# TYPE {self.name} histogram"]
+        with self._lock:
+            snapshot = {labels: (list(counts), total, count) for labels, (counts, total, count) in self._series.items()}
+        for label_values, (counts, total, count) in sorted(snapshot.items()):
+            labels = tuple(zip(self.label_names, label_values))
+            cumulative = 0
+            for bound, bucket_count in zip(self.buckets, counts):
+                cumulative += bucket_count
+                le = 'le="%s"' % bound
+                lines.append(f"{self.name}_bucket{_format_labels(labels, le)} {cumulative}")
+            le = 'le="+Inf"'
+            lines.append(f"{self.name}_bucket{_format_labels(labels, le)} {count}")
+            lines.append(f"{self.name}_sum{_format_labels(labels)} {total:.6f}")
+            lines.append(f"{self.name}_count{_format_labels(labels)} {count}")
+        return lines
+
+
+class Counter:
+    def __init__(self, name: str, help_text: str, label_names: Tuple[str, ...]):
+        self.name = name
+        self.help = help_text
+        self.label_names = label_names
+        self._values: Dict[Tuple[str, ...], float] = {}
+        self._lock = threading.Lock()
+
+    def inc(self, *label_values: str, amount: float = 1.0) -> None:
+        with self._lock:
+            self._values[label_values] = self._values.get(label_values, 0.0) + amount
+
+    def render(self) -> List[str]:
+        lines = [f"# HELP {self.name} {self.help}", f"# TYPE {self.name} counter"]
+        with self._lock:
+            snapshot = sorted(self._values.items())
+        for label_values, value in snapshot:
+            lines.append(f"{self.name}{_format_labels(tuple(zip(self.label_names, label_values)))} {value:g}")
+        return lines
+
+
+stage_duration = Histogram(
+    "resume_matcher_stage_duration_seconds", "Time spent in each processing stage.", ("stage",)
+)
+request_duration = Histogram(
+    "resume_matcher_http_request_duration_seconds", "End-to-end HTTP request latency.", ("method", "route", "status")
+)
+requests_total = Counter(
+    "resume_matcher_http_requests_total", "HTTP requests served.", ("method", "route", "status")
+)
+job_wait_duration = Histogram(
+    "resume_matcher_job_wait_seconds", "Time jobs spent queued before a worker started them.", ("priority",),
+    JOB_BUCKETS
+)
+job_run_duration = Histogram(
+    "resume_matcher_job_run_seconds", "Time jobs ran once started.", ("priority", "status"), JOB_BUCKETS
+)
+
+
+@contextmanager
+def stage_timer(stage: str) -> Iterator[None]:
+    """
+    Time a block as one occurrence of `stage`
+    """
+    started = time.perf_counter()
+    try:
+        yield
+    finally:
+        record_stage(stage, time.perf_counter() - started)
+
+
+def record_stage(stage: str, seconds: float) -> None:
+    stage_duration.observe(seconds, stage)
+    timings = _request_timings.get()
+    if timings is not None:
+        timings[stage] = timings.get(stage, 0.0) + seconds
+
+
+@contextmanager
+def collect_timings() -> Iterator[Dict[str, float]]:
+    """
+    Collect the per-stage totals (seconds) of everything timed inside the block
+    """
+    timings: Dict[str, float] = {}
+    token = _request_timings.set(timings)
+    try:
+        yield timings
+    finally:
+        _request_timings.reset(token)
+
+
+def current_timings_ms() -> Dict[str, float]:
+    """
+    Stage totals collected so far for the current request, in milliseconds
+    """
+    timings = _request_timings.get() or {}
+    return {stage: round(seconds * 1000, 3) for stage, seconds in timings.items()}
+
+
+def record_request(method: str, route: str, status: int, seconds: float) -> None:
+    request_duration.observe(seconds, method, route, str(status))
+    requests_total.inc(method, route, str(status))
+
+
+def record_job(priority: str, status: str, waited: float, ran: float) -> None:
+    job_wait_duration.observe(waited, priority)
+    job_run_duration.observe(ran, priority, status)
+
+
+def render_metrics(gauges: Optional[Dict[str, float]] = None,
+                   counters: Optional[Dict[str, float]] = None) -> str:
+    """
+    All metrics in the Prometheus text format; `gauges` adds point-in-time values and
+    `counters` cumulative ones, which are exported with the `_total` suffix
+    """
+    lines = stage_duration.render() + request_duration.render() + requests_total.render() + \
+        job_wait_duration.render() + job_run_duration.render()
+    for kind, values, suffix in (("gauge", gauges, ""), ("counter", counters, "_total")):
+        for name, value in sorted((values or {}).items()):
+            if value is None:
+                continue
+            lines.append(f"# TYPE {name}{suffix} {kind}")
+            lines.append(f"{name}{suffix} {float(value):g}")
+    return "\n".join(lines) + "\n"
@@ -0,0 +1,167 @@
+"""
+PDF Text Extraction Module
+Pure pypdf helpers with no web or model dependencies, so they can run in worker processes
+"""
+
+import logging
+import os
+import tempfile
+from concurrent.futures import Executor, ProcessPoolExecutor
+from io import BytesIO
+from typing import BinaryIO, Iterator, List, Optional, Tuple, Union
+from pypdf import PdfReader
+
+from structured_logging import get_logger, log_event
+
+# Pages beyond this are never parsed; uploads larger than this many bytes are rejected
+PDF_MAX_PAGES = int(os.environ.get("PDF_MAX_PAGES", 50))
+PDF_MAX_BYTES = int(os.environ.get("PDF_MAX_BYTES", 20 * 1024 * 1024))
+
+# Documents with at least this many pages are split into tasks of PDF_PAGES_PER_TASK pages
+PDF_PARALLEL_MIN_PAGES = int(os.environ.get("PDF_PARALLEL_MIN_PAGES", 8))
+PDF_PAGES_PER_TASK = int(os.environ.get("PDF_PAGES_PER_TASK", 4))
+
+# Where PDFs are written for worker processes to open (default: the system temp directory)
+PDF_SPOOL_DIR = os.environ.get("PDF_SPOOL_DIR") or None
+
+# A PDF handed to the worker helpers: its bytes, or the path of a file spooled with spool_pdf
+PDFSource = Union[bytes, str]
+
+logger = get_logger("pdf_extraction")
+
+
+class PDFExtractionError(ValueError):
+    """Raised when a PDF cannot be parsed at all."""
+
+
+class PDFTooLargeError(PDFExtractionError):
+    """Raised when a PDF exceeds the configured byte limit."""
+
+
+def check_pdf_size(pdf_bytes: bytes, max_bytes: int = PDF_MAX_BYTES) -> None:
+    if len(pdf_bytes) > max_bytes:
+        raise PDFTooLargeError(f"PDF is {len(pdf_bytes)} bytes, limit is {max_bytes}")
+
+
+def _open_reader(pdf_bytes: Union[bytes, BinaryIO]) -> PdfReader:
+    try:
+        # BytesIO over a bytes object shares its buffer instead of copying the upload
+        return PdfReader(BytesIO(pdf_bytes) if isinstance(pdf_bytes, bytes) else pdf_bytes)
+    except Exception as e:
+        raise PDFExtractionError(str(e)) from e
+
+
+def _open_source(source: PDFSource) -> BinaryIO:
+    if isinstance(source, bytes):
+        return BytesIO(source)
+    try:
+        # pypdf seeks through the file and reads only the objects a page needs
+        return open(source, "rb")
+    except OSError as e:
+        raise PDFExtractionError(str(e)) from e
+
+
+def spool_pdf(pdf_bytes: bytes) -> str:
+    """
+    Write a PDF to a temporary file that worker processes open by path, so its
+    bytes are not pickled into every task. Remove it with remove_spooled_pdf.
+    """
+    fd, path = tempfile.mkstemp(suffix=".pdf", dir=PDF_SPOOL_DIR)
+    with os.fdopen(fd, "wb") as f:
+        f.write(pdf_bytes)
+    return path
+
+
+def remove_spooled_pdf(path: str) -> None:
+    try:
+        os.unlink(path)
+    except FileNotFoundError:
+        pass
+
+
+def _page_text(reader: PdfReader, page_index: int) -> str:
+    try:
+        return reader.pages[page_index].extract_text() or ""
+    except Exception as page_error:
+        log_event(logger, logging.WARNING, "pdf_page_extraction_failed", page=page_index + 1, error=str(page_error))
+        return ""
+
+
+def format_page(page_number: int, page_text: str) -> str:
+    """Render one page the way extract_text joins them."""
+    return f"--- Page {page_number} ---\n{page_text}\n\n" if page_text else ""
+
+
+def count_pages(source: PDFSource, max_pages: int = PDF_MAX_PAGES) -> int:
+    """Number of pages that will be extracted, capped at `max_pages`."""
+    with _open_source(source) as stream:
+        try:
+            return min(len(_open_reader(stream).pages), max_pages)
+        except PDFExtractionError:
+            raise
+        except Exception as e:
+            raise PDFExtractionError(str(e)) from e
+
+
+def extract_page_range(source: PDFSource, start: int, stop: int) -> List[Tuple[int, str]]:
+    """
+    Extract pages [start, stop) as (1-based page number, text) pairs.
+    Top-level so it can be shipped to worker processes.
+    """
+    with _open_source(source) as stream:
+        reader = _open_reader(stream)
+        stop = min(stop, len(reader.pages))
+        return [(index + 1, _page_text(reader, index)) for index in range(start, stop)]
+
+
+def page_ranges(page_count: int, pages_per_task: int = PDF_PAGES_PER_TASK) -> List[Tuple[int, int]]:
+    """Split a document into per-task page ranges; small documents stay a single task."""
+    if page_count < PDF_PARALLEL_MIN_PAGES:
+        return [(0, page_count)] if page_count else []
+    step = max(1, pages_per_task)
+    return [(start, min(start + step, page_count)) for start in range(0, page_count, step)]
+
+
+def iter_page_texts(pdf_bytes: bytes, max_pages: int = PDF_MAX_PAGES) -> Iterator[Tuple[int, str]]:
+    """
+    Yield (page number, text) one page at a time, stopping after `max_pages`
+    so oversized documents are never fully parsed.
+    """
+    reader = _open_reader(pdf_bytes)
+    try:
+        page_count = min(len(reader.pages), max_pages)
+    except Exception as e:
+        raise PDFExtractionError(str(e)) from e
+    for index in range(page_count):
+        yield index + 1, _page_text(reader, index)
+
+
+def iter_page_texts_parallel(pdf_bytes: bytes, executor: Executor,
+                             max_pages: int = PDF_MAX_PAGES) -> Iterator[Tuple[int, str]]:
+    """
+    Like iter_page_texts, but page ranges are extracted concurrently on `executor`.
+    Pages are still yielded in order, each as soon as its range is done.
+    """
+    # Worker processes open a spooled copy instead of each receiving the bytes
+    source = spool_pdf(pdf_bytes) if isinstance(executor, ProcessPoolExecutor) else pdf_bytes
+    futures = []
+    try:
+        futures = [executor.submit(extract_page_range, source, start, stop)
+                   for start, stop in page_ranges(count_pages(source, max_pages))]
+        for future in futures:
+            yield from future.result()
+    finally:
+        for future in futures:
+            future.cancel()
+        if source is not pdf_bytes:
+            remove_spooled_pdf(source)
+
+
+def extract_text(pdf_bytes: bytes, max_pages: int = PDF_MAX_PAGES,
+                 max_bytes: Optional[int] = PDF_MAX_BYTES) -> str:
+    """Extract text from raw PDF bytes using pypdf."""
+    if max_bytes is not None:
+        check_pdf_size(pdf_bytes, max_bytes)
+    # Collect page chunks and join once instead of growing a string per page
+    chunks = [format_page(number, text) for number, text in iter_page_texts(pdf_bytes, max_pages)]
+    return "".join(chunks).strip()
@@ -0,0 +1,116 @@
+"""
+Taxonomy Re-scoring
+Brings the registered job descriptions and the resume corpus up to date after
+the skill taxonomy in tech_mappings.py changed. Only the added and modified
+categories are matched again, in the token streams the stores keep, so no PDF
+is parsed and no text is embedded. Reports how many documents and categories
+were touched and how long it took.
+
+- --compare-full also times a full rebuild of the same documents from their
+  stored text (normalisation, every category, experience, embedding with the
+  embedding cache bypassed). PDF extraction is in neither figure: the stores
+  keep the extracted text, and it would only widen the gap.
+- --scores PATH re-scores every stored resume against every registered job
+  description from the stored features and writes one JSON line per pair
+
+The web server refreshes its stores the same way on first access after a
+restart; this command does it ahead of time and shows the cost.
+
+Usage:
+    python rescore.py
+    python rescore.py --compare-full --scores scores.jsonl
+"""
+
+import argparse
+import json
+import sys
+import time
+from typing import Dict, List
+
+from document_store import DocumentStore
+from embedding_cache import EmbeddingCache
+from jd_index import get_jd_index
+from matching_engine import ResumeJobMatcher, get_matcher
+from resume_corpus import get_resume_corpus
+from tech_mappings import TAXONOMY_VERSION
+
+
+def print_report(name: str, report: Dict) -> None:
+    touched = len(report["categories_added"]) + len(report["categories_modified"]) + len(report["categories_removed"])
+    print(f"{name}: {report['documents_changed']}/{report['documents']} documents changed, "
+          f"{touched} categories re-extracted or dropped in {report['seconds'] * 1000:.1f} ms")
+    for kind in ("added", "modified", "removed"):
+        if report[f"categories_{kind}"]:
+            print(f"  {kind}: {', '.join(report[f'categories_{kind}'])}")
+
+
+def time_full_rebuild(matcher: ResumeJobMatcher, store: DocumentStore) -> float:
+    """
+    Seconds to compute the features of every stored document from scratch
+    """
+    texts = store.texts()
+    cache = matcher.embedding_cache
+    # An empty cache makes every vector come from the model, as in a rebuild
+    matcher.embedding_cache = EmbeddingCache(0)
+    try:
+        started = time.perf_counter()
+        store.extract_features(matcher, texts)
+        return time.perf_counter() - started
+    finally:
+        matcher.embedding_cache = cache
+
+
+def write_scores(matcher: ResumeJobMatcher, path: str, batch_size: int = 256) -> int:
+    """
+    Score every stored resume against every registered job description; returns the number of pairs
+    """
+    jd_index, corpus = get_jd_index(), get_resume_corpus()
+    jd_entries, jd_vectors = jd_index.snapshot(matcher)
+    resume_entries, resume_vectors = corpus.snapshot(matcher)
+    jds = jd_index.features(jd_entries, jd_vectors)
+    pairs = 0
+    with open(path, "w") as f:
+        for start in range(0, len(resume_entries) if jds else 0, batch_size):
+            batch = resume_entries[start:start + batch_size]
+            grid = matcher.score_features(corpus.features(batch, resume_vectors), jds)
+            rows: List[Dict] = [{"resume_id": resume["id"], "jd_id": jd["id"], **result}
+                                for resume, results in zip(batch, grid) for jd, result in zip(jd_entries, results)]
+            f.write("".join(json.dumps(row) + "\n" for row in rows))
+            pairs += len(rows)
+    return pairs
+
+
+def main() -> int:
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--compare-full", action="store_true",
+                        help="also time a full rebuild of the stored documents (loads the embedding model)")
+    parser.add_argument("--scores", help="write resume/job description scores to this JSONL file")
+    args = parser.parse_args()
+
+    print(f"Taxonomy version {TAXONOMY_VERSION}")
+    stores = {"job descriptions": get_jd_index(), "resumes": get_resume_corpus()}
+    incremental = 0.0
+    for name, store in stores.items():
+        report = store.refresh_taxonomy()
+        incremental += report["seconds"]
+        print_report(name, report)
+
+    matcher = get_matcher()
+    if args.compare_full:
+        # Model loading is a one-off start-up cost, not part of either pass
+        matcher.load_model()
+        full = sum(time_full_rebuild(matcher, store) for store in stores.values())
+        documents = sum(len(store) for store in stores.values())
+        speedup = f" ({full / incremental:.0f}x)" if incremental else " (taxonomy unchanged, nothing to do)"
+        print(f"Incremental pass {incremental:.3f}s, full rebuild of {documents} documents {full:.3f}s{speedup}")
+
+    if args.scores:
+        started = time.perf_counter()
+        pairs = write_scores(matcher, args.scores)
+        print(f"Re-scored {pairs} pairs from stored features in {time.perf_counter() - started:.2f}s; "
+              f"results in {args.scores}")
+    return 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
@@ -0,0 +1,158 @@
+"""
+Resume Corpus
+Stored resumes with precomputed scoring features, searchable for the best
+candidates for a job description. Resumes can first be narrowed down with
+the inverted skill index (see skill_index); the remaining candidates are
+retrieved by embedding similarity (exact or approximate, see vector_index)
+and then re-ranked with the full skill, experience and similarity scoring.
+"""
+
+import os
+import threading
+from typing import Dict, List, Optional
+
+import numpy as np
+
+from document_store import DocumentStore
+from matching_engine import ResumeJobMatcher, get_matcher
+from skill_index import SkillIndex
+from vector_index import IVF_PROBES, IVFIndex, exact_top_k
+
+RESUME_CORPUS_DIR = os.environ.get(
+    "RESUME_CORPUS_DIR", os.path.join(os.path.dirname(os.path.abspath(__file__)), "resume_corpus")
+)
+
+# Embedding retrieval returns k * SEARCH_RERANK_FACTOR candidates for the full scoring to re-rank
+SEARCH_RERANK_FACTOR = int(os.environ.get("SEARCH_RERANK_FACTOR", 4))
+# Number of IVF partitions; 0 picks sqrt(corpus size)
+IVF_LISTS = int(os.environ.get("IVF_LISTS", 0))
+
+
+class ResumeCorpus(DocumentStore):
+    """
+    Stored resumes plus the search structures derived from them. The skill
+    index, the one-vector-per-resume search matrix and the IVF index are
+    rebuilt lazily after the corpus changes.
+    """
+
+    role = "resume"
+
+    def __init__(self, directory: str = RESUME_CORPUS_DIR):
+        super().__init__(directory)
+        self._derived_lock = threading.Lock()
+        self._derived_entries: Optional[List[Dict]] = None
+        self._skill_index: Optional[SkillIndex] = None
+        self._search_matrix: Optional[np.ndarray] = None
+        self._ivf: Optional[IVFIndex] = None
+
+    def _reset_derived(self, entries: List[Dict]) -> None:
+        # Caller holds _derived_lock
+        if self._derived_entries is not entries:
+            self._derived_entries = entries
+            self._skill_index = self._search_matrix = self._ivf = None
+
+    def skill_index(self, entries: List[Dict]) -> SkillIndex:
+        with self._derived_lock:
+            self._reset_derived(entries)
+            if self._skill_index is None:
+                self._skill_index = SkillIndex([entry["skills"] for entry in entries])
+            return self._skill_index
+
+    def _search_structures(self, entries: List[Dict], vectors: np.ndarray, approximate: bool):
+        with self._derived_lock:
+            self._reset_derived(entries)
+            if self._search_matrix is None:
+                if all(entry["row_count"] == 1 for entry in entries):
+                    # One row per resume already: search the memory-mapped matrix directly
+                    self._search_matrix = vectors
+                else:
+                    pooled = np.vstack([vectors[e["row_start"]:e["row_start"] + e["row_count"]].mean(axis=0)
+                                        for e in entries])
+                    self._search_matrix = pooled / np.maximum(np.linalg.norm(pooled, axis=1, keepdims=True), 1e-12)
+            if approximate and self._ivf is None:
+                self._ivf = IVFIndex(self._search_matrix, n_lists=IVF_LISTS or None)
+            return self._search_matrix, self._ivf
+
+    def filter(self, skill_query: str) -> List[Dict]:
+        """
+        Stored resumes matching a boolean skill query, e.g. "kubernetes AND (go OR rust) AND NOT php"
+        """
+        entries = self.current_entries()
+        return [self._summary(entries[position]) for position in self.skill_index(entries).query(skill_query)]
+
+    def search(self, matcher: ResumeJobMatcher, jd_text: str, k: int = 50, approximate: bool = False,
+               n_probe: int = IVF_PROBES, skill_query: Optional[str] = None,
+               min_skill_coverage: float = 0.0) -> List[Dict]:
+        """
+        The k stored resumes that best fit the job description, best first.
+        Only the JD is processed; resume features come from the corpus.
+        Resumes failing `skill_query`, or having less than `min_skill_coverage`
+        of the JD's extracted skills, are excluded before any vector scoring.
+        """
+        entries, vectors = self.snapshot(matcher)
+        if not entries or k <= 0:
+            return []
+
+        _, (jd,) = matcher.extract_features([], [jd_text])
+        allowed = None
+        if skill_query or min_skill_coverage > 0:
+            skill_index = self.skill_index(entries)
+            allowed = skill_index.query(skill_query) if skill_query else np.arange(len(entries), dtype=np.int32)
+            if min_skill_coverage > 0:
+                allowed = np.intersect1d(allowed, skill_index.covering(jd.skills, min_skill_coverage),
+                                         assume_unique=True)
+            if len(allowed) == 0:
+                return []
+
+        query = jd.vectors.mean(axis=0)
+        query = query / max(float(np.linalg.norm(query)), 1e-12)
+        matrix, ivf = self._search_structures(entries, vectors, approximate)
+        candidates = k * max(1, SEARCH_RERANK_FACTOR)
+        if approximate:
+            mask = None
+            if allowed is not None:
+                mask = np.zeros(len(entries), dtype=bool)
+                mask[allowed] = True
+            ids, scores = ivf.search(query, candidates, n_probe, mask)
+        elif allowed is not None:
+            # Only the surviving rows are gathered and scored
+            ids, scores = exact_top_k(matrix[allowed], query, candidates)
+            ids = allowed[ids]
+        else:
+            ids, scores = exact_top_k(matrix, query, candidates)
+
+        selected = [entries[i] for i in ids]
+        results = [row[0] for row in matcher.score_features(self.features(selected, vectors), [jd])]
+        ranked = matcher.rank_results(list(enumerate(results)), 'resume_index')[:k]
+        for result in ranked:
+            position = result.pop('resume_index')
+            result['resume_id'] = selected[position]["id"]
+            result['resume_name'] = selected[position]["name"]
+            result['retrieval_similarity'] = round(float(scores[position]), 4)
+        return ranked
+
+
+_resume_corpus: Optional[ResumeCorpus] = None
+_resume_corpus_lock = threading.Lock()
+
+
+def get_resume_corpus() -> ResumeCorpus:
+    """
+    The process-wide corpus, opened (and its vectors mapped) on first use
+    """
+    global _resume_corpus
+    if _resume_corpus is None:
+        with _resume_corpus_lock:
+            if _resume_corpus is None:
+                _resume_corpus = ResumeCorpus()
+    return _resume_corpus
+
+
+def add_resumes(texts: List[str], names: Optional[List[Optional[str]]] = None) -> List[Dict]:
+    return get_resume_corpus().add_many(get_matcher(), texts, names)
+
+
+def search_resumes(jd_text: str, k: int = 50, approximate: bool = False, n_probe: int = IVF_PROBES,
+                   skill_query: Optional[str] = None, min_skill_coverage: float = 0.0) -> List[Dict]:
+    return get_resume_corpus().search(get_matcher(), jd_text, k, approximate, n_probe,
+                                      skill_query, min_skill_coverage)
@@ -0,0 +1,168 @@
+"""
+Pre-fork Server
+Runs the API in WEB_WORKERS processes accepting connections from one shared
+listening socket, without loading the embedding model once per worker.
+
+MODEL_SHARING decides how the workers get at the model:
+- fork:   the supervisor loads the weights, then forks the workers, which share
+          them copy-on-write (default)
+- socket: a separate inference process owns the model and the embedding cache and
+          serves encode requests over a Unix socket (see inference_server); the
+          workers never load the model runtime
+
+The embedding store, the text cache's disk tier and the job results default to
+SHARED_CACHE_DIR (memory-backed /dev/shm where available), so what one worker
+computes every other worker can read. Crashed workers are restarted; SIGTERM stops them all.
+
+Usage: WEB_WORKERS=4 python serve.py  (python app.py hands over here when WEB_WORKERS > 1)
+"""
+
+import gc
+import logging
+import os
+import signal
+import socket
+import sys
+import tempfile
+import time
+from typing import Callable, Dict, Tuple
+
+WEB_WORKERS = int(os.environ.get("WEB_WORKERS", os.cpu_count() or 1))
+MODEL_SHARING = os.environ.get("MODEL_SHARING", "fork")
+HOST = os.environ.get("HOST", "0.0.0.0")
+PORT = int(os.environ.get("PORT", 8000))
+SHARED_CACHE_DIR = os.environ.get("SHARED_CACHE_DIR") or os.path.join(
+    "/dev/shm" if os.path.isdir("/dev/shm") else tempfile.gettempdir(), "resume-matcher")
+
+MODEL_SHARING_MODES = ("fork", "socket")
+
+# Seconds before a worker that exited unexpectedly is started again
+RESPAWN_DELAY = 1.0
+
+
+def configure_environment(workers: int) -> None:
+    """
+    Defaults that have to be in place before the app modules read their configuration
+    """
+    os.environ.setdefault("EMBEDDING_CACHE_DIR", os.path.join(SHARED_CACHE_DIR, "embeddings"))
+    os.environ.setdefault("TEXT_CACHE_DIR", os.path.join(SHARED_CACHE_DIR, "text"))
+    # Any worker can answer a poll for a job another worker ran
+    os.environ.setdefault("JOB_RESULT_DIR", os.path.join(SHARED_CACHE_DIR, "jobs"))
+    # Split the cores between the workers instead of giving every worker all of them
+    cores_per_worker = str(max(1, (os.cpu_count() or 1) // workers))
+    os.environ.setdefault("PDF_WORKERS", cores_per_worker)
+    if MODEL_SHARING == "fork":
+        os.environ.setdefault("OMP_NUM_THREADS", cores_per_worker)
+    else:
+        os.environ.setdefault("INFERENCE_SOCKET", os.path.join(SHARED_CACHE_DIR, f"inference-{PORT}.sock"))
+
+
+def listen(host: str, port: int) -> socket.socket:
+    sock = socket.socket(socket.AF_INET6 if ":" in host else socket.AF_INET, socket.SOCK_STREAM)
+    sock.setsockopt(socket.SOL_SOCKET, socket.SO_REUSEADDR, 1)
+    sock.bind((host, port))
+    sock.listen(2048)
+    sock.set_inheritable(True)
+    return sock
+
+
+def run_worker(sock: socket.socket) -> None:
+    import uvicorn
+    from app import app
+
+    uvicorn.Server(uvicorn.Config(app)).run(sockets=[sock])
+
+
+def fork(target: Callable, *args) -> int:
+    """
+    Run target(*args) in a child process and return its pid; the child never returns here
+    """
+    pid = os.fork()
+    if pid:
+        return pid
+    code = 0
+    try:
+        # Own process group, so the supervisor can clean up the child's PDF pool with it
+        os.setpgid(0, 0)
+        signal.signal(signal.SIGTERM, signal.SIG_DFL)
+        signal.signal(signal.SIGINT, signal.SIG_DFL)
+        target(*args)
+    except BaseException:
+        logging.getLogger("resume_matcher.serve").exception("child process failed")
+        code = 1
+    finally:
+        os._exit(code)
+
+
+def main() -> int:
+    if MODEL_SHARING not in MODEL_SHARING_MODES:
+        raise SystemExit(f"MODEL_SHARING must be one of {MODEL_SHARING_MODES}, got {MODEL_SHARING!r}")
+    workers = max(1, WEB_WORKERS)
+    configure_environment(workers)
+
+    # Imported only now, so the modules see the defaults set above
+    import inference_server
+    import matching_engine
+    from structured_logging import get_logger, log_event
+    logger = get_logger("serve")
+
+    sock = listen(HOST, PORT)
+    roles: Dict[str, Tuple[Callable, tuple]] = {"worker": (run_worker, (sock,))}
+    children: Dict[int, str] = {}
+    if MODEL_SHARING == "socket":
+        path = matching_engine.INFERENCE_SOCKET
+        os.makedirs(os.path.dirname(path), exist_ok=True)
+        if os.path.exists(path):
+            # Left over from a previous run; the workers must wait for the new server
+            os.unlink(path)
+        roles["inference"] = (inference_server.serve, (path,))
+        children[fork(inference_server.serve, path)] = "inference"
+    else:
+        # Load the weights, but run no inference: thread pools started before fork do not survive it
+        started = time.perf_counter()
+        matching_engine.get_matcher().load_model()
+        log_event(logger, logging.INFO, "model_loaded", seconds=round(time.perf_counter() - started, 2))
+    # Keep the collector from touching (and so copying) every object inherited from this process
+    gc.freeze()
+    for _ in range(workers):
+        children[fork(run_worker, sock)] = "worker"
+    log_event(logger, logging.INFO, "serving", host=HOST, port=PORT, workers=workers, model_sharing=MODEL_SHARING)
+
+    stopping = False
+
+    def stop(signum, frame) -> None:
+        nonlocal stopping
+        stopping = True
+        for pid in list(children):
+            try:
+                os.kill(pid, signal.SIGTERM)
+            except ProcessLookupError:
+                pass
+
+    signal.signal(signal.SIGTERM, stop)
+    signal.signal(signal.SIGINT, stop)
+    while children:
+        try:
+            pid, status = os.wait()
+        except ChildProcessError:
+            break
+        role = children.pop(pid, None)
+        if role is None:
+            continue
+        try:
+            # Processes the child left behind would keep the listening socket open
+            os.killpg(pid, signal.SIGKILL)
+        except ProcessLookupError:
+            pass
+        if stopping:
+            continue
+        log_event(logger, logging.WARNING, "child_exited", role=role, pid=pid,
+                  exit_code=os.waitstatus_to_exitcode(status))
+        time.sleep(RESPAWN_DELAY)
+        target, args = roles[role]
+        children[fork(target, *args)] = role
+    return 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
@@ -0,0 +1,260 @@
+"""
+Skill Index
+Inverted index from skills and categories to the documents that mention them.
+Rare keys keep their posting list as a sorted int32 array of document
+positions; keys present in many documents are also held as bitmaps of uint64
+words, so boolean queries reduce to a few vectorised merges, bit tests and
+bitwise operations over a few kilobytes.
+
+Query syntax: skill names, `category:<name>` for any skill of a TECH_MAPPINGS
+category, AND / OR / NOT (case-insensitive) and parentheses, e.g.
+    kubernetes AND (go OR rust) AND NOT php
+Multi-word skills are written as they are or quoted, e.g.
+    machine learning AND "react native"
+Skill names are read the way documents are, so 'Node.js' finds 'nodejs'.
+"""
+
+import re
+from typing import Dict, List, Optional, Tuple
+
+import numpy as np
+
+from tech_mappings import SKILL_LEXICON
+from text_normalization import normalize
+
+CATEGORY_PREFIX = "category:"
+
+_QUERY_TOKEN_RE = re.compile(r'"[^"]*"|\(|\)|[^\s()"]+')
+_OPERATORS = {"and", "or", "not"}
+
+
+class SkillQueryError(ValueError):
+    """Raised when a boolean skill query cannot be parsed."""
+
+
+def parse_skill_query(query: str):
+    """
+    Parse a boolean skill query into a nested tuple tree:
+    ("term", key) | ("not", node) | ("and", left, right) | ("or", left, right).
+    NOT binds tighter than AND, which binds tighter than OR. A quoted phrase, or a
+    run of words with no operator between them, is one term.
+    """
+    if query.count('"') % 2:
+        raise SkillQueryError(f"Unterminated quote in {query!r}")
+    tokens = _QUERY_TOKEN_RE.findall(query.lower())
+    position = 0
+
+    def is_word(token: Optional[str]) -> bool:
+        return token is not None and token not in _OPERATORS and token not in "()" and not token.startswith('"')
+
+    def peek() -> Optional[str]:
+        return tokens[position] if position < len(tokens) else None
+
+    def take() -> str:
+        nonlocal position
+        token = peek()
+        if token is None:
+            raise SkillQueryError(f"Unexpected end of query: {query!r}")
+        position += 1
+        return token
+
+    def parse_or():
+        node = parse_and()
+        while peek() == "or":
+            take()
+            node = ("or", node, parse_and())
+        return node
+
+    def parse_and():
+        node = parse_not()
+        while peek() == "and":
+            take()
+            node = ("and", node, parse_not())
+        return node
+
+    def parse_not():
+        if peek() == "not":
+            take()
+            return ("not", parse_not())
+        token = take()
+        if token == "(":
+            node = parse_or()
+            if take() != ")":
+                raise SkillQueryError(f"Missing closing parenthesis in {query!r}")
+            return node
+        if token in _OPERATORS or token == ")":
+            raise SkillQueryError(f"Unexpected {token!r} in {query!r}")
+        if token.startswith('"'):
+            term = token[1:-1].strip()
+            if not term:
+                raise SkillQueryError(f"Empty quoted term in {query!r}")
+            return ("term", term)
+        words = [token]
+        while is_word(peek()):
+            words.append(take())
+        return ("term", " ".join(words))
+
+    tree = parse_or()
+    if peek() is not None:
+        raise SkillQueryError(f"Unexpected {peek()!r} in {query!r}")
+    return tree
+
+
+# Posting lists covering more than 1/DENSE_FRACTION of the documents are kept as bitmaps
+DENSE_FRACTION = 32
+
+
+def skill_key(term: str) -> str:
+    """
+    Posting key of a query term: `category:` keys as written, skills in the form
+    the lexicon extracts them from documents, and anything else lowercased
+    """
+    term = term.lower()
+    if term.startswith(CATEGORY_PREFIX):
+        return term
+    return SKILL_LEXICON.phrase(normalize(term).tokens) or term
+
+
+def _popcount(words: np.ndarray) -> int:
+    if hasattr(np, "bitwise_count"):  # numpy >= 2.0
+        return int(np.bitwise_count(words).sum())
+    return int(np.unpackbits(words.view(np.uint8)).sum())
+
+
+def _union(left: np.ndarray, right: np.ndarray) -> np.ndarray:
+    merged = np.concatenate([left, right])
+    merged.sort()
+    return merged[np.concatenate([[True], merged[1:] != merged[:-1]])] if len(merged) else merged
+
+
+def _member(sorted_positions: np.ndarray, positions: np.ndarray) -> np.ndarray:
+    """
+    Boolean mask of which `positions` appear in `sorted_positions`
+    """
+    if not len(sorted_positions):
+        return np.zeros(len(positions), dtype=bool)
+    found = np.searchsorted(sorted_positions, positions).clip(max=len(sorted_positions) - 1)
+    return sorted_positions[found] == positions
+
+
+class SkillIndex:
+    """
+    Posting lists for every skill and every category over a list of documents'
+    category -> skills mappings (document position = list position)
+    """
+
+    def __init__(self, documents: List[Dict[str, List[str]]]):
+        postings: Dict[str, List[int]] = {}
+        for position, skills in enumerate(documents):
+            for category, category_skills in skills.items():
+                if category_skills:
+                    postings.setdefault(CATEGORY_PREFIX + category, []).append(position)
+                for skill in category_skills:
+                    postings.setdefault(skill, []).append(position)
+        self.size = len(documents)
+        # A skill listed under several categories is appended once per category
+        self.postings: Dict[str, np.ndarray] = {
+            key: np.unique(np.asarray(positions, dtype=np.int32)) for key, positions in postings.items()
+        }
+        self._bitmaps: Dict[str, np.ndarray] = {
+            key: self._to_bitmap(positions) for key, positions in self.postings.items()
+            if len(positions) * DENSE_FRACTION > self.size
+        }
+        self._empty = np.zeros(0, dtype=np.int32)
+        self._all = self._to_bitmap(np.arange(self.size, dtype=np.int32))
+
+    def __len__(self) -> int:
+        return self.size
+
+    def posting(self, key: str) -> np.ndarray:
+        return self.postings.get(key.lower(), self._empty)
+
+    def query(self, query: str) -> np.ndarray:
+        """
+        Sorted positions of the documents matching a boolean skill query
+        """
+        is_bitmap, result = self._evaluate(parse_skill_query(query))
+        if is_bitmap:
+            bits = np.unpackbits(result.astype("<u8", copy=False).view(np.uint8), count=self.size, bitorder="little")
+            return np.flatnonzero(bits).astype(np.int32)
+        return result
+
+    def count(self, query: str) -> int:
+        """
+        Number of documents matching a boolean skill query
+        """
+        is_bitmap, result = self._evaluate(parse_skill_query(query))
+        return _popcount(result) if is_bitmap else len(result)
+
+    def _to_bitmap(self, positions: np.ndarray) -> np.ndarray:
+        """
+        Bit i of word i // 64 is set for every position i
+        """
+        bits = np.zeros(-(-self.size // 64) * 64, dtype=bool)
+        bits[positions] = True
+        return np.packbits(bits, bitorder="little").view("<u8").astype(np.uint64, copy=False)
+
+    @staticmethod
+    def _contains(bitmap: np.ndarray, positions: np.ndarray) -> np.ndarray:
+        return ((bitmap[positions >> 6] >> (positions & 63).astype(np.uint64)) & np.uint64(1)).astype(bool)
+
+    def _evaluate(self, node: Tuple) -> Tuple[bool, np.ndarray]:
+        """
+        Evaluate a parsed query to (is_bitmap, sorted positions or packed bitmap)
+        """
+        kind = node[0]
+        if kind == "term":
+            key = skill_key(node[1])
+            bitmap = self._bitmaps.get(key)
+            return (True, bitmap) if bitmap is not None else (False, self.posting(key))
+        if kind == "not":
+            is_bitmap, operand = self._evaluate(node[1])
+            return True, self._all & ~(operand if is_bitmap else self._to_bitmap(operand))
+
+        if kind == "and":
+            # "x AND NOT y" removes y from x directly instead of complementing y
+            for include, exclude in ((node[1], node[2]), (node[2], node[1])):
+                if exclude[0] == "not":
+                    return self._difference(self._evaluate(include), self._evaluate(exclude[1]))
+            left, right = self._evaluate(node[1]), self._evaluate(node[2])
+            if left[0] and right[0]:
+                return True, left[1] & right[1]
+            if left[0] or right[0]:
+                (_, bitmap), (_, positions) = (left, right) if left[0] else (right, left)
+                return False, positions[self._contains(bitmap, positions)]
+            small, large = sorted((left[1], right[1]), key=len)
+            return False, small[_member(large, small)]
+
+        left, right = self._evaluate(node[1]), self._evaluate(node[2])
+        if not left[0] and not right[0]:
+            return False, _union(left[1], right[1])
+        return True, ((left[1] if left[0] else self._to_bitmap(left[1])) |
+                      (right[1] if right[0] else self._to_bitmap(right[1])))
+
+    def _difference(self, include: Tuple[bool, np.ndarray], exclude: Tuple[bool, np.ndarray]) -> Tuple[bool, np.ndarray]:
+        (include_bitmap, included), (exclude_bitmap, excluded) = include, exclude
+        if include_bitmap:
+            return True, included & ~(excluded if exclude_bitmap else self._to_bitmap(excluded))
+        if exclude_bitmap:
+            return False, included[~self._contains(excluded, included)]
+        return False, included[~_member(excluded, included)]
+
+    def weighted_scores(self, weights: Dict[str, float]) -> np.ndarray:
+        """
+        Per-document sum of the weights of the skills (or `category:` keys) it has
+        """
+        scores = np.zeros(self.size, dtype=np.float32)
+        for key, weight in weights.items():
+            scores[self.posting(key)] += weight
+        return scores
+
+    def covering(self, skills: Dict[str, List[str]], min_fraction: float) -> np.ndarray:
+        """
+        Sorted positions of the documents that have at least `min_fraction`
+        of the given skills, e.g. a job description's extracted requirements
+        """
+        required = {skill for category_skills in skills.values() for skill in category_skills}
+        if not required or min_fraction <= 0:
+            return np.arange(self.size, dtype=np.int32)
+        scores = self.weighted_scores({skill: 1.0 for skill in required})
+        return np.flatnonzero(scores >= min_fraction * len(required) - 1e-6).astype(np.int32)
@@ -0,0 +1,147 @@
+"""
+Skill Matrix
+Integer IDs for every skill in the taxonomy and a skill-by-category incidence
+matrix built from SKILL_TO_CATEGORY, so per-category skill match percentages
+for one resume against a whole batch of job descriptions come out of a single
+matrix product instead of per-category set algebra.
+
+A document's skills ({category: skills}, as the lexicon finds them) encode as
+a 0/1 row over skill IDs. The row is lossless as long as each skill sits under
+exactly the categories SKILL_TO_CATEGORY gives it, which holds for everything
+the lexicon extracts; other dicts (unknown skills, hand-built category sets)
+do not encode and are scored with the set-based path instead.
+"""
+
+from typing import Dict, List, NamedTuple, Optional, Sequence, Set, Tuple
+
+import numpy as np
+
+from tech_mappings import SKILL_TO_CATEGORY, TECH_MAPPINGS
+
+SKILL_NAMES: List[str] = sorted(SKILL_TO_CATEGORY)
+SKILL_IDS: Dict[str, int] = {skill: i for i, skill in enumerate(SKILL_NAMES)}
+CATEGORY_NAMES: List[str] = list(TECH_MAPPINGS)
+CATEGORY_IDS: Dict[str, int] = {category: i for i, category in enumerate(CATEGORY_NAMES)}
+
+# skills x categories, 1.0 where the skill belongs to the category
+SKILL_CATEGORY = np.zeros((len(SKILL_NAMES), len(CATEGORY_NAMES)), dtype=np.float32)
+for _skill, _categories in SKILL_TO_CATEGORY.items():
+    SKILL_CATEGORY[SKILL_IDS[_skill], [CATEGORY_IDS[category] for category in _categories]] = 1.0
+SKILL_CATEGORY.setflags(write=False)
+
+_CATEGORY_SKILLS: Dict[str, Set[str]] = {category: set(skills) for category, skills in TECH_MAPPINGS.items()}
+# Number of categories each skill belongs to, to check encoded documents for completeness
+_SKILL_MEMBERSHIPS = SKILL_CATEGORY.sum(axis=1).astype(np.int64)
+
+# PERCENTAGES[required, matched] == round(matched / required * 100, 2), the value
+# the match result reports, precomputed so batches never call round() per category
+_MAX_CATEGORY_SIZE = int(SKILL_CATEGORY.sum(axis=0).max()) if CATEGORY_NAMES else 0
+PERCENTAGES = np.zeros((_MAX_CATEGORY_SIZE + 1, _MAX_CATEGORY_SIZE + 1))
+for _required in range(1, _MAX_CATEGORY_SIZE + 1):
+    for _matched in range(_required + 1):
+        PERCENTAGES[_required, _matched] = round(_matched / _required * 100, 2)
+PERCENTAGES.setflags(write=False)
+
+
+def encode_skills(skills: Dict[str, Set[str]]) -> Optional[np.ndarray]:
+    """
+    Sorted skill IDs of a document, or None when its category sets are not
+    exactly what those skills imply under SKILL_TO_CATEGORY
+    """
+    pairs = 0
+    for category, members in skills.items():
+        known = _CATEGORY_SKILLS.get(category)
+        if not members or known is None or not known.issuperset(members):
+            return None
+        pairs += len(members)
+    ids = np.fromiter((SKILL_IDS[skill] for skill in set().union(*skills.values())), dtype=np.int64)
+    ids.sort()
+    # Every (category, skill) pair is valid, so equal counts mean none is missing
+    if int(_SKILL_MEMBERSHIPS[ids].sum()) != pairs:
+        return None
+    return ids
+
+
+def skill_rows(encoded: Sequence[np.ndarray]) -> np.ndarray:
+    """
+    documents x skills 0/1 matrix of encoded documents
+    """
+    rows = np.zeros((len(encoded), len(SKILL_NAMES)), dtype=np.float32)
+    for i, ids in enumerate(encoded):
+        rows[i, ids] = 1.0
+    return rows
+
+
+def category_counts(rows: np.ndarray) -> np.ndarray:
+    """
+    documents x categories number of skills each document has in each category
+    """
+    return (rows @ SKILL_CATEGORY).astype(np.int64)
+
+
+def matched_counts(resume_row: np.ndarray, jd_rows: np.ndarray) -> np.ndarray:
+    """
+    job descriptions x categories number of each JD's skills per category that
+    the resume also has, for the whole batch in one product
+    """
+    return (jd_rows @ (SKILL_CATEGORY * resume_row[:, None])).astype(np.int64)
+
+
+def category_fractions(matched: np.ndarray, required: np.ndarray) -> np.ndarray:
+    """
+    matched / required per category, 0.0 where nothing is required
+    """
+    return np.divide(matched, required, out=np.zeros(matched.shape), where=required > 0)
+
+
+class CategoryScores(NamedTuple):
+    """
+    One resume against a SkillBatch, one row per encoded job description
+    """
+    matched: np.ndarray      # int64 (JDs x categories): JD skills the resume has
+    percentages: np.ndarray  # float64 (JDs x categories): PERCENTAGES of matched/required
+    averages: np.ndarray     # float64 (JDs): mean fraction over each JD's categories
+
+
+class SkillBatch:
+    """
+    The encoded job descriptions of a batch, to score resumes against all of
+    them at once. JDs whose skills do not encode are left out (see positions).
+    """
+
+    def __init__(self, jd_skills: Sequence[Dict[str, Set[str]]]):
+        encoded = [encode_skills(skills) for skills in jd_skills]
+        # Positions in jd_skills of the JDs held here, in row order
+        self.positions: List[int] = [i for i, ids in enumerate(encoded) if ids is not None]
+        self.rows = skill_rows([encoded[i] for i in self.positions])
+        self.required = category_counts(self.rows)
+        # Each JD's categories in its own dict order, the order match results list them in
+        self.columns: List[List[int]] = [[CATEGORY_IDS[category] for category in jd_skills[i]]
+                                         for i in self.positions]
+        # Averages sum each JD's fractions in the iteration order of set(categories), as
+        # np.mean over a list built that way does, so they agree to the last bit. Rows are
+        # grouped by category count so each group is one gather and one row-wise sum.
+        by_count: Dict[int, Tuple[List[int], List[List[int]]]] = {}
+        for row, i in enumerate(self.positions):
+            order = [CATEGORY_IDS[category] for category in set(jd_skills[i].keys())]
+            members, orders = by_count.setdefault(len(order), ([], []))
+            members.append(row)
+            orders.append(order)
+        self._sum_groups = [(count, np.array(members), np.array(orders, dtype=np.int64))
+                            for count, (members, orders) in by_count.items() if count]
+
+    def __len__(self) -> int:
+        return len(self.positions)
+
+    def score(self, resume_ids: np.ndarray) -> CategoryScores:
+        """
+        Per-category scores of one encoded resume against every JD in the batch
+        """
+        resume_row = np.zeros(len(SKILL_NAMES), dtype=np.float32)
+        resume_row[resume_ids] = 1.0
+        matched = matched_counts(resume_row, self.rows)
+        fractions = category_fractions(matched, self.required)
+        averages = np.zeros(len(self.positions))
+        for count, members, orders in self._sum_groups:
+            averages[members] = fractions[members[:, None], orders].sum(axis=1) / count
+        return CategoryScores(matched, PERCENTAGES[self.required, matched], averages)
@@ -0,0 +1,80 @@
+"""
+Structured Logging
+Leveled, optionally sampled, one-line-per-event logging for the service.
+
+- LOG_LEVEL:        minimum level (default INFO), or OFF; events below it cost one level check
+- LOG_SAMPLE_RATE:  fraction of hot-path (sampled=True) events that are emitted (default 1.0)
+- LOG_FORMAT:       "json" (default) or "text"
+
+Events carry sizes, counts, scores and timings, never document text.
+"""
+
+import json
+import logging
+import os
+import random
+import sys
+import time
+
+LOG_LEVEL = os.environ.get("LOG_LEVEL", "INFO").upper()
+LOG_SAMPLE_RATE = float(os.environ.get("LOG_SAMPLE_RATE", 1.0))
+LOG_FORMAT = os.environ.get("LOG_FORMAT", "json")
+
+_ROOT_LOGGER = "resume_matcher"
+
+
+class _JsonFormatter(logging.Formatter):
+    def format(self, record: logging.LogRecord) -> str:
+        event = {
+            "ts": round(record.created, 3),
+            "level": record.levelname.lower(),
+            "logger": record.name,
+            "event": record.getMessage(),
+            **getattr(record, "fields", {}),
+        }
+        if record.exc_info:
+            event["exception"] = self.formatException(record.exc_info)
+        return json.dumps(event, default=str)
+
+
+class _TextFormatter(logging.Formatter):
+    def format(self, record: logging.LogRecord) -> str:
+        fields = " ".join(f"{key}={value}" for key, value in getattr(record, "fields", {}).items())
+        line = f"{time.strftime('%H:%M:%S', time.localtime(record.created))} {record.levelname:<7} " \
+               f"{record.name}: {record.getMessage()}" + (f" {fields}" if fields else "")
+        if record.exc_info:
+            line += "\n" + self.formatException(record.exc_info)
+        return line
+
+
+def _configure() -> logging.Logger:
+    root = logging.getLogger(_ROOT_LOGGER)
+    if not root.handlers:
+        handler = logging.StreamHandler(sys.stderr)
+        handler.setFormatter(_TextFormatter() if LOG_FORMAT == "text" else _JsonFormatter())
+        root.addHandler(handler)
+        root.setLevel(logging.CRITICAL + 1 if LOG_LEVEL == "OFF" else LOG_LEVEL)
+        root.propagate = False
+    return root
+
+
+_configure()
+
+
+def get_logger(name: str) -> logging.Logger:
+    """
+    Logger under the service's root, e.g. get_logger("app") -> "resume_matcher.app"
+    """
+    return logging.getLogger(f"{_ROOT_LOGGER}.{name}")
+
+
+def log_event(logger: logging.Logger, level: int, event: str, sampled: bool = False, **fields) -> None:
+    """
+    Emit one structured event. Disabled levels return before any formatting;
+    `sampled` events are additionally thinned to LOG_SAMPLE_RATE.
+    """
+    if not logger.isEnabledFor(level):
+        return
+    if sampled and LOG_SAMPLE_RATE < 1.0 and random.random() >= LOG_SAMPLE_RATE:
+        return
+    logger.log(level, event, extra={"fields": fields})
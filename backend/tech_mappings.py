@@ -1,8 +1,18 @@
 """
 Technology Skills Mapping Dictionary
 Comprehensive mapping of technologies and their related skills/frameworks
+
+The taxonomy is versioned per category: TAXONOMY_HASHES holds a hash of each
+category's skill list, so skills extracted under an older taxonomy can be
+brought up to date by re-matching only the categories that changed.
 """
 
+import hashlib
+import json
+import re
+from collections import deque
+from typing import Dict, Iterable, Iterator, List, Optional, Sequence, Set, Tuple
+
 TECH_MAPPINGS = {
     # Programming Languages - Python Ecosystem
     'python': ['python', 'python3', 'py', 'django', 'flask', 'fastapi', 'pyramid', 'bottle', 
@@ -275,4 +285,166 @@ for category, skills in TECH_MAPPINGS.items():
     for skill in skills:
         if skill not in SKILL_TO_CATEGORY:
             SKILL_TO_CATEGORY[skill] = []
-        SKILL_TO_CATEGORY[skill].append(category)
\ No newline at end of file
+        SKILL_TO_CATEGORY[skill].append(category)
+
+
+# Lexicon tokens keep the punctuation that is part of a technology name
+# ('node.js', 'c++', 'c#', '.net', 'react-native') and drop everything else,
+# so trailing sentence punctuation or separators like '/' never break a match.
+_LEXICON_TOKEN_RE = re.compile(r"\.?\w+(?:[.\-]\w+)*[+#]*")
+
+
+class SkillLexicon:
+    """
+    Token-level Aho-Corasick automaton over every skill phrase in a mapping.
+    Compiled once, it finds all skill phrases of any length in a single
+    left-to-right pass over the text, independent of the lexicon size.
+    """
+
+    def __init__(self, mappings: Dict[str, List[str]]):
+        self.skill_to_categories: Dict[str, Tuple[str, ...]] = {}
+        self._goto: List[Dict[str, int]] = [{}]
+        self._fail: List[int] = [0]
+        self._output: List[Tuple[str, ...]] = [()]
+        # Longest phrase in tokens; callers scanning text in pieces overlap by this minus one
+        self.max_phrase_tokens = 0
+
+        for category, skills in mappings.items():
+            for skill in skills:
+                key = skill.lower()
+                categories = self.skill_to_categories.get(key, ())
+                if category not in categories:
+                    self.skill_to_categories[key] = categories + (category,)
+                self._insert(key)
+
+        self._build_failure_links()
+
+    @staticmethod
+    def tokenize(text: str) -> List[str]:
+        """
+        Split lowercased text into lexicon tokens
+        """
+        return _LEXICON_TOKEN_RE.findall(text)
+
+    def phrase(self, tokens: Sequence[str]) -> Optional[str]:
+        """
+        The skill spelled by exactly these lexicon tokens, or None
+        """
+        state = 0
+        for token in tokens:
+            state = self._goto[state].get(token)
+            if state is None:
+                return None
+        # The state also outputs the shorter skills that end the phrase; keep the whole one
+        return next((skill for skill in self._output[state] if len(self.tokenize(skill)) == len(tokens)), None)
+
+    def _insert(self, skill: str) -> None:
+        tokens = self.tokenize(skill)
+        if not tokens:
+            return
+        self.max_phrase_tokens = max(self.max_phrase_tokens, len(tokens))
+        state = 0
+        for token in tokens:
+            next_state = self._goto[state].get(token)
+            if next_state is None:
+                next_state = len(self._goto)
+                self._goto[state][token] = next_state
+                self._goto.append({})
+                self._fail.append(0)
+                self._output.append(())
+            state = next_state
+        if skill not in self._output[state]:
+            self._output[state] += (skill,)
+
+    def _build_failure_links(self) -> None:
+        queue = deque(self._goto[0].values())
+        while queue:
+            state = queue.popleft()
+            for token, child in self._goto[state].items():
+                queue.append(child)
+                fallback = self._fail[state]
+                while fallback and token not in self._goto[fallback]:
+                    fallback = self._fail[fallback]
+                target = self._goto[fallback].get(token, 0)
+                self._fail[child] = target if target != child else 0
+                # Merge outputs of the suffix state so matching never walks fail links
+                self._output[child] += self._output[self._fail[child]]
+
+    def iter_matches(self, tokens: Sequence[str]) -> Iterator[str]:
+        """
+        Yield every skill phrase occurring in a token stream, in order of where it ends
+        """
+        goto, fail, output = self._goto, self._fail, self._output
+        state = 0
+        for token in tokens:
+            while state and token not in goto[state]:
+                state = fail[state]
+            state = goto[state].get(token, 0)
+            if output[state]:
+                yield from output[state]
+
+    def find_skills(self, text: str) -> Dict[str, Set[str]]:
+        """
+        Map each category to the set of its skills found in (lowercased) text
+        """
+        return self.find_skills_in_tokens(self.tokenize(text))
+
+    def find_skills_in_tokens(self, tokens: Sequence[str]) -> Dict[str, Set[str]]:
+        """
+        Map each category to the set of its skills found in an already tokenized text
+        """
+        found_skills: Dict[str, Set[str]] = {}
+        for skill in self.iter_matches(tokens):
+            for category in self.skill_to_categories[skill]:
+                found_skills.setdefault(category, set()).add(skill)
+        return found_skills
+
+
+# Compiled once at import so per-request extraction is a single linear scan
+SKILL_LEXICON = SkillLexicon(TECH_MAPPINGS)
+
+
+def category_hashes(mappings: Dict[str, List[str]]) -> Dict[str, str]:
+    """
+    Hash of each category's skills, ignoring their order, case and duplicates
+    """
+    return {
+        category: hashlib.sha256("\n".join(sorted({skill.lower() for skill in skills})).encode("utf-8")).hexdigest()[:16]
+        for category, skills in mappings.items()
+    }
+
+
+def taxonomy_version(hashes: Dict[str, str]) -> str:
+    """
+    Single fingerprint of a whole taxonomy, from its category hashes
+    """
+    return hashlib.sha256(json.dumps(hashes, sort_keys=True).encode("utf-8")).hexdigest()[:16]
+
+
+TAXONOMY_HASHES = category_hashes(TECH_MAPPINGS)
+TAXONOMY_VERSION = taxonomy_version(TAXONOMY_HASHES)
+
+
+def taxonomy_changes(stored: Optional[Dict[str, str]],
+                     current: Optional[Dict[str, str]] = None) -> Dict[str, List[str]]:
+    """
+    Categories added, modified and removed between the taxonomy `stored` hashes were taken
+    from and the current one. Unknown stored hashes (None) mark every category as added.
+    """
+    current = TAXONOMY_HASHES if current is None else current
+    stored = stored or {}
+    return {
+        "added": sorted(category for category in current if category not in stored),
+        "modified": sorted(category for category in current
+                           if category in stored and stored[category] != current[category]),
+        "removed": sorted(category for category in stored if category not in current),
+    }
+
+
+def category_lexicon(categories: Iterable[str], mappings: Optional[Dict[str, List[str]]] = None) -> SkillLexicon:
+    """
+    Lexicon over some categories only. Matches of one category never depend on
+    the others, so it finds exactly what the full lexicon finds for them.
+    """
+    mappings = TECH_MAPPINGS if mappings is None else mappings
+    return SkillLexicon({category: mappings[category] for category in categories})
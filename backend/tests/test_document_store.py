@@ -0,0 +1,153 @@
+"""
+Document store persistence: append-only segments committed by the manifest,
+crash tails past the committed lengths, background compaction after deletes,
+migration of the index.json layout and concurrent writers in several processes.
+A stub matcher stands in for the embedding model.
+"""
+
+import hashlib
+import json
+import multiprocessing
+import os
+
+import numpy as np
+import pytest
+
+import document_store
+from document_store import DocumentStore, document_id
+from matching_engine import DocumentFeatures
+from tech_mappings import SKILL_LEXICON
+from text_normalization import normalize
+
+DIM = 4
+
+
+def stub_vector(text):
+    seed = int.from_bytes(hashlib.sha256(text.encode("utf-8")).digest()[:4], "little")
+    vector = np.random.default_rng(seed).standard_normal(DIM).astype(np.float32)
+    return (vector / np.linalg.norm(vector))[None, :]
+
+
+class StubMatcher:
+    cache_namespace = "stub"
+    similarity_mode = "document"
+
+    def preprocess_text(self, text):
+        return normalize(text).text
+
+    def document_vectors(self, processed_texts):
+        return [stub_vector(text) for text in processed_texts]
+
+    def features(self, text):
+        document = normalize(text)
+        return DocumentFeatures(SKILL_LEXICON.find_skills_in_tokens(document.tokens), 3.0,
+                                stub_vector(document.text), tokens=document.tokens)
+
+    def extract_features(self, resume_texts, jd_texts):
+        return [self.features(text) for text in resume_texts], [self.features(text) for text in jd_texts]
+
+
+TEXTS = [f"Engineer {i} with Python, Docker and Kubernetes; built React.js front-ends" for i in range(6)]
+
+
+def stored_vector(store, doc_id):
+    entries, vectors = store.snapshot(StubMatcher())
+    entry = next(entry for entry in entries if entry["id"] == doc_id)
+    return np.asarray(vectors[entry["row_start"]:entry["row_start"] + entry["row_count"]])
+
+
+def segment_files(directory):
+    return sorted(name for name in os.listdir(directory) if name.startswith(("vectors-", "documents-")))
+
+
+def test_documents_survive_reopening(tmp_path):
+    store = DocumentStore(str(tmp_path))
+    store.add_many(StubMatcher(), TEXTS[:3], ["a", "b", "c"])
+    store.register(StubMatcher(), TEXTS[3], "d")
+
+    reopened = DocumentStore(str(tmp_path))
+    assert [entry["name"] for entry in reopened.list()] == ["a", "b", "c", "d"]
+    for text in TEXTS[:4]:
+        assert reopened.get(document_id(text))["text"] == text
+        np.testing.assert_array_equal(stored_vector(reopened, document_id(text)),
+                                      stub_vector(normalize(text).text))
+    assert "text" not in reopened.current_entries()[0]
+    # Appends extend the first generation's segments instead of rewriting them
+    assert segment_files(tmp_path) == ["documents-000001.jsonl", "vectors-000001.f32"]
+
+
+def test_uncommitted_tail_is_ignored_and_overwritten(tmp_path):
+    store = DocumentStore(str(tmp_path))
+    store.add_many(StubMatcher(), TEXTS[:2])
+    # A writer that crashed after appending but before committing the manifest
+    for name in segment_files(tmp_path):
+        with open(tmp_path / name, "ab") as f:
+            f.write(b"\x01" * 37)
+
+    reopened = DocumentStore(str(tmp_path))
+    assert len(reopened) == 2
+    reopened.register(StubMatcher(), TEXTS[2])
+    fresh = DocumentStore(str(tmp_path))
+    assert fresh.get(document_id(TEXTS[2]))["text"] == TEXTS[2]
+    np.testing.assert_array_equal(stored_vector(fresh, document_id(TEXTS[2])), stub_vector(normalize(TEXTS[2]).text))
+
+
+def test_deletes_are_compacted_in_the_background(tmp_path):
+    store = DocumentStore(str(tmp_path))
+    store.add_many(StubMatcher(), TEXTS[:4])
+    assert store.delete(document_id(TEXTS[0]))
+    assert store._compaction is None
+    assert store.delete(document_id(TEXTS[1]))
+    assert store.delete(document_id(TEXTS[2]))
+    store._compaction.join()
+
+    assert segment_files(tmp_path) == ["documents-000005.jsonl", "vectors-000005.f32"]
+    with open(tmp_path / "manifest.json") as f:
+        manifest = json.load(f)
+    assert manifest["vectors"]["rows"] == 1 and manifest["entries"][0]["row_start"] == 0
+    # The store that deleted reloads the compacted manifest on its next read
+    assert store.get(document_id(TEXTS[3]))["text"] == TEXTS[3]
+    np.testing.assert_array_equal(stored_vector(store, document_id(TEXTS[3])), stub_vector(normalize(TEXTS[3]).text))
+    assert not store.compact()
+
+
+def test_index_json_layout_is_migrated_on_first_write(tmp_path):
+    legacy_text = TEXTS[0]
+    entry = {"id": document_id(legacy_text), "name": "legacy", "text": legacy_text, "skills": {},
+             "experience_years": 2.0, "created_at": 0.0, "row_start": 0, "row_count": 1}
+    with open(tmp_path / "index.json", "w") as f:
+        json.dump({"version": 1, "embedding": {"model": "stub", "similarity_mode": "document"},
+                   "entries": [entry]}, f)
+    np.save(tmp_path / "vectors.npy", stub_vector(normalize(legacy_text).text))
+
+    store = DocumentStore(str(tmp_path))
+    assert store.get(entry["id"])["text"] == legacy_text
+    store.register(StubMatcher(), TEXTS[1])
+
+    assert not (tmp_path / "index.json").exists() and not (tmp_path / "vectors.npy").exists()
+    reopened = DocumentStore(str(tmp_path))
+    assert reopened.get(entry["id"])["text"] == legacy_text
+    # The version 1 entry gained tokens, and its skills were extracted from them
+    assert "python" in reopened.get(entry["id"])["skills"]["python"]
+    np.testing.assert_array_equal(stored_vector(reopened, entry["id"]), stub_vector(normalize(legacy_text).text))
+
+
+def add_from_process(directory, texts):
+    store = DocumentStore(directory)
+    for text in texts:
+        store.register(StubMatcher(), text)
+
+
+@pytest.mark.skipif(document_store.fcntl is None, reason="cross-process locking needs fcntl")
+def test_concurrent_processes_keep_every_document(tmp_path):
+    context = multiprocessing.get_context("fork")
+    batches = [[f"Process {p} document {i} with Python" for i in range(10)] for p in range(4)]
+    processes = [context.Process(target=add_from_process, args=(str(tmp_path), batch)) for batch in batches]
+    for process in processes:
+        process.start()
+    for process in processes:
+        process.join()
+
+    store = DocumentStore(str(tmp_path))
+    assert len(store) == 40
+    assert sorted(store.texts()) == sorted(text for batch in batches for text in batch)
@@ -0,0 +1,35 @@
+"""
+Parity of the ONNX backends with the torch backend, on the snippets and
+tolerances of benchmarks/check_backend_parity.py. Skipped without onnxruntime
+or sentence-transformers; the first run exports the model into ONNX_MODEL_DIR.
+"""
+
+import os
+
+import numpy as np
+import pytest
+
+from benchmarks.check_backend_parity import JOB_DESCRIPTIONS, RESUMES, TOLERANCES, cosine_scores
+from embedding_backends import EmbeddingBackend, create_embedding_backend
+
+MODEL = os.environ.get("EMBEDDING_MODEL", 'all-MiniLM-L6-v2')
+TEXTS = RESUMES + JOB_DESCRIPTIONS
+
+
+@pytest.fixture(scope="module")
+def reference_scores() -> np.ndarray:
+    pytest.importorskip("onnxruntime")
+    pytest.importorskip("sentence_transformers")
+    return cosine_scores(create_embedding_backend("torch", MODEL).encode(TEXTS))
+
+
+@pytest.mark.parametrize("backend", sorted(TOLERANCES))
+def test_backend_matches_torch_within_tolerance(backend, reference_scores):
+    scores = cosine_scores(create_embedding_backend(backend, MODEL).encode(TEXTS))
+    assert float(np.abs(scores - reference_scores).max()) <= TOLERANCES[backend]
+    assert (scores.argmax(axis=1) == reference_scores.argmax(axis=1)).all()
+
+
+def test_base_backend_is_abstract():
+    with pytest.raises(TypeError):
+        EmbeddingBackend(MODEL)
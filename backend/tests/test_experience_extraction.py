@@ -0,0 +1,39 @@
+"""
+Golden check: experience extraction must give the expected years, merged
+employment total, qualified statement and role periods for each case in
+fixtures/experience_golden.json.
+
+The cases pin the counting conventions documented in experience_extraction:
+month-precise ends are inclusive, bare end years are exclusive ('2015 - 2018'
+is 3 years), open ends run through the reference month, and overlapping roles
+count once. They also cover qualified statements ('5+ years', 'at least'),
+ranges in requirements, bare mentions and the seniority fallback. Every case
+is parsed against the fixture's fixed reference date.
+"""
+
+import json
+import os
+from datetime import date
+
+import pytest
+
+from experience_extraction import extract_experience
+
+FIXTURE = os.path.join(os.path.dirname(os.path.abspath(__file__)), 'fixtures', 'experience_golden.json')
+
+with open(FIXTURE, encoding='utf-8') as f:
+    GOLDEN = json.load(f)
+
+FIELDS = ('years', 'employment_years', 'stated_years', 'roles')
+
+
+@pytest.mark.parametrize("case", GOLDEN['cases'], ids=[case['label'] for case in GOLDEN['cases']])
+def test_experience_matches_golden(case):
+    profile = extract_experience(case['text'], case['requirement'], date.fromisoformat(GOLDEN['today']))
+    actual = {
+        'years': profile.years,
+        'employment_years': profile.employment_years,
+        'stated_years': profile.stated_years,
+        'roles': [[role.as_dict()['start'], role.as_dict()['end']] for role in profile.roles],
+    }
+    assert actual == {name: case[name] for name in FIELDS}
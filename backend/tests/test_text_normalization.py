@@ -0,0 +1,53 @@
+"""
+Golden check: the single-pass normaliser must reproduce the original
+eight-substitution preprocess_text exactly, both the normalised text and the
+lexicon token stream skill extraction consumes (and therefore the skills).
+
+Compares on the fixture corpus in fixtures/normalization_corpus.json plus
+randomly generated strings dense in whitespace, special characters and the
+rewritten variants (c++, c#, f#, node.js, react.js, vue.js) and their
+boundary interactions.
+"""
+
+import json
+import os
+import random
+
+import pytest
+
+from benchmarks.bench_normalization import reference_preprocess
+from tech_mappings import SKILL_LEXICON
+from text_normalization import normalize
+
+FIXTURE = os.path.join(os.path.dirname(os.path.abspath(__file__)), 'fixtures', 'normalization_corpus.json')
+
+FRAGMENTS = ['c++', 'c#', 'f#', 'node.js', 'react.js', 'vue.js', 'C++', 'Node.JS', 'c', 'f', '+', '#', '.',
+             '.js', 'js', 'x', 'python', '-', ' ', '  ', '\n', '\t', ' ', '/', '(', ')', ',', '!', 'é', '🚀',
+             '_', '1', 'react', 'vue', 'node']
+GENERATED = 20000
+
+
+def corpus():
+    with open(FIXTURE, encoding='utf-8') as f:
+        return json.load(f)
+
+
+def generated():
+    rng = random.Random(0)
+    return [''.join(rng.choice(FRAGMENTS) for _ in range(rng.randint(1, 12))) for _ in range(GENERATED)]
+
+
+def mismatches(texts):
+    found = []
+    for text in texts:
+        expected_text = reference_preprocess(text)
+        expected_tokens = tuple(SKILL_LEXICON.tokenize(expected_text))
+        actual = normalize(text)
+        if actual.text != expected_text or actual.tokens != expected_tokens:
+            found.append((text, expected_text, actual.text))
+    return found
+
+
+@pytest.mark.parametrize("texts", [corpus, generated], ids=["fixture", "generated"])
+def test_normalize_matches_reference(texts):
+    assert mismatches(texts()) == []
@@ -0,0 +1,162 @@
+"""
+Extracted-text cache
+Text and skills extracted from a PDF, keyed by a hash of the PDF bytes, so the
+same document (the JD sent with every application, a resume submitted to
+several roles) is parsed once. In-memory LRU bounded by a byte budget, with
+an optional on-disk tier that survives restarts and can be shared by several
+worker processes.
+"""
+
+import hashlib
+import json
+import logging
+import os
+import sys
+import threading
+from collections import OrderedDict
+from typing import Dict, NamedTuple, Optional, Set
+
+from pdf_extraction import PDF_MAX_PAGES
+from tech_mappings import SKILL_LEXICON, TAXONOMY_VERSION
+from text_normalization import normalize
+from structured_logging import get_logger, log_event
+
+TEXT_CACHE_MAX_BYTES = int(os.environ.get("TEXT_CACHE_MAX_BYTES", 32 * 1024 * 1024))
+# Set to a directory to keep extracted text across restarts
+TEXT_CACHE_DIR = os.environ.get("TEXT_CACHE_DIR") or None
+
+logger = get_logger("text_cache")
+
+# Skills cached on disk are only reused while the skill taxonomy is unchanged
+_TAXONOMY_FINGERPRINT = TAXONOMY_VERSION
+
+
+def pdf_cache_key(pdf_bytes: bytes, max_pages: int = PDF_MAX_PAGES) -> str:
+    """
+    Hash the PDF bytes together with the page limit, which decides how much text is extracted
+    """
+    return f"{hashlib.sha256(pdf_bytes).hexdigest()}-p{max_pages}"
+
+
+class ExtractedDocument(NamedTuple):
+    text: str
+    # None when the document was cached by a caller that did not extract skills
+    skills: Optional[Dict[str, Set[str]]]
+
+
+def _document_bytes(document: ExtractedDocument) -> int:
+    skills = sum(len(skill) + 56 for skills in (document.skills or {}).values() for skill in skills)
+    return sys.getsizeof(document.text) + skills
+
+
+class ExtractedTextCache:
+    """
+    LRU cache of extracted documents keyed by pdf_cache_key, bounded by
+    `max_bytes`. Misses fall through to the optional disk tier before pypdf.
+    """
+
+    def __init__(self, max_bytes: int, disk_dir: Optional[str] = None):
+        self.max_bytes = max_bytes
+        self.current_bytes = 0
+        self.disk_dir = disk_dir
+        self._entries: "OrderedDict[str, ExtractedDocument]" = OrderedDict()
+        self._lock = threading.Lock()
+        self.hits = 0
+        self.disk_hits = 0
+        self.misses = 0
+        self.evictions = 0
+
+    def _disk_path(self, key: str) -> str:
+        return os.path.join(self.disk_dir, key[:2], key + ".json")
+
+    def get(self, key: str) -> Optional[ExtractedDocument]:
+        with self._lock:
+            document = self._entries.get(key)
+            if document is not None:
+                self._entries.move_to_end(key)
+                self.hits += 1
+                return document
+        if self.disk_dir is not None:
+            document = self._read_disk(key)
+            if document is not None:
+                with self._lock:
+                    self.disk_hits += 1
+                    self._insert(key, document)
+                return document
+        with self._lock:
+            self.misses += 1
+        return None
+
+    def put(self, key: str, document: ExtractedDocument) -> None:
+        with self._lock:
+            previous = self._entries.get(key)
+            if previous is not None and previous.skills is not None and document.skills is None:
+                return
+            self._insert(key, document)
+        if self.disk_dir is not None:
+            self._write_disk(key, document)
+
+    def _insert(self, key: str, document: ExtractedDocument) -> None:
+        size = _document_bytes(document)
+        if size > self.max_bytes:
+            return
+        previous = self._entries.pop(key, None)
+        if previous is not None:
+            self.current_bytes -= _document_bytes(previous)
+        self._entries[key] = document
+        self.current_bytes += size
+        while self.current_bytes > self.max_bytes:
+            _, evicted = self._entries.popitem(last=False)
+            self.current_bytes -= _document_bytes(evicted)
+            self.evictions += 1
+
+    def _read_disk(self, key: str) -> Optional[ExtractedDocument]:
+        try:
+            with open(self._disk_path(key), encoding="utf-8") as f:
+                stored = json.load(f)
+        except (OSError, ValueError):
+            return None
+        skills = stored.get("skills")
+        if skills is not None and stored.get("taxonomy") == _TAXONOMY_FINGERPRINT:
+            skills = {category: set(found) for category, found in skills.items()}
+        else:
+            # Text is still valid; re-run the (cheap) lexicon pass against the current taxonomy
+            skills = SKILL_LEXICON.find_skills_in_tokens(normalize(stored["text"]).tokens)
+        return ExtractedDocument(stored["text"], skills)
+
+    def _write_disk(self, key: str, document: ExtractedDocument) -> None:
+        path = self._disk_path(key)
+        skills = None if document.skills is None else {
+            category: sorted(found) for category, found in document.skills.items()
+        }
+        try:
+            os.makedirs(os.path.dirname(path), exist_ok=True)
+            # Unique per process and thread, so workers sharing the directory never write the same temp file
+            tmp = f"{path}.{os.getpid()}.{threading.get_ident()}.tmp"
+            with open(tmp, "w", encoding="utf-8") as f:
+                json.dump({"text": document.text, "skills": skills, "taxonomy": _TAXONOMY_FINGERPRINT}, f)
+            os.replace(tmp, path)
+        except OSError as e:
+            log_event(logger, logging.WARNING, "text_cache_write_failed", key=key, error=str(e))
+
+    def stats(self) -> Dict:
+        with self._lock:
+            lookups = self.hits + self.disk_hits + self.misses
+            return {
+                "entries": len(self._entries),
+                "bytes": self.current_bytes,
+                "max_bytes": self.max_bytes,
+                "hits": self.hits,
+                "disk_hits": self.disk_hits,
+                "misses": self.misses,
+                "evictions": self.evictions,
+                "hit_rate": round((self.hits + self.disk_hits) / lookups, 4) if lookups else 0.0,
+                "disk_dir": self.disk_dir
+            }
+
+
+extracted_text_cache = ExtractedTextCache(TEXT_CACHE_MAX_BYTES, TEXT_CACHE_DIR)
+
+
+def get_text_cache_stats() -> Dict:
+    return extracted_text_cache.stats()
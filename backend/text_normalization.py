@@ -0,0 +1,90 @@
+"""
+Text Normalisation
+Single-pass normalisation shared by skill extraction and semantic similarity.
+
+The output is identical to the original step-by-step pipeline (lowercase,
+collapse whitespace, blank out special characters, then rewrite c++/c#/f#/
+node.js/react.js/vue.js), but needs one lowercase pass, one combined
+separator substitution and one variant substitution instead of eight regex
+passes. Results, including the lexicon token stream, are memoized per
+document so the several consumers within a request share one normalisation.
+"""
+
+import os
+import re
+from functools import lru_cache
+from typing import NamedTuple, Tuple
+
+from tech_mappings import SKILL_LEXICON
+
+NORMALIZE_MEMO_SIZE = int(os.environ.get("NORMALIZE_MEMO_SIZE", 128))
+
+# Whitespace runs collapse to one space; each special character becomes its own space
+_SEPARATOR_RE = re.compile(r'\s+|[^\w\s\-\+\#\.]')
+
+# Rewrites in the order the original pipeline applied them
+_VARIANTS = (('c++', 'cpp'), ('c#', 'csharp'), ('f#', 'fsharp'),
+             ('node.js', 'nodejs'), ('react.js', 'reactjs'), ('vue.js', 'vuejs'))
+_VARIANT_RE = re.compile(r'\b(?:' + '|'.join(f'({re.escape(variant)})' for variant, _ in _VARIANTS) + r')\b')
+
+
+class NormalizedText(NamedTuple):
+    text: str
+    # Lexicon tokens of `text`, as consumed by skill extraction
+    tokens: Tuple[str, ...]
+
+
+def _rewrite_variants(text: str) -> str:
+    """
+    Apply every variant rewrite in one scan. The original pipeline ran them one
+    after another, so a rewrite could remove the word boundary in front of a
+    directly following variant that a later pass would otherwise have matched
+    ('c++c#x' -> 'cppc#x'); that interaction is reproduced here.
+    """
+    pieces = []
+    position = 0
+    previous_end, previous_order = -1, len(_VARIANTS)
+    for match in _VARIANT_RE.finditer(text):
+        order = match.lastindex - 1
+        variant, replacement = _VARIANTS[order]
+        # A rewritten 'c++'/'c#'/'f#' ends in a word character afterwards, so
+        # any variant rewritten by a later pass loses its leading boundary
+        if match.start() == previous_end and previous_order < order and _VARIANTS[previous_order][0][-1] in '+#':
+            previous_end, previous_order = match.end(), len(_VARIANTS)
+            continue
+        pieces.append(text[position:match.start()])
+        pieces.append(replacement)
+        position = match.end()
+        previous_end, previous_order = match.end(), order
+    if not pieces:
+        return text
+    pieces.append(text[position:])
+    return ''.join(pieces)
+
+
+def normalize_text(text: str) -> str:
+    """
+    Clean and preprocess text for analysis
+    """
+    text = _SEPARATOR_RE.sub(' ', text.lower())
+    # Every variant contains one of these characters; most documents skip the scan entirely
+    if '+' in text or '#' in text or '.js' in text:
+        text = _rewrite_variants(text)
+    return text.strip()
+
+
+def normalize(text: str) -> NormalizedText:
+    """
+    Normalised text together with its lexicon token stream
+    """
+    normalized = normalize_text(text)
+    return NormalizedText(normalized, tuple(SKILL_LEXICON.tokenize(normalized)))
+
+
+@lru_cache(maxsize=NORMALIZE_MEMO_SIZE)
+def normalize_document(text: str) -> NormalizedText:
+    """
+    Memoized normalize() for whole documents, which are normalised by several
+    consumers (skill extraction, embedding, chunking) within one request
+    """
+    return normalize(text)
@@ -0,0 +1,247 @@
+"""
+Inference Auto-tuning
+Sweeps the embedding model's inference settings on this machine and writes
+the best combination to the inference config file (INFERENCE_CONFIG, by
+default inference_config.json next to this script), which the server reads
+at start-up. Run it on the machine, and with the worker count, you deploy.
+
+Each combination of intra-op and inter-op threads gets --workers fresh
+processes, as the pre-fork server runs its workers side by side. Each process
+loads the model with those settings and warms it up, then all of them
+measure at the same time:
+- latency: one document per call, as interactive requests encode;
+  p50/p95/p99 ms over the calls of every process
+- throughput: --documents texts in batches of each --batch-sizes value;
+  texts per second over all processes
+
+--objective latency (default) picks the threads with the lowest p99 and then
+the batch size with the highest throughput for them; --objective throughput
+picks the highest throughput overall. A max sequence length below the
+model's limit truncates documents and so changes the embeddings, so it is
+only swept when --max-seq-lengths is given; otherwise the configured value
+is kept.
+
+Usage:
+    python tune_inference.py --workers 4
+    python tune_inference.py --workers 4 --objective throughput --batch-sizes 16,32,64,128 --dry-run
+"""
+
+import argparse
+import multiprocessing
+import os
+import platform
+import queue
+import statistics
+import sys
+import time
+from dataclasses import replace
+from datetime import datetime, timezone
+from typing import Dict, List
+
+from embedding_backends import create_embedding_backend
+from inference_config import (
+    INFERENCE_CONFIG_PATH, InferenceConfig, load_inference_config, warmup_texts, write_inference_config
+)
+from matching_engine import EMBEDDING_BACKEND, EMBEDDING_MODEL_NAME
+
+OBJECTIVES = ("latency", "throughput")
+
+
+def _measure(backend_name: str, model_name: str, config: InferenceConfig, seq_lengths: List[int],
+             batch_sizes: List[int], texts: List[str], rounds: int, barrier, results) -> None:
+    """
+    Body of one measuring process; reports (kind, max_seq_length, batch size, value) tuples on `results`
+    """
+    try:
+        for seq_length in seq_lengths:
+            backend = create_embedding_backend(backend_name, model_name, replace(config, max_seq_length=seq_length))
+            backend.warm_up(warmup_texts(config))
+            barrier.wait()
+            latencies = []
+            for i in range(rounds):
+                started = time.perf_counter()
+                backend.encode([texts[i % len(texts)]])
+                latencies.append(time.perf_counter() - started)
+            results.put(("latency", seq_length, 0, latencies))
+            for batch_size in batch_sizes:
+                backend.max_batch_size = batch_size
+                barrier.wait()
+                started = time.perf_counter()
+                backend.encode(texts)
+                results.put(("throughput", seq_length, batch_size, time.perf_counter() - started))
+    except Exception as e:
+        # Release the other processes waiting at the barrier
+        barrier.abort()
+        results.put(("error", 0, 0, f"{type(e).__name__}: {e}"))
+
+
+def measure_threads(config: InferenceConfig, args: argparse.Namespace, texts: List[str]) -> List[Dict]:
+    """
+    One result row per (max_seq_length, batch size) for the thread counts in `config`
+    """
+    # Fresh interpreters: torch's inter-op thread count can only be set once per process
+    context = multiprocessing.get_context("spawn")
+    barrier = context.Barrier(args.workers)
+    results = context.Queue()
+    processes = [context.Process(target=_measure, daemon=True,
+                                 args=(args.backend, args.model, config, args.max_seq_lengths, args.batch_sizes,
+                                       texts, args.rounds, barrier, results))
+                 for _ in range(args.workers)]
+    for process in processes:
+        process.start()
+
+    expected = args.workers * len(args.max_seq_lengths) * (1 + len(args.batch_sizes))
+    latencies: Dict[int, List[float]] = {}
+    elapsed: Dict[tuple, List[float]] = {}
+    try:
+        while expected:
+            try:
+                kind, seq_length, batch_size, value = results.get(timeout=1.0)
+            except queue.Empty:
+                if any(process.exitcode not in (None, 0) for process in processes):
+                    raise RuntimeError("a measuring process died")
+                continue
+            if kind == "error":
+                raise RuntimeError(value)
+            if kind == "latency":
+                latencies.setdefault(seq_length, []).extend(value)
+            else:
+                elapsed.setdefault((seq_length, batch_size), []).append(value)
+            expected -= 1
+    finally:
+        for process in processes:
+            process.join(timeout=5)
+            if process.is_alive():
+                process.terminate()
+
+    rows = []
+    for seq_length in args.max_seq_lengths:
+        calls = sorted(latencies[seq_length])
+        for batch_size in args.batch_sizes:
+            # The processes started together, so the slowest one bounds the aggregate rate
+            seconds = max(elapsed[(seq_length, batch_size)])
+            rows.append({
+                "intra_op_threads": config.intra_op_threads,
+                "inter_op_threads": config.inter_op_threads,
+                "max_seq_length": seq_length,
+                "max_batch_size": batch_size,
+                "p50_ms": round(statistics.median(calls) * 1000, 2),
+                "p95_ms": percentile_ms(calls, 0.95),
+                "p99_ms": percentile_ms(calls, 0.99),
+                "texts_per_second": round(args.workers * len(texts) / seconds, 1),
+            })
+    return rows
+
+
+def percentile_ms(ordered: List[float], fraction: float) -> float:
+    return round(ordered[min(len(ordered) - 1, int(len(ordered) * fraction))] * 1000, 2)
+
+
+def choose(rows: List[Dict], objective: str) -> Dict:
+    if objective == "latency":
+        return min(rows, key=lambda row: (row["p99_ms"], -row["texts_per_second"]))
+    return max(rows, key=lambda row: (row["texts_per_second"], -row["p99_ms"]))
+
+
+def default_intra_op_threads(workers: int) -> List[int]:
+    """
+    Powers of two up to this process's share of the cores, and the share itself
+    """
+    share = max(1, (os.cpu_count() or 1) // workers)
+    candidates = {share}
+    count = 1
+    while count < share:
+        candidates.add(count)
+        count *= 2
+    return sorted(candidates)
+
+
+def int_list(value: str) -> List[int]:
+    try:
+        numbers = [int(part) for part in value.split(",") if part.strip()]
+    except ValueError:
+        raise argparse.ArgumentTypeError(f"expected comma-separated integers, got {value!r}")
+    if not numbers or min(numbers) < 0:
+        raise argparse.ArgumentTypeError(f"expected comma-separated integers of 0 or more, got {value!r}")
+    return numbers
+
+
+def print_rows(rows: List[Dict]) -> None:
+    print(f"{'intra':>5} {'inter':>5} {'seq':>5} {'batch':>5} {'p50 ms':>8} {'p95 ms':>8} {'p99 ms':>8} {'texts/s':>9}")
+    for row in rows:
+        print(f"{row['intra_op_threads']:>5} {row['inter_op_threads']:>5} {row['max_seq_length']:>5} "
+              f"{row['max_batch_size']:>5} {row['p50_ms']:>8.2f} {row['p95_ms']:>8.2f} {row['p99_ms']:>8.2f} "
+              f"{row['texts_per_second']:>9.1f}")
+
+
+def main() -> int:
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--workers", type=int, default=int(os.environ.get("WEB_WORKERS", 1)),
+                        help="processes running the model side by side (default WEB_WORKERS or 1)")
+    parser.add_argument("--intra-op-threads", type=int_list,
+                        help="comma-separated values to try (default: powers of two up to cores / workers)")
+    parser.add_argument("--inter-op-threads", type=int_list, default=[1, 2])
+    parser.add_argument("--batch-sizes", type=int_list, default=[8, 16, 32, 64])
+    parser.add_argument("--max-seq-lengths", type=int_list,
+                        help="values to try; changes the embeddings (default: keep the configured one)")
+    parser.add_argument("--documents", type=int, default=64, help="texts each process encodes per batch size")
+    parser.add_argument("--rounds", type=int, default=50, help="single-document calls per process")
+    parser.add_argument("--corpus", help="texts to measure with, separated by blank lines (default: warm-up corpus)")
+    parser.add_argument("--objective", choices=OBJECTIVES, default="latency")
+    parser.add_argument("--backend", default=EMBEDDING_BACKEND)
+    parser.add_argument("--model", default=EMBEDDING_MODEL_NAME)
+    parser.add_argument("--output", default=INFERENCE_CONFIG_PATH)
+    parser.add_argument("--dry-run", action="store_true", help="report the best settings without writing them")
+    args = parser.parse_args()
+
+    if args.workers < 1 or args.documents < 1 or args.rounds < 1:
+        parser.error("--workers, --documents and --rounds must be at least 1")
+    if 0 in args.batch_sizes:
+        parser.error("--batch-sizes must be at least 1")
+    current = load_inference_config()
+    args.intra_op_threads = args.intra_op_threads or default_intra_op_threads(args.workers)
+    args.max_seq_lengths = args.max_seq_lengths or [current.max_seq_length]
+    corpus = warmup_texts(replace(current, warmup_corpus=args.corpus or current.warmup_corpus))
+    texts = (corpus * args.documents)[:args.documents]
+
+    print(f"Tuning {args.backend} {args.model} on {os.cpu_count()} cores with {args.workers} worker(s), "
+          f"objective {args.objective}")
+    rows: List[Dict] = []
+    for intra in args.intra_op_threads:
+        for inter in args.inter_op_threads:
+            started = time.perf_counter()
+            try:
+                measured = measure_threads(replace(current, intra_op_threads=intra, inter_op_threads=inter),
+                                           args, texts)
+            except RuntimeError as e:
+                print(f"Measuring intra={intra} inter={inter} failed: {e}", file=sys.stderr)
+                return 1
+            rows.extend(measured)
+            print_rows(measured)
+            print(f"  ({time.perf_counter() - started:.1f}s)")
+
+    best = choose(rows, args.objective)
+    tuned = replace(current, intra_op_threads=best["intra_op_threads"], inter_op_threads=best["inter_op_threads"],
+                    max_batch_size=best["max_batch_size"], max_seq_length=best["max_seq_length"])
+    print("Best:")
+    print_rows([best])
+    if args.dry_run:
+        return 0
+    write_inference_config(tuned, args.output, tuning={
+        "tuned_at": datetime.now(timezone.utc).isoformat(timespec="seconds"),
+        "host": platform.node(),
+        "cpu_count": os.cpu_count(),
+        "workers": args.workers,
+        "backend": args.backend,
+        "model": args.model,
+        "objective": args.objective,
+        "documents": args.documents,
+        "rounds": args.rounds,
+        "results": rows,
+    })
+    print(f"Wrote {args.output}")
+    return 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
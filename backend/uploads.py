@@ -0,0 +1,183 @@
+"""
+Upload Limits
+Bounds the memory a request can pin while its PDFs are being received.
+
+- RequestSizeLimit rejects a request body larger than MAX_REQUEST_BYTES with
+  413: immediately when Content-Length announces it, otherwise as soon as the
+  streamed body crosses the limit. Nothing past the limit is read.
+- PartSizeLimitParser enforces the per-file limit (PDF_MAX_BYTES) while the
+  multipart body is parsed: a file part that grows past it is answered with
+  413 and the rest of the body is not read. File parts are spooled to disk
+  beyond UPLOAD_SPOOL_BYTES, so an oversized file is never held in memory.
+- read_upload reads an accepted file into memory with one bounded read.
+  Hashing, the caches and queued jobs all work on those bytes. When PDFs are
+  parsed in worker processes, extraction writes one more copy to
+  PDF_SPOOL_DIR for the workers to open.
+- buffer_upload keeps an accepted upload's bytes past the end of its request
+  (for queued jobs and coalesced matches); read_upload accepts the result like
+  an UploadFile. Once extraction has consumed the bytes they are released and
+  only what was derived from them is kept.
+"""
+
+import os
+from typing import Any, Optional, Union
+
+import starlette.requests
+from fastapi import HTTPException, UploadFile
+from starlette.formparsers import MultiPartParser
+from starlette.types import ASGIApp, Message, Receive, Scope, Send
+
+from metrics import stage_timer
+from pdf_extraction import PDF_MAX_BYTES
+
+# Whole request body (all files and form fields); bulk endpoints carry many PDFs
+MAX_REQUEST_BYTES = int(os.environ.get("MAX_REQUEST_BYTES", 256 * 1024 * 1024))
+# File parts larger than this are spooled to a temporary file while the body is parsed
+UPLOAD_SPOOL_BYTES = int(os.environ.get("UPLOAD_SPOOL_BYTES", 1024 * 1024))
+
+MultiPartParser.spool_max_size = UPLOAD_SPOOL_BYTES
+
+
+class PartSizeLimitParser(MultiPartParser):
+    """
+    Starlette's multipart parser with PDF_MAX_BYTES enforced on each file part
+    as its data arrives, instead of after the whole body has been spooled
+    """
+
+    max_file_part_bytes = PDF_MAX_BYTES
+
+    def on_part_begin(self) -> None:
+        super().on_part_begin()
+        self._part_bytes = 0
+
+    def on_part_data(self, data: bytes, start: int, end: int) -> None:
+        part = self._current_part
+        if part.file is not None:
+            self._part_bytes += end - start
+            if self._part_bytes > self.max_file_part_bytes:
+                # Propagates out of request.form() unchanged, so the client gets 413 rather than 400
+                raise HTTPException(status_code=413,
+                                    detail=f"PDF too large: {part.file.filename} exceeds the limit of "
+                                           f"{self.max_file_part_bytes} bytes")
+        super().on_part_data(data, start, end)
+
+
+# Request.form() looks the parser up in starlette.requests
+starlette.requests.MultiPartParser = PartSizeLimitParser
+
+
+class BufferedUpload:
+    """
+    An upload already read into memory, with the UploadFile attributes the endpoints use.
+    `release` drops the bytes once they have been consumed, keeping what was derived from them.
+    """
+
+    def __init__(self, filename: Optional[str], content_type: Optional[str], data: bytes):
+        self.filename = filename
+        self.content_type = content_type
+        self.data: Optional[bytes] = data
+        self.size = len(data)
+        # Content hash and extraction result; both outlive the bytes
+        self.cache_key: Optional[str] = None
+        self.extracted: Any = None
+
+    def release(self, extracted: Any) -> None:
+        self.extracted = extracted
+        self.data = None
+
+    async def close(self) -> None:
+        pass
+
+
+class RequestSizeLimit:
+    """
+    ASGI middleware enforcing MAX_REQUEST_BYTES on request bodies
+    """
+
+    def __init__(self, app: ASGIApp, max_bytes: int = MAX_REQUEST_BYTES):
+        self.app = app
+        self.max_bytes = max_bytes
+
+    async def __call__(self, scope: Scope, receive: Receive, send: Send) -> None:
+        if scope["type"] != "http":
+            await self.app(scope, receive, send)
+            return
+
+        for name, value in scope["headers"]:
+            if name == b"content-length":
+                try:
+                    declared = int(value)
+                except ValueError:
+                    break
+                if declared > self.max_bytes:
+                    await _reject(send, declared, self.max_bytes)
+                    return
+                break
+
+        received = 0
+        rejected = False
+
+        async def limited_receive() -> Message:
+            nonlocal received, rejected
+            if rejected:
+                return {"type": "http.disconnect"}
+            message = await receive()
+            if message["type"] == "http.request":
+                received += len(message.get("body", b""))
+                if received > self.max_bytes:
+                    # Answer now and tell the app the client went away, so it stops parsing the body
+                    rejected = True
+                    await _reject(send, received, self.max_bytes, "at least ")
+                    return {"type": "http.disconnect"}
+            return message
+
+        async def guarded_send(message: Message) -> None:
+            # Whatever the app answers to the truncated body is dropped in favour of the 413
+            if not rejected:
+                await send(message)
+
+        await self.app(scope, limited_receive, guarded_send)
+
+
+def _too_large(size: int, limit: int, qualifier: str = "") -> str:
+    return f"Request body is {qualifier}{size} bytes, limit is {limit}"
+
+
+async def _reject(send: Send, size: int, limit: int, qualifier: str = "") -> None:
+    body = ('{"detail": "%s"}' % _too_large(size, limit, qualifier)).encode("utf-8")
+    await send({"type": "http.response.start", "status": 413,
+                "headers": [(b"content-type", b"application/json"), (b"content-length", str(len(body)).encode()),
+                            (b"connection", b"close")]})
+    await send({"type": "http.response.body", "body": body})
+
+
+async def read_upload(upload: Union[UploadFile, BufferedUpload], max_bytes: int = PDF_MAX_BYTES) -> bytes:
+    """
+    The upload's bytes, or 413 if it is larger than `max_bytes`. Parts over
+    PDF_MAX_BYTES were already refused by PartSizeLimitParser; this also covers
+    smaller per-call limits.
+    """
+    if isinstance(upload, BufferedUpload):
+        if upload.data is None:
+            raise RuntimeError(f"{upload.filename} was already released")
+        return upload.data
+    if upload.size is not None and upload.size > max_bytes:
+        raise HTTPException(status_code=413,
+                            detail=f"PDF too large: {upload.filename} is {upload.size} bytes, limit is {max_bytes}")
+    with stage_timer("upload_read"):
+        # One bounded read: no chunk list to join, and never more than one byte past the limit
+        data = await upload.read(max_bytes + 1)
+    if len(data) > max_bytes:
+        raise HTTPException(status_code=413,
+                            detail=f"PDF too large: {upload.filename} exceeds the limit of {max_bytes} bytes")
+    return data
+
+
+async def buffer_upload(upload: Union[UploadFile, BufferedUpload], max_bytes: int = PDF_MAX_BYTES) -> BufferedUpload:
+    """
+    Read an upload (413 past `max_bytes`) into a BufferedUpload that outlives the request;
+    one that is already buffered is returned as it is
+    """
+    if isinstance(upload, BufferedUpload):
+        return upload
+    return BufferedUpload(upload.filename, upload.content_type, await read_upload(upload, max_bytes))
@@ -0,0 +1,109 @@
+"""
+Vector Search
+Top-k inner-product search over a contiguous float32 matrix of unit vectors:
+- exact_top_k: blocked matrix-vector products, so memory-mapped corpora are
+  streamed a block at a time instead of materialised
+- IVFIndex:    inverted-file approximate index (spherical k-means partitions);
+  `n_probe` trades recall for speed
+"""
+
+import os
+from typing import Optional, Tuple
+
+import numpy as np
+
+SEARCH_BLOCK_ROWS = int(os.environ.get("SEARCH_BLOCK_ROWS", 65536))
+IVF_PROBES = int(os.environ.get("IVF_PROBES", 8))
+
+
+def _top_k_unsorted(scores: np.ndarray, k: int) -> np.ndarray:
+    if len(scores) <= k:
+        return np.arange(len(scores))
+    return np.argpartition(-scores, k - 1)[:k]
+
+
+def _sorted_top_k(ids: np.ndarray, scores: np.ndarray, k: int) -> Tuple[np.ndarray, np.ndarray]:
+    keep = _top_k_unsorted(scores, k)
+    ids, scores = ids[keep], scores[keep]
+    order = np.lexsort((ids, -scores))
+    return ids[order], scores[order]
+
+
+def exact_top_k(vectors: np.ndarray, query: np.ndarray, k: int,
+                block_rows: int = SEARCH_BLOCK_ROWS) -> Tuple[np.ndarray, np.ndarray]:
+    """
+    Row ids and scores of the k rows with the largest inner product with `query`, best first
+    """
+    query = np.asarray(query, dtype=np.float32)
+    best_ids = np.zeros(0, dtype=np.int64)
+    best_scores = np.zeros(0, dtype=np.float32)
+    for start in range(0, len(vectors), block_rows):
+        scores = np.asarray(vectors[start:start + block_rows], dtype=np.float32) @ query
+        keep = _top_k_unsorted(scores, k)
+        best_ids = np.concatenate([best_ids, keep + start])
+        best_scores = np.concatenate([best_scores, scores[keep]])
+        if len(best_ids) > k:
+            keep = _top_k_unsorted(best_scores, k)
+            best_ids, best_scores = best_ids[keep], best_scores[keep]
+    return _sorted_top_k(best_ids, best_scores, k)
+
+
+def _assign(vectors: np.ndarray, centroids: np.ndarray, block_rows: int = SEARCH_BLOCK_ROWS) -> np.ndarray:
+    return np.concatenate([
+        np.argmax(np.asarray(vectors[start:start + block_rows], dtype=np.float32) @ centroids.T, axis=1)
+        for start in range(0, len(vectors), block_rows)
+    ]) if len(vectors) else np.zeros(0, dtype=np.int64)
+
+
+class IVFIndex:
+    """
+    Vectors partitioned into `n_lists` clusters; a search scores only the
+    members of the `n_probe` clusters whose centroids are closest to the query.
+    Members are stored reordered by cluster, so each probed list is one
+    contiguous slice.
+    """
+
+    def __init__(self, vectors: np.ndarray, n_lists: Optional[int] = None, iterations: int = 10,
+                 sample_per_list: int = 64, seed: int = 0):
+        rng = np.random.default_rng(seed)
+        count = len(vectors)
+        self.n_lists = max(1, min(count, n_lists or int(np.sqrt(count))))
+
+        # Spherical k-means on a sample; the full corpus is only read for the final assignment
+        sample_ids = np.sort(rng.choice(count, min(count, self.n_lists * sample_per_list), replace=False))
+        sample = np.asarray(vectors[sample_ids], dtype=np.float32)
+        centroids = sample[rng.choice(len(sample), self.n_lists, replace=False)].copy()
+        for _ in range(iterations):
+            assignment = _assign(sample, centroids)
+            sums = np.zeros_like(centroids)
+            np.add.at(sums, assignment, sample)
+            occupied = np.bincount(assignment, minlength=self.n_lists) > 0
+            norms = np.linalg.norm(sums[occupied], axis=1, keepdims=True)
+            centroids[occupied] = sums[occupied] / np.maximum(norms, 1e-12)
+        self.centroids = centroids
+
+        assignment = _assign(vectors, centroids)
+        order = np.argsort(assignment, kind="stable")
+        self.ids = order.astype(np.int64)
+        self.offsets = np.concatenate([[0], np.cumsum(np.bincount(assignment, minlength=self.n_lists))])
+        self.vectors = np.asarray(vectors[order], dtype=np.float32)
+
+    def __len__(self) -> int:
+        return len(self.ids)
+
+    def search(self, query: np.ndarray, k: int, n_probe: int = IVF_PROBES,
+               allowed: Optional[np.ndarray] = None) -> Tuple[np.ndarray, np.ndarray]:
+        """
+        Approximate top-k: row ids (in the original matrix) and scores, best first.
+        `allowed` is an optional boolean mask over the original rows; other rows are skipped.
+        """
+        query = np.asarray(query, dtype=np.float32)
+        probes = _top_k_unsorted(self.centroids @ query, max(1, min(n_probe, self.n_lists)))
+        slices = [slice(self.offsets[probe], self.offsets[probe + 1]) for probe in probes]
+        positions = np.concatenate([np.arange(s.start, s.stop) for s in slices])
+        scores = np.concatenate([self.vectors[s] @ query for s in slices])
+        ids = self.ids[positions]
+        if allowed is not None:
+            keep = allowed[ids]
+            ids, scores = ids[keep], scores[keep]
+        return _sorted_top_k(ids, scores, k)
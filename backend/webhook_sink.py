@@ -0,0 +1,120 @@
+"""
+Webhook Sink
+A local stand-in for a job callback receiver. It accepts POSTed jobs, checks
+their X-Signature-256 when given the shared secret, and prints each one as a
+JSON line. To try the job queue against it:
+
+    python webhook_sink.py --port 9000 --secret s3cret
+    JOB_CALLBACK_ALLOWED_PREFIXES=http://127.0.0.1:9000/ JOB_CALLBACK_SECRET=s3cret python app.py
+    curl -F resume=@resume.pdf -F job_description=@jd.pdf \
+         -F callback_url=http://127.0.0.1:9000/jobs http://localhost:8000/jobs/process-docs/
+
+`--fail N` answers the first N deliveries with 500 to exercise the retries.
+WebhookSink can also run inside another script and collect what it receives.
+"""
+
+import argparse
+import hashlib
+import hmac
+import json
+import sys
+import threading
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+from typing import Dict, List, Optional
+
+
+class WebhookSink:
+    """
+    HTTP server on a background thread recording every POST as
+    {"path", "headers", "body", "signature_valid"}
+    """
+
+    def __init__(self, host: str = "127.0.0.1", port: int = 0, secret: Optional[str] = None,
+                 fail_first: int = 0, echo: bool = False):
+        self.secret = secret
+        self.fail_first = fail_first
+        self.echo = echo
+        self.received: List[Dict] = []
+        self.attempts = 0
+        self._condition = threading.Condition()
+        sink = self
+
+        class Handler(BaseHTTPRequestHandler):
+            def do_POST(self) -> None:
+                body = self.rfile.read(int(self.headers.get("Content-Length", 0)))
+                accepted = sink._record(self.path, dict(self.headers), body)
+                self.send_response(204 if accepted else 500)
+                self.send_header("Content-Length", "0")
+                self.end_headers()
+
+            def log_message(self, format: str, *args) -> None:
+                pass
+
+        self.server = ThreadingHTTPServer((host, port), Handler)
+        self.url = f"http://{host}:{self.server.server_address[1]}/"
+        self._thread: Optional[threading.Thread] = None
+
+    def _record(self, path: str, headers: Dict, body: bytes) -> bool:
+        signature_valid = None
+        if self.secret:
+            expected = "sha256=" + hmac.new(self.secret.encode("utf-8"), body, hashlib.sha256).hexdigest()
+            signature_valid = hmac.compare_digest(expected, headers.get("X-Signature-256", ""))
+        try:
+            payload = json.loads(body)
+        except ValueError:
+            payload = body.decode("utf-8", "replace")
+        with self._condition:
+            self.attempts += 1
+            if self.attempts <= self.fail_first:
+                return False
+            delivery = {"path": path, "headers": headers, "body": payload, "signature_valid": signature_valid}
+            self.received.append(delivery)
+            self._condition.notify_all()
+        if self.echo:
+            print(json.dumps({"path": path, "signature_valid": signature_valid, "body": payload}), flush=True)
+        return True
+
+    def wait_for(self, count: int, timeout: float = 30.0) -> bool:
+        """
+        Wait until `count` deliveries have been received; False on timeout
+        """
+        with self._condition:
+            return self._condition.wait_for(lambda: len(self.received) >= count, timeout)
+
+    def start(self) -> "WebhookSink":
+        self._thread = threading.Thread(target=self.server.serve_forever, name="webhook-sink", daemon=True)
+        self._thread.start()
+        return self
+
+    def stop(self) -> None:
+        self.server.shutdown()
+        self.server.server_close()
+
+    def __enter__(self) -> "WebhookSink":
+        return self.start()
+
+    def __exit__(self, *exc) -> None:
+        self.stop()
+
+
+def main() -> int:
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--host", default="127.0.0.1")
+    parser.add_argument("--port", type=int, default=9000)
+    parser.add_argument("--secret", help="JOB_CALLBACK_SECRET of the server, to verify signatures")
+    parser.add_argument("--fail", type=int, default=0, help="answer the first N deliveries with 500")
+    args = parser.parse_args()
+
+    sink = WebhookSink(args.host, args.port, args.secret, args.fail, echo=True)
+    print(f"Listening on {sink.url}", file=sys.stderr)
+    try:
+        sink.server.serve_forever()
+    except KeyboardInterrupt:
+        pass
+    finally:
+        sink.server.server_close()
+    return 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())